@@ -1,22 +1,86 @@
 ######################載入套件######################
-import pygame
+import os
 import sys
 import traceback
-from src.core.game_engine import GameEngine
+
+# 啟動追蹤器必須最先載入，才能記錄後續匯入的耗時
+from src.utils.startup_profiler import startup_profiler
+
+with startup_profiler.trace_imports():
+    import pygame
+    from src.core.game_engine import GameEngine
+    from src.config import STARTUP_CONFIGS
 
 ######################主程式執行點######################
 
 
+def get_option_value(option):
+    """
+    取得命令列選項後面的值\n
+    \n
+    參數:\n
+    option (str): 選項名稱，例如 "--export-format"\n
+    \n
+    回傳:\n
+    str: 選項的值，沒有這個選項或後面沒有值時回傳 None\n
+    """
+    arguments = sys.argv[1:]
+    if option not in arguments:
+        return None
+    value_index = arguments.index(option) + 1
+    if value_index >= len(arguments) or arguments[value_index].startswith("--"):
+        return None
+    return arguments[value_index]
+
+
+def export_replay():
+    """
+    --export-replay [重播檔]：不開視窗，把重播輸出成影格後結束\n
+    \n
+    其他選項：--export-format png|raw、--export-dir 資料夾、--export-frames 開始:結束\n
+    """
+    # 沒有螢幕的機器也可以執行（初始化 pygame 之前設定）
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    frame_range = None
+    frames_option = get_option_value("--export-frames")
+    if frames_option:
+        try:
+            start_frame, end_frame = (int(value) for value in frames_option.split(":"))
+            frame_range = (start_frame, end_frame)
+        except ValueError:
+            print(f"❌ --export-frames 格式錯誤（應為 開始:結束）: {frames_option}")
+            sys.exit(1)
+
+    game_engine = GameEngine()
+    success = game_engine.export_replay(
+        get_option_value("--export-replay"),
+        get_option_value("--export-dir"),
+        get_option_value("--export-format"),
+        frame_range,
+    )
+    pygame.quit()
+    sys.exit(0 if success else 1)
+
+
 def main():
     """
     主程式進入點\n
     \n
     創建遊戲引擎實例並開始運行\n
     """
+    # --startup-check：顯示第一個選單畫面後立即結束，超出啟動時間預算時回傳錯誤碼
+    startup_check = "--startup-check" in sys.argv[1:]
+
+    if "--export-replay" in sys.argv[1:]:
+        export_replay()
+
     try:
         # 創建並運行遊戲
         print("🎮 開始初始化遊戲...")
         game_engine = GameEngine()
+        game_engine.exit_after_first_frame = startup_check
         print("🎮 遊戲初始化完成，開始運行...")
         game_engine.run()
 
@@ -27,6 +91,13 @@ def main():
         pygame.quit()
         sys.exit(1)
 
+    if startup_check:
+        budget_ms = STARTUP_CONFIGS["first_frame_budget_ms"]
+        if not startup_profiler.is_within_budget(budget_ms):
+            print(f"❌ 第一個選單畫面超出啟動時間預算 ({budget_ms} ms)")
+            sys.exit(1)
+        print(f"✅ 第一個選單畫面在啟動時間預算內 ({budget_ms} ms)")
+
 
 # 直接執行主程式
 main()
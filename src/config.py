@@ -96,6 +96,7 @@ WEAPON_CONFIGS = {
 # 驚喜包設定
 POWERUP_SIZE = 20
 POWERUP_SPAWN_CHANCE = 0.1  # 10%掉落機率
+POWERUP_SPAWN_ATTEMPTS = 10  # 隨機位置落在障礙物裡時最多重新抽幾次
 POWERUP_EFFECTS = {
     "fire_boost": {
         "name": "火力增強",
@@ -130,6 +131,7 @@ POWERUP_EFFECTS = {
         "instant": True,  # 立即效果
         "victory_trigger": True,  # 觸發勝利
         "description": "收集後即可獲得勝利！",
+        "image_path": "assets/weapons/powerup_victory_star.png",  # 勝利星星圖片路徑
     },
 }
 
@@ -170,6 +172,8 @@ FONT_CONFIGS = {
     ],
     "fallback_font": None,  # 系統預設字體
     "sizes": {"xlarge": 72, "large": 36, "medium": 24, "small": 18, "tiny": 14},
+    "preload_sizes": ["large", "medium", "small"],  # 第一個選單畫面需要的大小，其餘按需建立
+    "discovery_cache": "font_cache.json",  # 字體偵測結果快取檔（位於資源快取目錄）
 }
 
 # 按鍵設定
@@ -274,6 +278,7 @@ SCENE_CONFIGS = {
         "accent_color": (255, 69, 0),  # 橙紅色
         "effect": "heat_damage",  # 可能的環境效果
         "description": "炎熱的岩漿地帶",
+        "obstacles": [],  # 靜態障礙物 [(x, y, 寬, 高), ...]，敵人以流場繞過
     },
     "mountain": {
         "name": "高山場景",
@@ -283,6 +288,7 @@ SCENE_CONFIGS = {
         "accent_color": (169, 169, 169),  # 淺灰色
         "effect": "thin_air",  # 可能的環境效果
         "description": "高聳的山峰地帶",
+        "obstacles": [(160, 260, 120, 80), (520, 260, 120, 80)],  # 兩塊巨石
     },
     "ice": {
         "name": "冰原場景",
@@ -292,6 +298,7 @@ SCENE_CONFIGS = {
         "accent_color": (173, 216, 230),  # 淺藍色
         "effect": "slippery",  # 可能的環境效果
         "description": "寒冷的冰雪世界",
+        "obstacles": [],
     },
     "desert": {
         "name": "沙漠場景",
@@ -301,6 +308,7 @@ SCENE_CONFIGS = {
         "accent_color": (255, 218, 185),  # 淺沙色
         "effect": "heat_wave",  # 可能的環境效果
         "description": "炎熱乾燥的沙漠",
+        "obstacles": [(320, 280, 160, 40), (80, 200, 40, 160), (680, 200, 40, 160)],
     },
 }
 
@@ -366,6 +374,7 @@ GAME_STATES = {
     "playing": "playing",
     "game_over": "game_over",
     "paused": "paused",
+    "replay": "replay",  # 重播觀看狀態
 }
 
 # 難度級別設定
@@ -398,16 +407,23 @@ SOUND_CONFIGS = {
     "race_start": {
         "file_path": "assets/sounds/遊戲開始音效.mp3",
         "volume": 0.7,  # 音量 (0.0 到 1.0)
+        "category": "ui",
         "description": "場景選擇完成後的開始音效",
     },
     "shotgun": {
         "file_path": "assets/sounds/散彈槍射擊音效.mp3",
         "volume": 0.8,
+        "category": "weapons",  # 聲道分類
+        "max_voices": 3,  # 同時播放上限
+        "min_interval_ms": 60,  # 最短重播間隔（毫秒）
         "description": "霰彈槍射擊音效",
     },
     "plasma_gun": {
         "file_path": "assets/sounds/電漿槍射擊音效.mp3",
         "volume": 0.6,
+        "category": "weapons",  # 聲道分類
+        "max_voices": 3,  # 同時播放上限
+        "min_interval_ms": 60,  # 最短重播間隔（毫秒）
         "description": "電漿槍射擊音效 - 用於步槍、手槍、機關槍、衝鋒槍",
     },
     "pistol": {
@@ -415,6 +431,9 @@ SOUND_CONFIGS = {
         "volume": 0.6,
         "start_time": 0.0,  # 開始時間（秒）
         "end_time": 2.0,  # 結束時間（秒）
+        "category": "weapons",  # 聲道分類
+        "max_voices": 3,  # 同時播放上限
+        "min_interval_ms": 60,  # 最短重播間隔（毫秒）
         "description": "手槍射擊音效 - 使用電漿槍音效 0-2 秒片段",
     },
     "rifle": {
@@ -422,31 +441,40 @@ SOUND_CONFIGS = {
         "volume": 0.6,
         "start_time": 0.0,  # 開始時間（秒）
         "end_time": 2.0,  # 結束時間（秒）
+        "category": "weapons",  # 聲道分類
+        "max_voices": 3,  # 同時播放上限
+        "min_interval_ms": 60,  # 最短重播間隔（毫秒）
         "description": "步槍射擊音效 - 使用電漿槍音效 0-2 秒片段",
     },
     "victory": {
         "file_path": "assets/sounds/勝利音效.wav",
         "volume": 0.8,
+        "category": "stingers",
         "description": "勝利音效 - 遊戲獲勝時播放",
     },
     "death": {
         "file_path": "assets/sounds/死亡音效.wav",
         "volume": 0.7,
+        "category": "stingers",
         "description": "死亡音效 - 玩家死亡時播放",
     },
     "skill_use": {
         "file_path": "assets/sounds/技能使用音效.wav",
         "volume": 0.6,
+        "category": "skills",
         "description": "技能音效 - 使用技能時播放",
     },
     "powerup_pickup": {
         "file_path": "assets/sounds/勝利音效.wav",
         "volume": 0.5,
+        "category": "ui",
+        "min_interval_ms": 100,
         "description": "道具拾取音效 - 拿到道具時播放",
     },
     "level3_boss_music": {
         "file_path": "assets/sounds/第三關BOSS背景音樂.mp3",
         "volume": 0.9,
+        "category": "music",  # 由 MusicService 在背景整首解碼，保留聲道交叉淡入淡出
         "description": "第3關BOSS戰專用背景音樂",
     },
     "submachinegun": {
@@ -454,6 +482,9 @@ SOUND_CONFIGS = {
         "volume": 0.6,
         "start_time": 0.0,  # 開始時間（秒）
         "end_time": 2.0,  # 結束時間（秒）
+        "category": "weapons",  # 聲道分類
+        "max_voices": 3,  # 同時播放上限
+        "min_interval_ms": 60,  # 最短重播間隔（毫秒）
         "description": "衝鋒槍射擊音效 - 使用電漿槍音效 0-2 秒片段",
     },
     "machinegun": {
@@ -462,6 +493,9 @@ SOUND_CONFIGS = {
         "speed_multiplier": 2.0,  # 播放速度乘以2倍
         "start_time": 0.0,  # 開始時間（秒）
         "end_time": 2.0,  # 結束時間（秒）
+        "category": "weapons",  # 聲道分類
+        "max_voices": 4,  # 同時播放上限
+        "min_interval_ms": 40,  # 最短重播間隔（毫秒）
         "description": "機關槍射擊音效 - 使用電漿槍音效 0-2 秒片段加速版",
     },
 }
@@ -492,6 +526,7 @@ LEVEL_CONFIGS = {
             "total_enemy_count": 13,  # 包含BOSS的總數
             "scene": "lava",  # 岩漿背景
             "boss": True,
+            "music": "level3_boss_music",  # 關卡背景音樂（SOUND_CONFIGS 的 key）
             "description": "擊敗 7 個殭屍與 5 個外星人，然後擊敗 BOSS",
             "completion_message": "已擊敗 BOSS！恭喜完成遊戲！",
         },
@@ -520,6 +555,7 @@ LEVEL_CONFIGS = {
             "total_enemy_count": 18,  # 包含BOSS的總數
             "scene": "lava",  # 岩漿背景
             "boss": True,
+            "music": "level3_boss_music",  # 關卡背景音樂（SOUND_CONFIGS 的 key）
             "description": "擊敗 10 個殭屍與 7 個外星人，然後擊敗 BOSS",
             "completion_message": "已擊敗 BOSS！恭喜完成遊戲！",
         },
@@ -548,8 +584,199 @@ LEVEL_CONFIGS = {
             "total_enemy_count": 26,  # 包含BOSS的總數
             "scene": "lava",  # 岩漿背景
             "boss": True,
+            "music": "level3_boss_music",  # 關卡背景音樂（SOUND_CONFIGS 的 key）
             "description": "擊敗 15 個殭屍與 10 個外星人，然後擊敗 BOSS",
             "completion_message": "已擊敗 BOSS！恭喜完成遊戲！",
         },
     },
 }
+
+# 資源快取設定（離線烘焙的預縮放圖片）
+ASSET_CACHE_CONFIGS = {
+    "enabled": True,  # 是否優先讀取烘焙快取
+    "cache_dir": ".asset_cache",  # 快取根目錄（相對於專案根目錄）
+    "images_dir": "images",  # 預縮放圖片子目錄
+    "sounds_dir": "sounds",  # 切好的音效片段（PCM）子目錄
+    "manifest_name": "manifest.json",  # 快取索引檔名
+    # 遊戲實際使用的圖片尺寸（烘焙時逐一產生）
+    "character_sizes": [(120, 120), (PLAYER_SIZE, PLAYER_SIZE)],
+    "weapon_sizes": [(40, 40), (96, 96)],
+    "scene_preview_size": (140, 100),
+    "difficulty_icon_size": (48, 48),
+}
+
+# 圖片記憶體快取設定
+IMAGE_CACHE_CONFIGS = {
+    "memory_budget_mb": 32,  # 快取記憶體預算（MB），超過時淘汰最久未使用的圖片
+}
+
+# 資源封裝檔設定（單一檔案 + 索引，以 mmap 讀取）
+ASSET_PACK_CONFIGS = {
+    "enabled": True,  # 封裝檔存在時優先從封裝檔讀取
+    "pack_path": "assets.pack",  # 封裝檔路徑（相對於專案根目錄）
+    "file_extensions": [".png", ".jpg", ".jpeg", ".wav", ".mp3", ".ogg"],  # 要封裝的檔案類型
+}
+
+# 啟動設定
+STARTUP_CONFIGS = {
+    "first_frame_budget_ms": 1500,  # 第一個可互動選單畫面的時間預算（毫秒）
+    "print_report": True,  # 是否在啟動完成後印出啟動追蹤報告
+}
+
+# 音效聲道設定（語音管理）
+SOUND_VOICE_CONFIGS = {
+    "num_channels": 24,  # mixer 總聲道數
+    # 每個分類保留的聲道數（分類之間不會互相搶聲道）
+    "channel_groups": {
+        "weapons": 8,
+        "skills": 3,
+        "ui": 3,
+        "stingers": 2,  # 勝利、死亡等音樂提示音
+        "music": 2,  # 背景音樂（兩個聲道輪流使用以交叉淡入淡出）
+    },
+    "default_category": "ui",  # 音效沒有指定分類時使用
+    "default_max_voices": 2,  # 單一音效同時播放上限
+    "default_min_interval_ms": 0,  # 單一音效最短重播間隔（毫秒）
+}
+
+# 背景音樂設定
+MUSIC_CONFIGS = {
+    "crossfade_ms": 1500,  # 切換音樂時的交叉淡入淡出時間（毫秒）
+    "prefetch_levels": 1,  # 預先載入接下來幾關的音樂（每首整首解碼，約每分鐘 5 MB）
+}
+
+# AI 思考排程設定（敵人不必每幀重新規劃行為）
+AI_SCHEDULER_CONFIGS = {
+    "enabled": True,  # 關閉時所有敵人每幀思考（舊行為）
+    # 依 AI 難度的基本思考間隔（幀數），難度越高反應越快
+    "think_intervals": {"weak": 8, "medium": 4, "strong": 2},
+    # 依與玩家距離調整間隔倍率 [(距離上限, 倍率), ...]
+    "distance_bands": [(250, 1.0), (450, 2.0)],
+    "far_multiplier": 3.0,  # 超過所有距離區間時的倍率
+    "boss_think_interval": 1,  # BOSS 每幀思考
+}
+
+# 批次 AI 設定（大量敵人時以 NumPy 一次計算所有敵人的移動）
+BATCH_AI_CONFIGS = {
+    "enabled": True,  # 需要安裝 numpy
+    "min_enemies": 48,  # 敵人數量達到此門檻才使用批次計算
+}
+
+# 導航設定（場景有障礙物時敵人使用流場繞路）
+NAVIGATION_CONFIGS = {
+    "enabled": True,  # 關閉時敵人維持直線移動（障礙物仍會阻擋移動）
+    "cell_size": 40,  # 流場格子大小（像素）
+    "obstacle_color": (90, 80, 70),  # 障礙物顏色
+}
+
+# 輸入延遲追蹤設定（輸入事件到畫面顯示的時間）
+LATENCY_CONFIGS = {
+    "enabled": True,
+    "window": 240,  # 每種輸入保留最近幾筆延遲紀錄
+    "max_pending_ms": 1000,  # 輸入超過這個時間沒有產生效果就放棄追蹤
+    "overlay_key": pygame.K_F3,  # 切換效能面板的按鍵
+    "telemetry_file": "telemetry/latency.json",  # 遙測輸出路徑
+    "export_on_exit": True,  # 結束遊戲時輸出遙測（有延遲紀錄時才輸出）
+}
+
+# 事件過濾設定（每個狀態只讓需要的事件進入 SDL 佇列）
+EVENT_FILTER_CONFIGS = {
+    "enabled": True,
+    "coalesce_mouse_motion": True,  # 每幀只處理最後一個滑鼠移動事件
+    # 所有狀態都需要的事件
+    "base_events": [
+        pygame.QUIT,
+        pygame.KEYDOWN,
+        pygame.KEYUP,
+        # 放開按鈕和放開按鍵一樣不能擋：按鈕狀態只由事件更新，暫停時放開也要收到
+        pygame.MOUSEBUTTONUP,
+        pygame.WINDOWFOCUSLOST,
+        pygame.WINDOWFOCUSGAINED,
+        pygame.WINDOWMINIMIZED,
+        pygame.WINDOWRESTORED,
+        pygame.WINDOWHIDDEN,
+        pygame.WINDOWSHOWN,
+        pygame.WINDOWEXPOSED,
+    ],
+    # 各狀態額外需要的事件（沒有列出的狀態只使用 base_events）
+    "state_events": {
+        "menu": [pygame.MOUSEBUTTONDOWN],
+        "playing": [pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN],
+        "game_over": [pygame.MOUSEBUTTONDOWN],
+        "replay": [pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN],
+    },
+}
+
+# 閒置畫面節流設定（選單、暫停、視窗失去焦點或最小化時降低重繪和更新頻率）
+RENDER_THROTTLE_CONFIGS = {
+    "enabled": True,
+    "idle_after_ms": 1000,  # 最後一次輸入後多久進入閒置
+    "idle_fps": 10,  # 靜態畫面閒置時的更新頻率
+    "unfocused_fps": 5,  # 視窗失去焦點時的更新頻率
+    "hidden_fps": 2,  # 視窗最小化或隱藏時的更新頻率（不重繪）
+    "pause_on_focus_loss": True,  # 遊戲中視窗失去焦點時自動暫停
+}
+
+# 遊戲存檔設定（關卡開始時自動建立檢查點，重新開始關卡時直接還原）
+SNAPSHOT_CONFIGS = {
+    "checkpoint_on_level_start": True,
+    "save_file": "saves/quicksave.bas",  # 快速存檔路徑
+    "compress_level": 6,  # zlib 壓縮等級
+    "quick_save_key": pygame.K_F5,
+    "quick_load_key": pygame.K_F9,
+}
+
+# 重播設定（每場遊戲錄成一個重播檔：定期的完整狀態關鍵幀 + 壓縮的每幀輸入）
+REPLAY_CONFIGS = {
+    "enabled": True,
+    "directory": "replays",  # 重播檔存放的資料夾
+    "max_files": 20,  # 最多保留幾個重播檔，開始錄製時刪除最舊的（None 表示不限制）
+    "keyframe_interval": 300,  # 每幾幀存一個關鍵幀（跳轉時最多重新模擬這麼多幀）
+    "compress_level": 6,  # zlib 壓縮等級
+    "open_key": pygame.K_v,  # 在主選單觀看最近一場的重播
+    "seek_step_frames": FPS * 5,  # 左右方向鍵跳轉的幀數
+    "bar_height": 10,  # 時間軸高度
+    "bar_margin": 20,  # 時間軸左右和下方的邊距（下方的小地圖之下）
+}
+
+# 遊戲速度設定（慢動作除錯、快轉測試後面的關卡；None 表示不限速）
+TIME_SCALE_CONFIGS = {
+    "scales": [0.25, 0.5, 1, 2, 4, 10, None],
+    "slower_key": pygame.K_LEFTBRACKET,  # [ 放慢
+    "faster_key": pygame.K_RIGHTBRACKET,  # ] 加快
+    "reset_key": pygame.K_BACKSLASH,  # \ 回到正常速度
+    "max_steps_per_frame": 10,  # 固定倍率時每幀最多模擬的幀數
+    "uncapped_budget_ms": 14,  # 不限速時每幀用來模擬的時間
+    "uncapped_max_steps": 200,  # 不限速時每幀最多模擬的幀數
+    "skip_render_scale": 10,  # 達到這個倍率（或不限速）時降低重繪頻率
+    "fast_render_interval_ms": 200,  # 降低重繪頻率時的重繪間隔
+}
+
+# 畫面輸出設定（把重播逐幀輸出成 PNG 序列或原始影格，可以在沒有螢幕的機器上執行）
+EXPORT_CONFIGS = {
+    "directory": "exports",  # 輸出資料夾（每個重播一個子資料夾）
+    "image_format": "png",  # "png"：PNG 序列；"raw"：單一原始影格檔（搭配 ffmpeg 轉檔）
+    "queue_size": 8,  # 等待寫入的影格上限（同時也是畫面緩衝區的數量）
+}
+
+# 強化學習環境設定（無視窗模擬，訓練 AI 對手用）
+RL_CONFIGS = {
+    "character": "cat",  # 環境中玩家使用的角色
+    "difficulty": "easy",  # 關卡難度
+    "scene": "lava",  # 場景（決定障礙物）
+    "frame_skip": 4,  # 每個動作重複模擬的幀數
+    "max_episode_steps": 5000,  # 每回合最多的動作數（超過時截斷）
+    "nearest_enemies": 8,  # 觀察值包含最近的幾個敵人
+    "nearest_bullets": 16,  # 觀察值包含最近的幾顆敵人子彈
+    "aim_directions": 16,  # 瞄準方向的數量
+    "aim_distance": 200,  # 瞄準點和玩家中心的距離（像素）
+    "velocity_scale": 20,  # 子彈速度正規化的除數（像素/幀）
+    "reward_weights": {
+        "score": 0.01,  # 每得 1 分（擊殺 100 分 = 1.0）
+        "damage_taken": -0.02,  # 每失去 1 點生命值
+        "level_complete": 5.0,  # 每完成一關
+        "death": -5.0,  # 玩家死亡
+        "victory": 10.0,  # 完成所有關卡
+    },
+    "quiet_workers": True,  # 工作行程不輸出遊戲訊息（大量 print 會拖慢模擬）
+}
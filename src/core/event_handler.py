@@ -2,6 +2,8 @@
 import pygame
 from src.config import *
 from src.utils.sound_manager import get_sound_manager
+from src.utils.latency_tracker import latency_tracker
+from src.core.game_clock import game_clock
 
 ######################事件處理系統######################
 
@@ -15,6 +17,7 @@ class EventHandler:
     2. 滑鼠事件處理\n
     3. 系統事件處理（關閉視窗等）\n
     4. 不同遊戲狀態下的事件分發\n
+    5. 依遊戲狀態過濾 SDL 事件，合併同一幀的滑鼠移動事件\n
     """
 
     def __init__(self, game_engine):
@@ -26,42 +29,132 @@ class EventHandler:
         """
         self.game_engine = game_engine
 
+        # 目前套用事件過濾的狀態和允許的事件（狀態改變時重新設定）
+        self.filtered_state = None
+        self.allowed_events = set()
+
+        # 這一幀的事件數量統計
+        self.frame_event_counts = {"received": 0, "processed": 0, "coalesced": 0}
+
+        if EVENT_FILTER_CONFIGS["enabled"]:
+            # 遊戲不使用文字輸入，關閉後 SDL 不會產生 TEXTINPUT 事件
+            pygame.key.stop_text_input()
+            self._apply_event_filter(game_engine.state_manager.current_state)
+
+    def _apply_event_filter(self, state):
+        """
+        只允許目前狀態需要的事件進入 SDL 佇列\n
+        \n
+        參數:\n
+        state (str): 目前的遊戲狀態\n
+        """
+        allowed_events = set(EVENT_FILTER_CONFIGS["base_events"])
+        allowed_events.update(EVENT_FILTER_CONFIGS["state_events"].get(state, []))
+
+        newly_allowed = allowed_events - self.allowed_events
+        if self.filtered_state is None:
+            # 第一次設定時擋掉所有事件，再開放需要的事件
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed(list(allowed_events))
+        else:
+            # 之後只改變有差異的事件類型；擋掉事件類型時 SDL 會清除佇列中該類型的事件，
+            # 不能整個重設，否則狀態切換那一幀按下的按鍵會遺失
+            blocked_events = self.allowed_events - allowed_events
+            if blocked_events:
+                pygame.event.set_blocked(list(blocked_events))
+            if newly_allowed:
+                pygame.event.set_allowed(list(newly_allowed))
+        self.allowed_events = allowed_events
+        self.filtered_state = state
+
+        # 擋掉滑鼠移動期間的位置不會更新，重新允許時先同步一次
+        if pygame.MOUSEMOTION in newly_allowed and hasattr(
+            self.game_engine, "input_manager"
+        ):
+            self.game_engine.input_manager.mouse_pos = pygame.mouse.get_pos()
+
+    def _drain_events(self):
+        """
+        取出這一幀的所有事件，滑鼠移動只保留最後一個\n
+        \n
+        回傳:\n
+        list: 需要處理的事件\n
+        """
+        events = pygame.event.get()
+        received_count = len(events)
+
+        if EVENT_FILTER_CONFIGS["coalesce_mouse_motion"] and received_count > 1:
+            # 遊戲只需要最新的滑鼠位置，點擊事件本身帶有位置
+            last_motion = None
+            for event in events:
+                if event.type == pygame.MOUSEMOTION:
+                    last_motion = event
+            if last_motion is not None:
+                events = [
+                    event
+                    for event in events
+                    if event.type != pygame.MOUSEMOTION or event is last_motion
+                ]
+
+        self.frame_event_counts["received"] = received_count
+        self.frame_event_counts["processed"] = len(events)
+        self.frame_event_counts["coalesced"] = received_count - len(events)
+        return events
+
+    def get_overlay_lines(self):
+        """
+        取得效能面板顯示的事件統計\n
+        \n
+        回傳:\n
+        list: 要顯示的文字行\n
+        """
+        counts = self.frame_event_counts
+        return [
+            f"events: {counts['processed']}/{counts['received']} "
+            f"(merged {counts['coalesced']})"
+        ]
+
     def handle_events(self):
         """
         處理所有遊戲事件\n
         \n
-        包括按鍵輸入、視窗事件等\n
+        包括按鍵輸入、視窗事件等，同時用這些事件建立這一幀的輸入快照\n
         """
-        for event in pygame.event.get():
+        input_manager = self.game_engine.input_manager
+        input_manager.begin_frame()
+
+        state_manager = self.game_engine.state_manager
+        if (
+            EVENT_FILTER_CONFIGS["enabled"]
+            and state_manager.current_state != self.filtered_state
+        ):
+            self._apply_event_filter(state_manager.current_state)
+
+        for event in self._drain_events():
+            input_manager.process_event(event)
+            # 記錄輸入事件被取出的時間（量測輸入到畫面顯示的延遲）
+            latency_tracker.record_event(event)
+            self.game_engine.render_throttle.process_event(event)
+
             if event.type == pygame.QUIT:
                 self.game_engine.running = False
 
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                # 處理滑鼠點擊事件
-                self._handle_mouse_click(event.button, event.pos)
-
-            # 優先處理選擇界面事件
-            elif self.game_engine.state_manager.current_state in [
-                GAME_STATES["character_select"],
-                GAME_STATES["difficulty_select"],
-                GAME_STATES["scene_select"],
-            ]:
-                selection_result = self.game_engine.selection_ui.handle_input(event)
-                self._handle_selection_result(selection_result)
+            elif (
+                event.type == pygame.KEYDOWN
+                and event.key == LATENCY_CONFIGS["overlay_key"]
+            ):
+                # 任何狀態都可以切換效能面板
+                latency_tracker.toggle_overlay()
 
-            elif event.type == pygame.KEYDOWN:
-                self._handle_keydown(event.key)
+            else:
+                # 交給目前的狀態物件處理（狀態可能在處理事件時改變）
+                state_manager.active_state.handle_event(event)
 
-        # 處理連續按鍵
-        if (
-            self.game_engine.state_manager.current_state == GAME_STATES["playing"]
-            and self.game_engine.player
-        ):
-            self._handle_continuous_input()
+        input_manager.end_frame()
 
-    def _handle_mouse_click(self, button, pos):
+    def _handle_game_click(self, button, pos):
         """
-        處理滑鼠點擊事件\n
+        處理遊戲中的滑鼠點擊事件\n
         根據規格：\n
         - 射擊控制：滑鼠左鍵發射子彈\n
         - 重新開始：滑鼠右鍵重新開始遊戲\n
@@ -70,13 +163,12 @@ class EventHandler:
         button (int): 滑鼠按鈕（1=左鍵, 3=右鍵）\n
         pos (tuple): 滑鼠點擊位置\n
         """
-        current_state = self.game_engine.state_manager.current_state
-
-        if current_state == GAME_STATES["playing"] and self.game_engine.player:
+        if self.game_engine.player:
             if button == 1:  # 滑鼠左鍵 - 射擊
                 # 朝滑鼠位置射擊（準心正中心）
                 shot_data = self.game_engine.player.shoot(target_pos=pos)
                 if shot_data:
+                    latency_tracker.mark_effect("fire")
                     # 發射子彈
                     for bullet_info in shot_data["bullets"]:
                         self.game_engine.bullet_manager.create_bullet(
@@ -94,13 +186,6 @@ class EventHandler:
             elif button == 3:  # 滑鼠右鍵 - 重新開始遊戲
                 self.game_engine.start_new_game()
 
-        elif current_state == GAME_STATES["game_over"]:
-            if button == 3:  # 滑鼠右鍵 - 重新開始遊戲
-                self.game_engine.start_new_game()
-        elif current_state == GAME_STATES["menu"]:
-            if button == 3:  # 選單中也可以右鍵重啟（清除設定）
-                self.game_engine.reset_game_settings()
-
     def _handle_selection_result(self, result):
         """
         處理選擇界面的結果\n
@@ -145,24 +230,6 @@ class EventHandler:
             else:
                 print("❌ 進入倒數計時狀態失敗")
 
-    def _handle_keydown(self, key):
-        """
-        處理按鍵按下事件\n
-        \n
-        參數:\n
-        key: 按下的按鍵\n
-        """
-        current_state = self.game_engine.state_manager.current_state
-
-        if current_state == GAME_STATES["menu"]:
-            self._handle_menu_keys(key)
-        elif current_state == GAME_STATES["playing"]:
-            self._handle_game_keys(key)
-        elif current_state == GAME_STATES["paused"]:
-            self._handle_paused_keys(key)
-        elif current_state == GAME_STATES["game_over"]:
-            self._handle_game_over_keys(key)
-
     def _handle_menu_keys(self, key):
         """處理選單狀態的按鍵"""
         if key == pygame.K_SPACE:
@@ -175,6 +242,9 @@ class EventHandler:
             self.game_engine.enemy_difficulty = "medium"
         elif key == pygame.K_3:
             self.game_engine.enemy_difficulty = "strong"
+        elif key == REPLAY_CONFIGS["open_key"]:
+            # 觀看最近一場的重播
+            self.game_engine.open_replay()
         elif key == pygame.K_h:
             # 切換血量顯示模式
             if self.game_engine.health_display_mode == "bar":
@@ -197,6 +267,10 @@ class EventHandler:
 
     def _handle_game_keys(self, key):
         """處理遊戲中的按鍵"""
+        # 遊戲速度（[ 放慢、] 加快、\ 回到正常速度）
+        if self.game_engine.time_scale.handle_key(key):
+            return
+
         if key == pygame.K_ESCAPE:
             # ESC 暫停遊戲
             self.game_engine.state_manager.pause_game()
@@ -253,12 +327,26 @@ class EventHandler:
                 self.game_engine.game_ui.add_message(
                     "準心已關閉", "info", COLORS["orange"]
                 )
+        elif key == SNAPSHOT_CONFIGS["quick_save_key"]:
+            if self.game_engine.snapshot_manager.save_to_file():
+                self.game_engine.game_ui.add_message("遊戲已存檔", "info")
+        elif key == SNAPSHOT_CONFIGS["quick_load_key"]:
+            self._handle_quick_load()
         # 開發/測試用快捷鍵
         elif key == pygame.K_F1:
             self._spawn_boss_for_testing()
         elif key == pygame.K_F2:
             self._complete_level_for_testing()
 
+    def _handle_quick_load(self):
+        """處理讀取快速存檔"""
+        snapshot_manager = self.game_engine.snapshot_manager
+        data = snapshot_manager.load_from_file()
+        if data is not None and snapshot_manager.restore(data):
+            # 重播從讀取後的狀態繼續錄製
+            self.game_engine.replay_recorder.mark_discontinuity()
+            self.game_engine.game_ui.add_message("已讀取存檔", "info", COLORS["green"])
+
     def _handle_game_over_keys(self, key):
         """處理遊戲結束狀態的按鍵"""
         if key == pygame.K_r:
@@ -333,7 +421,7 @@ class EventHandler:
                     )
 
                 # 記錄技能啟動
-                self.game_engine.last_skill_activation = pygame.time.get_ticks()
+                self.game_engine.last_skill_activation = game_clock.get_ticks()
             else:
                 self.game_engine.game_ui.add_message(
                     skill_result["reason"], "info", COLORS["yellow"]
@@ -365,7 +453,7 @@ class EventHandler:
 
     def _spawn_boss_for_testing(self):
         """開發測試用：生成BOSS"""
-        if not any(e.enemy_type == "boss" for e in self.game_engine.enemies):
+        if self.game_engine.enemies.boss is None:
             from src.entities.enemy import Enemy
 
             boss_x = SCREEN_WIDTH // 2 - ENEMY_SIZE * 3 // 2
@@ -393,21 +481,28 @@ class EventHandler:
         - 移動控制：WASD 控制角色位置\n
         - 射擊準心：滑鼠移動準心，子彈命中位置為準心正中心\n
         - 技能方向：當技能啟動時，技能攻擊方向跟隨滑鼠位置\n
+        \n
+        按鍵和滑鼠狀態都從這一幀的輸入快照讀取\n
         """
-        keys = pygame.key.get_pressed()
-        mouse_pos = pygame.mouse.get_pos()
+        snapshot = self.game_engine.input_manager.snapshot
+        mouse_pos = snapshot.mouse_pos
 
         # 傳遞滑鼠位置，讓Player類別用於技能方向控制
         self.game_engine.player.handle_input(
-            keys, mouse_pos=mouse_pos, mouse_buttons=None
+            snapshot, mouse_pos=mouse_pos, mouse_buttons=None
         )
 
+        # 準心這一幀就會畫在新位置；角色有速度時這一幀就會移動
+        latency_tracker.mark_effect("aim")
+        if self.game_engine.player.velocity_x or self.game_engine.player.velocity_y:
+            latency_tracker.mark_effect("move")
+
         # 處理滑鼠射擊（左鍵連續按住時持續射擊）
-        mouse_buttons = pygame.mouse.get_pressed()
-        if mouse_buttons[0]:  # 滑鼠左鍵
+        if snapshot.mouse_buttons[0]:  # 滑鼠左鍵
             # 朝準心位置射擊
             shot_data = self.game_engine.player.shoot(target_pos=mouse_pos)
             if shot_data:
+                latency_tracker.mark_effect("fire")
                 # 發射子彈
                 for bullet_info in shot_data["bullets"]:
                     self.game_engine.bullet_manager.create_bullet(
@@ -0,0 +1,76 @@
+######################載入套件######################
+from src.config import *
+
+######################遊戲時鐘######################
+
+# 遊戲時間的起點（毫秒）：以 0 初始化的冷卻記錄（技能、射擊）在第一場遊戲開始時就已經就緒
+GAME_CLOCK_START_MS = 60000
+
+
+class GameClock:
+    """
+    遊戲時鐘 - 所有遊戲邏輯使用的時間軸（毫秒）\n
+    \n
+    遊戲物件記錄的時間（射擊時間、狀態效果、計時器、道具生成等）都以這個時鐘為準，\n
+    還原存檔時只要把時鐘設回存檔當時的時間，所有記錄的時間就仍然正確\n
+    \n
+    時鐘以固定步長前進：每模擬一幀前進 1000 / FPS 毫秒，和實際經過的時間無關，\n
+    所以同樣的起始狀態加上同樣的每幀輸入一定得到同樣的結果（重播依此重現遊戲過程），\n
+    暫停時不模擬，遊戲時間也就跟著停止\n
+    \n
+    使用方式:\n
+    game_clock.advance()  # 每模擬一幀呼叫一次\n
+    current_time = game_clock.get_ticks()  # 取代 pygame.time.get_ticks()\n
+    saved_time = game_clock.get_state()\n
+    game_clock.set_state(saved_time)  # 還原存檔時\n
+    """
+
+    def __init__(self, start_ms=GAME_CLOCK_START_MS):
+        """
+        初始化遊戲時鐘\n
+        \n
+        參數:\n
+        start_ms (int): 遊戲時間的起點（毫秒）\n
+        """
+        self.time_ms = float(start_ms)
+        self.frame_ms = 1000 / FPS  # 每幀前進的時間
+
+    def advance(self, frames=1):
+        """
+        讓遊戲時間前進指定的幀數\n
+        \n
+        參數:\n
+        frames (int): 模擬的幀數\n
+        """
+        self.time_ms += self.frame_ms * frames
+
+    def get_ticks(self):
+        """
+        取得目前的遊戲時間\n
+        \n
+        回傳:\n
+        int: 遊戲時間（毫秒）\n
+        """
+        return int(self.time_ms)
+
+    def get_state(self):
+        """
+        取得時鐘狀態（存檔用）\n
+        \n
+        回傳:\n
+        float: 目前的遊戲時間（毫秒，保留小數避免累積誤差）\n
+        """
+        return self.time_ms
+
+    def set_state(self, game_time):
+        """
+        還原時鐘狀態，之後的遊戲時間從存檔當時的時間繼續\n
+        \n
+        參數:\n
+        game_time (float): get_state() 取得的遊戲時間（毫秒）\n
+        """
+        self.time_ms = float(game_time)
+
+
+# 全域遊戲時鐘
+game_clock = GameClock()
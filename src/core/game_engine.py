@@ -1,6 +1,8 @@
 ######################載入套件######################
 import pygame
+import os
 import sys
+import time
 import random
 from src.config import *
 from src.entities.player import Player
@@ -8,12 +10,33 @@ from src.entities.enemy import Enemy
 from src.entities.bullet import BulletManager
 from src.entities.powerup import PowerUpManager
 from src.systems.collision import CollisionSystem
+from src.systems.ai_scheduler import AIScheduler
+from src.systems.batch_ai import BatchAI
+from src.systems.navigation import FlowField
+from src.systems.timer_scheduler import timer_scheduler
+from src.systems.damage_queue import damage_queue
+from src.systems.enemy_registry import EnemyRegistry
+from src.systems.world_context import WorldContext
 from src.ui.game_ui import GameUI
 from src.ui.selection_ui import SelectionUI
 from src.utils.font_manager import font_manager
+from src.utils.image_manager import image_manager
 from src.utils.sound_manager import get_sound_manager
+from src.utils.startup_profiler import startup_profiler
+from src.utils.latency_tracker import latency_tracker
+from src.utils.frame_exporter import FrameExporter
+from src.core.game_clock import game_clock
 from src.core.state_manager import StateManager
+from src.core.snapshot_manager import SnapshotManager
+from src.core.replay import (
+    ReplayRecorder,
+    ReplayReader,
+    ReplayPlayer,
+    find_latest_replay,
+)
 from src.core.event_handler import EventHandler
+from src.core.render_throttle import RenderThrottle
+from src.core.time_scale import TimeScaleController
 from src.core.input_manager import InputManager
 
 ######################主遊戲引擎######################
@@ -34,21 +57,39 @@ class GameEngine:
         """
         初始化遊戲引擎\n
         """
-        # 初始化pygame
-        pygame.init()
+        # 只初始化畫面和字體模組（pygame.init() 會同步開啟音效裝置，
+        # mixer 延到第一個選單畫面之後由 SoundManager 開啟）
+        with startup_profiler.section("pygame 畫面與字體模組"):
+            pygame.display.init()
+            pygame.font.init()
 
         # 建立遊戲視窗
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("BattleArena - 射擊對戰遊戲")
+        with startup_profiler.section("display"):
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("BattleArena - 射擊對戰遊戲")
 
-        # 時鐘控制
+        # 時鐘控制（第一次 tick 會啟動 SDL 計時器，pygame.time.get_ticks() 從這裡開始計時）
         self.clock = pygame.time.Clock()
+        self.clock.tick()
         self.running = True
 
+        # 啟動檢查模式：顯示第一個選單畫面後就結束
+        self.exit_after_first_frame = False
+
+        # 關卡切換幀的耗時紀錄（毫秒），用來確認切換時沒有卡頓
+        self.transition_frame_times = []
+        self.transition_frame_pending = False
+
         # 初始化核心系統
-        self.state_manager = StateManager(self)
-        self.event_handler = EventHandler(self)
-        self.input_manager = InputManager(self)
+        with startup_profiler.section("核心系統"):
+            self.state_manager = StateManager(self)
+            self.render_throttle = RenderThrottle()
+            self.time_scale = TimeScaleController()
+            self.snapshot_manager = SnapshotManager(self)
+            self.replay_recorder = ReplayRecorder(self)
+            self.replay_player = None  # 觀看重播時的播放器
+            self.event_handler = EventHandler(self)
+            self.input_manager = InputManager(self)
 
         # 遊戲設定（需在 _init_game_systems 之前定義）
         self.player_max_health = PLAYER_DEFAULT_HEALTH
@@ -70,6 +111,60 @@ class GameEngine:
         # 遊戲狀態變數
         self._init_game_state()
 
+        # 第一個選單畫面不需要的子系統，延後到畫面出現之後逐幀初始化
+        self._init_deferred_tasks()
+
+    def _init_deferred_tasks(self):
+        """
+        建立延後初始化工作清單\n
+        \n
+        這些子系統在第一個選單畫面用不到，所以在畫面出現後每幀執行一項，\n
+        在玩家進入對戰前就準備好，避免第一次射擊或進入對戰時卡頓\n
+        """
+        self.deferred_tasks = [
+            ("SoundManager（mixer 設定與音效）", get_sound_manager),
+            ("音效片段預先解碼", self._prewarm_sounds),
+            ("遊戲內 HUD 字體", self._preload_hud_fonts),
+            ("武器圖片", self._preload_weapon_images),
+        ]
+
+    def _prewarm_sounds(self):
+        """
+        預先解碼並切好所有音效片段，避免第一次射擊時解碼卡頓\n
+        """
+        get_sound_manager().prewarm_sounds()
+
+    def _preload_hud_fonts(self):
+        """
+        預先建立啟動時沒有載入的字體大小\n
+        """
+        for size_name in FONT_CONFIGS["sizes"]:
+            font_manager.get_font(size_name)
+
+    def _preload_weapon_images(self):
+        """
+        預先載入遊戲介面上顯示的武器圖片\n
+        """
+        for weapon_type in WEAPON_CONFIGS:
+            for size in ASSET_CACHE_CONFIGS["weapon_sizes"]:
+                image_manager.get_weapon_image(weapon_type, tuple(size))
+
+    def _run_deferred_tasks(self):
+        """
+        執行一項延後初始化工作（每幀呼叫）\n
+        \n
+        全部完成後印出啟動追蹤報告\n
+        """
+        if not self.deferred_tasks:
+            return
+
+        task_name, task = self.deferred_tasks.pop(0)
+        with startup_profiler.section(task_name, deferred=True):
+            task()
+
+        if not self.deferred_tasks and STARTUP_CONFIGS["print_report"]:
+            startup_profiler.print_report(STARTUP_CONFIGS["first_frame_budget_ms"])
+
     def _init_game_systems(self):
         """
         初始化所有遊戲系統\n
@@ -78,14 +173,24 @@ class GameEngine:
         self.bullet_manager = BulletManager()
         self.powerup_manager = PowerUpManager()
         self.collision_system = CollisionSystem()
+        self.ai_scheduler = AIScheduler()
+        self.batch_ai = BatchAI()
+        self.flow_field = FlowField(
+            SCREEN_WIDTH, SCREEN_HEIGHT, NAVIGATION_CONFIGS["cell_size"]
+        )
 
-        # UI系統
-        self.game_ui = GameUI(SCREEN_WIDTH, SCREEN_HEIGHT)
-        self.game_ui.set_health_display_mode(self.health_display_mode)
-        self.selection_ui = SelectionUI(SCREEN_WIDTH, SCREEN_HEIGHT)
+        # 每幀世界快照（在 update_game 中建立）
+        self.world = None
 
-        # 敵人管理
-        self.enemies = []
+        # UI系統
+        with startup_profiler.section("GameUI"):
+            self.game_ui = GameUI(SCREEN_WIDTH, SCREEN_HEIGHT)
+            self.game_ui.set_health_display_mode(self.health_display_mode)
+        with startup_profiler.section("SelectionUI"):
+            self.selection_ui = SelectionUI(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+        # 敵人管理（登錄表維護存活數量和 BOSS 參考）
+        self.enemies = EnemyRegistry()
         self.enemy_spawn_count = 1
         self.enemy_types_pool = ["robot", "alien", "zombie"]
         self.current_level_enemy_type = "zombie"
@@ -126,6 +231,10 @@ class GameEngine:
         self.state_manager.current_state = GAME_STATES["playing"]
         self.state_manager.state_change_time = pygame.time.get_ticks()
         self._init_game_state()
+        self.game_start_time = game_clock.get_ticks()
+
+        # 每場遊戲從正常速度開始（不沿用重播或上一場選的速度）
+        self.time_scale.reset()
 
         # 創建玩家（使用選擇的角色）
         # 創建玩家角色
@@ -149,6 +258,19 @@ class GameEngine:
         # if "scene" in level_config:
         #     self.selected_scene = level_config["scene"]
         self.enemies.clear()
+        damage_queue.clear()
+
+        # 上一場的計時器（強化效果、道具消失、訊息淡出）和訊息不帶進新的一場，
+        # 否則會連同它們參考的舊物件一起存進檢查點和重播的關鍵幀
+        timer_scheduler.set_state([])
+        self.game_ui.messages.clear()
+
+        # 載入場景的靜態障礙物（流場在玩家換格子時才重新計算）
+        scene_config = SCENE_CONFIGS.get(self.selected_scene, {})
+        self.flow_field.set_obstacles(scene_config.get("obstacles", []))
+
+        # 固定這場對戰會用到的圖片，避免被快取淘汰後在對戰中重新解碼
+        image_manager.pin_match_assets(self.selected_scene, self.selected_character)
 
         # 創建初始敵人
         self._spawn_enemy()
@@ -157,10 +279,17 @@ class GameEngine:
         self.bullet_manager.clear_all_bullets()
         self.powerup_manager.clear_all_powerups()
 
-        # 檢查是否是第3關並播放專用音樂
-        if self.current_level == 3:
-            get_sound_manager().play_level3_boss_music()
-            print("播放第3關BOSS音樂")
+        # 排入這一關的背景音樂，並在背景預先載入下一關的音樂
+        get_sound_manager().music_service.request_level_music(
+            self.selected_difficulty, self.current_level
+        )
+        self.mark_transition_frame()
+
+        # 建立關卡開始的檢查點，重新開始關卡時直接還原
+        self.snapshot_manager.create_checkpoint()
+
+        # 每場遊戲錄成一個重播檔（上一場的重播在這裡完成）
+        self.replay_recorder.start()
 
         # 顯示遊戲開始訊息
         level_config = LEVEL_CONFIGS[self.selected_difficulty][self.current_level]
@@ -176,7 +305,20 @@ class GameEngine:
         重新開始當前關卡\n
         \n
         保持當前角色、難度、場景設定，重置關卡進度\n
+        有關卡開始的檢查點時直接還原檢查點，不重新建立遊戲物件\n
         """
+        if self.snapshot_manager.restore_checkpoint():
+            stats = self.snapshot_manager.get_stats()
+            print(
+                f"🔄 重新開始當前關卡 - 已還原檢查點（{stats['last_restore_us']:.0f} µs）"
+            )
+            self.replay_recorder.mark_discontinuity()
+            level_config = LEVEL_CONFIGS[self.selected_difficulty][self.current_level]
+            self.game_ui.add_message(
+                f"重新開始 - {level_config['name']}", "info", COLORS["blue"]
+            )
+            return
+
         # 重置關卡相關狀態
         self.level_enemies_killed = 0
         self.game_completed = False
@@ -197,8 +339,9 @@ class GameEngine:
                     "max_ammo"
                 ]
 
-        # 清空敵人和子彈
+        # 清空敵人、子彈和尚未結算的傷害
         self.enemies.clear()
+        damage_queue.clear()
         self.bullet_manager.clear_all_bullets()
         self.powerup_manager.clear_all_powerups()
 
@@ -210,6 +353,7 @@ class GameEngine:
         self.state_manager.current_state = GAME_STATES["playing"]
         self.state_manager.state_change_time = pygame.time.get_ticks()
         print("🔄 重新開始當前關卡 - 強制回到遊戲狀態")
+        self.replay_recorder.mark_discontinuity()
 
         # 顯示重新開始訊息
         level_config = LEVEL_CONFIGS[self.selected_difficulty][self.current_level]
@@ -229,10 +373,11 @@ class GameEngine:
         self.level_enemies_killed = 0
         self.game_completed = False
 
-        # 清空遊戲物件
+        # 清空遊戲物件和上一場的計時器
         self.enemies.clear()
         self.bullet_manager.clear_all_bullets()
         self.powerup_manager.clear_all_powerups()
+        timer_scheduler.set_state([])
 
         # 重置玩家
         self.player = None
@@ -264,10 +409,11 @@ class GameEngine:
         self.selected_difficulty = "easy"
         self.selected_scene = "lava"
 
-        # 清空遊戲物件
+        # 清空遊戲物件和上一場的計時器
         self.enemies.clear()
         self.bullet_manager.clear_all_bullets()
         self.powerup_manager.clear_all_powerups()
+        timer_scheduler.set_state([])
 
         # 重置玩家
         self.player = None
@@ -302,10 +448,11 @@ class GameEngine:
         # 重置場景為預設值（保持角色和難度選擇）
         self.selected_scene = "lava"
 
-        # 清空遊戲物件
+        # 清空遊戲物件和上一場的計時器
         self.enemies.clear()
         self.bullet_manager.clear_all_bullets()
         self.powerup_manager.clear_all_powerups()
+        timer_scheduler.set_state([])
 
         # 重置玩家
         self.player = None
@@ -353,7 +500,7 @@ class GameEngine:
             killed = self.level_enemies_killed
 
             # 檢查是否已經有BOSS存在
-            boss_exists = any(e.enemy_type == "boss" for e in self.enemies)
+            boss_exists = self.enemies.boss is not None
 
             # 當殺死足夠的普通敵人且還沒有BOSS時，生成BOSS
             if killed >= normal_enemy_count and not boss_exists:
@@ -380,29 +527,43 @@ class GameEngine:
     def update_game(self):
         """
         更新遊戲邏輯（每幀呼叫）\n
+        \n
+        交給目前的狀態物件更新，暫停和選單等不需要模擬的狀態直接略過，\n
+        遊戲中和重播依遊戲速度在一個畫面幀內模擬多幀（或隔幾個畫面幀才模擬一幀）\n
         """
-        # 處理倒數計時狀態
-        if self.state_manager.is_state("countdown"):
-            self._update_countdown()
+        state = self.state_manager.active_state
+        if not state.needs_simulation:
             return
-
-        # 處理暫停狀態 - 暫停時不更新遊戲邏輯
-        if self.state_manager.is_state("paused"):
+        if not state.time_scaled:
+            state.update()
             return
 
-        if not self.state_manager.is_state("playing"):
-            return
+        # 依遊戲速度模擬 0 到多幀，狀態改變（遊戲結束、暫停）時停止
+        self.time_scale.run_steps(
+            state.update, lambda: self.state_manager.active_state is state
+        )
+
+    def _update_playing(self):
+        """
+        更新遊戲進行中的邏輯（PlayingState 每幀呼叫）\n
+        """
+        # 處理排入的背景音樂切換（音樂準備好才切換）
+        if get_sound_manager().music_service.update():
+            self.mark_transition_frame()
 
-        # 更新輸入管理器
-        self.input_manager.update_input_state()
+        # 遊戲時鐘前進一幀（固定步長，重播時才能重現同樣的結果）
+        game_clock.advance()
 
         # 更新遊戲時間
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         self.game_stats["game_time"] = (current_time - self.game_start_time) / 1000
 
+        # 觸發已到期的計時事件（狀態效果、強化效果、技能結束、訊息淡出、道具消失）
+        timer_scheduler.update(current_time)
+
         # 更新玩家
         if self.player and self.player.is_alive:
-            self.player.update(SCREEN_WIDTH, SCREEN_HEIGHT)
+            self.player.update(SCREEN_WIDTH, SCREEN_HEIGHT, self.active_flow_field)
         else:
             if not self.game_completed:
                 self.state_manager.change_state("game_over")
@@ -413,6 +574,16 @@ class GameEngine:
             self.state_manager.change_state("game_over")
             return
 
+        # 玩家換到不同格子時重新計算流場（所有敵人共用同一張流場）
+        if self.active_flow_field is not None and NAVIGATION_CONFIGS["enabled"]:
+            self.flow_field.update(
+                self.player.x + self.player.width / 2,
+                self.player.y + self.player.height / 2,
+            )
+
+        # 建立這一幀的世界快照（玩家中心、預測位置、存活敵人、BOSS、流場），供各系統共用
+        self.world = WorldContext(self.player, self.enemies, self.active_flow_field)
+
         # 處理技能持續效果
         self._update_skill_effects()
 
@@ -420,28 +591,133 @@ class GameEngine:
         self._update_enemies()
 
         # 更新子彈
-        self.bullet_manager.update(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.bullet_manager.update(SCREEN_WIDTH, SCREEN_HEIGHT, self.world)
 
         # 更新驚喜包
-        self.powerup_manager.update(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.powerup_manager.update(
+            SCREEN_WIDTH, SCREEN_HEIGHT, self.active_flow_field
+        )
 
         # 處理碰撞
         collision_results = self.collision_system.check_all_collisions(
             self.player, self.enemies, self.bullet_manager, self.powerup_manager
         )
 
+        # 一次結算這一幀的所有傷害（子彈、雷射、燃燒），擊殺只計算一次
+        self._resolve_damage()
+
         # 處理碰撞結果
         self._process_collision_results(collision_results)
 
-        # 更新UI
-        self.game_ui.update()
-
         # AI增殖機制
         self._manage_enemy_spawning()
 
         # 檢查關卡完成條件
         self._check_level_completion()
 
+    def open_replay(self, file_path=None):
+        """
+        開啟重播檔並切換到重播觀看狀態\n
+        \n
+        參數:\n
+        file_path (str): 重播檔路徑，None 時開啟最近一場的重播\n
+        \n
+        回傳:\n
+        bool: 是否成功開啟\n
+        """
+        # 還在錄製的重播先完成，才能讀取
+        self.replay_recorder.stop()
+
+        if file_path is None:
+            file_path = find_latest_replay()
+        if file_path is None:
+            print("⚠️ 沒有可以觀看的重播")
+            return False
+
+        try:
+            reader = ReplayReader(file_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 無法開啟重播檔: {e}")
+            return False
+
+        self.replay_player = ReplayPlayer(self, reader)
+        if not self.replay_player.seek(0):
+            print(f"⚠️ 無法開啟重播檔: {file_path}")
+            self.replay_player.close()
+            self.replay_player = None
+            return False
+        print(
+            f"🎬 開啟重播: {file_path}（{reader.frame_count} 幀，"
+            f"{reader.chunk_count} 個關鍵幀）"
+        )
+        return self.state_manager.change_state("replay")
+
+    def export_replay(
+        self, file_path=None, output_dir=None, image_format=None, frame_range=None
+    ):
+        """
+        把重播逐幀繪製到離屏畫面並輸出成檔案（不需要螢幕，速度不受幀率限制）\n
+        \n
+        參數:\n
+        file_path (str): 重播檔路徑，None 時使用最近一場的重播\n
+        output_dir (str): 輸出資料夾，None 時使用 EXPORT_CONFIGS 的資料夾加上重播檔名\n
+        image_format (str): "png" 或 "raw"，None 時使用 EXPORT_CONFIGS 的設定\n
+        frame_range (tuple): (開始幀, 結束幀)，None 時輸出整段重播\n
+        \n
+        回傳:\n
+        bool: 是否成功輸出\n
+        """
+        if not self.open_replay(file_path):
+            return False
+
+        replay_player = self.replay_player
+        start_frame, end_frame = frame_range or (0, replay_player.frame_count)
+        end_frame = min(end_frame, replay_player.frame_count)
+        if output_dir is None:
+            replay_name = os.path.splitext(
+                os.path.basename(replay_player.reader.file_path)
+            )[0]
+            output_dir = os.path.join(EXPORT_CONFIGS["directory"], replay_name)
+
+        try:
+            exporter = FrameExporter(output_dir, image_format)
+            exporter.start()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 無法開始輸出: {e}")
+            self.state_manager.change_state("menu")
+            return False
+
+        # 輸出時不播放音效，畫面改畫到輸出用的離屏畫面
+        sound_manager = get_sound_manager()
+        sound_manager.muted = True
+        display_surface = self.screen
+        try:
+            success = replay_player.seek(start_frame)
+            if success:
+                print(f"🎞️ 開始輸出重播影格 {start_frame}-{end_frame} 到 {output_dir}")
+            while success:
+                self.screen = exporter.acquire_surface()
+                self._draw_game()
+                exporter.submit(self.screen)
+                if replay_player.current_frame >= end_frame:
+                    break
+                # 區塊損壞時停止輸出
+                success = replay_player.step()
+        except OSError as e:
+            print(f"⚠️ 輸出中斷: {e}")
+            success = False
+        finally:
+            self.screen = display_surface
+            sound_manager.muted = False
+            stats = exporter.close(replay_player.reader.fps)
+            self.state_manager.change_state("menu")
+
+        print(
+            f"🎞️ 已輸出 {stats['frames_written']} 個影格（{stats['fps']:.0f} 幀/秒，"
+            f"等待寫檔 {stats['wait_s']:.2f} 秒）"
+        )
+        return success and stats["error"] is None
+
     def _update_countdown(self):
         """
         更新倒數計時邏輯\n
@@ -457,14 +733,32 @@ class GameEngine:
         """
         更新敵人狀態\n
         """
-        level_config = LEVEL_CONFIGS[self.selected_difficulty][self.current_level]
-        enemies_killed_this_frame = 0
-        for enemy in self.enemies[:]:
+        self.ai_scheduler.begin_frame()
+
+        # 敵人數量多時改用批次 AI 一次計算所有敵人的移動
+        use_batch_ai = self.batch_ai.is_active(len(self.enemies))
+        if use_batch_ai:
+            self.batch_ai.update(
+                self.enemies,
+                self.player,
+                self.ai_scheduler,
+                SCREEN_WIDTH,
+                SCREEN_HEIGHT,
+                self.world.flow_field,
+            )
+
+        # 死亡的敵人在 _resolve_damage 中計分並移除
+        for enemy in self.enemies:
             if enemy.is_alive:
-                enemy.update(self.player, SCREEN_WIDTH, SCREEN_HEIGHT)
+                if not use_batch_ai:
+                    # 只有輪到思考的敵人重新規劃行為，其他敵人沿用上次的移動方向
+                    think = self.ai_scheduler.should_think(enemy, self.player)
+                    enemy.update(
+                        self.player, SCREEN_WIDTH, SCREEN_HEIGHT, think, self.world
+                    )
 
                 # 敵人射擊
-                shot_data = enemy.shoot(self.player)
+                shot_data = enemy.shoot(self.player, self.world)
                 if shot_data:
                     if isinstance(shot_data, list):
                         for s in shot_data:
@@ -485,35 +779,60 @@ class GameEngine:
                             shot_data["damage"],
                             shot_data.get("owner", "enemy"),
                         )
-            else:
-                # 移除死亡的敵人
-                self.enemies.remove(enemy)
-                self.game_stats["enemies_killed"] += 1
-                self.level_enemies_killed += 1
-                self.score += 100
-                enemies_killed_this_frame += 1
-
-                # 檢查是否為BOSS
-                if enemy.enemy_type == "boss":
-                    # BOSS死亡時生成勝利星星
-                    print(f"BOSS已被擊敗！在位置 ({enemy.x}, {enemy.y}) 生成勝利星星")
-                    self.powerup_manager.spawn_victory_star_on_boss_death(
-                        enemy.x, enemy.y
-                    )
-                    self.game_ui.add_message(
-                        "BOSS 已被擊敗！", "achievement", COLORS["purple"]
-                    )
-                    self.game_ui.add_message(
-                        "找到並收集勝利星星以獲得勝利！", "info", COLORS["yellow"]
-                    )
-                else:
-                    # 一般敵人死亡時可能掉落道具
-                    self.powerup_manager.spawn_powerup_on_enemy_death(enemy.x, enemy.y)
-                    print(
-                        f"擊敗 {enemy.enemy_type} 敵人，關卡進度: {self.level_enemies_killed + 1}/{level_config.get('enemy_count', 0)}"
-                    )
 
-                self.game_ui.add_message(f"+100 分", "achievement", COLORS["yellow"])
+    def _resolve_damage(self):
+        """
+        結算這一幀排入的所有傷害，處理擊殺並一次移除死亡的敵人\n
+        \n
+        回傳:\n
+        list: 這一幀的擊殺紀錄 [(敵人, 傷害來源), ...]\n
+        """
+        kills = damage_queue.resolve()
+
+        for enemy, source in kills:
+            # 只計算仍在場上的敵人（換關時清掉的敵人可能還有燃燒傷害）
+            if enemy in self.enemies:
+                self.enemies.mark_dead(enemy)
+                self._handle_enemy_kill(enemy, source)
+
+        # 一次移除所有死亡的敵人
+        self.enemies.compact()
+
+        return kills
+
+    def _handle_enemy_kill(self, enemy, source):
+        """
+        處理敵人被擊殺：計分、統計、掉落道具和訊息（每個敵人只處理一次）\n
+        \n
+        參數:\n
+        enemy: 被擊殺的敵人\n
+        source (str): 造成擊殺的傷害來源（'bullet', 'laser', 'burn'）\n
+        """
+        level_config = LEVEL_CONFIGS[self.selected_difficulty][self.current_level]
+        self.game_stats["enemies_killed"] += 1
+        self.level_enemies_killed += 1
+        self.score += 100
+
+        if source == "bullet":
+            self.game_ui.add_message("敵人被擊敗！", "achievement", COLORS["green"])
+
+        # 檢查是否為BOSS
+        if enemy.enemy_type == "boss":
+            # BOSS死亡時生成勝利星星
+            print(f"BOSS已被擊敗！在位置 ({enemy.x}, {enemy.y}) 生成勝利星星")
+            self.powerup_manager.spawn_victory_star_on_boss_death(enemy.x, enemy.y)
+            self.game_ui.add_message("BOSS 已被擊敗！", "achievement", COLORS["purple"])
+            self.game_ui.add_message(
+                "找到並收集勝利星星以獲得勝利！", "info", COLORS["yellow"]
+            )
+        else:
+            # 一般敵人死亡時可能掉落道具
+            self.powerup_manager.spawn_powerup_on_enemy_death(enemy.x, enemy.y)
+            print(
+                f"擊敗 {enemy.enemy_type} 敵人，關卡進度: {self.level_enemies_killed}/{level_config.get('enemy_count', 0)}"
+            )
+
+        self.game_ui.add_message(f"+100 分", "achievement", COLORS["yellow"])
 
     def _update_skill_effects(self):
         """
@@ -533,19 +852,13 @@ class GameEngine:
         damage_per_second = self.player.get_skill_damage_per_second()
         damage_per_frame = damage_per_second / 60  # 假設60 FPS
 
-        # 對範圍內的敵人造成持續傷害
+        # 對範圍內的敵人排入持續傷害（擊殺在 _resolve_damage 中統一計分）
         enemies_hit = 0
-        for enemy in self.enemies:
-            if self.player.can_deal_skill_damage_to_enemy(enemy):
-                enemy.take_damage(damage_per_frame)
+        for enemy in self.world.alive_enemies:
+            if self.player.can_deal_skill_damage_to_enemy(enemy, self.world):
+                damage_queue.add(enemy, damage_per_frame, "laser")
                 enemies_hit += 1
 
-                # 如果敵人被擊殺，計分
-                if not enemy.is_alive:
-                    self.score += 100
-                    self.game_stats["enemies_killed"] += 1
-                    self.level_enemies_killed += 1
-
         # 更新統計
         if enemies_hit > 0:
             self.game_stats.setdefault("laser_hits", 0)
@@ -556,7 +869,7 @@ class GameEngine:
         管理敵人生成\n
         """
         if not self.game_completed:
-            current_enemy_count = len([e for e in self.enemies if e.is_alive])
+            current_enemy_count = self.enemies.alive_count
             level_config = LEVEL_CONFIGS[self.selected_difficulty][self.current_level]
 
             # 對於BOSS關卡，只計算普通敵人
@@ -567,7 +880,7 @@ class GameEngine:
                 )
 
                 # 檢查是否已經有BOSS
-                boss_exists = any(e.enemy_type == "boss" for e in self.enemies)
+                boss_exists = self.enemies.boss is not None
 
                 # 如果還需要普通敵人且沒有太多敵人在場上
                 if remaining_enemies_needed > 0 and not boss_exists:
@@ -600,9 +913,7 @@ class GameEngine:
 
         # BOSS 關卡檢查
         if level_config.get("boss", False):
-            boss_alive = any(
-                e.enemy_type == "boss" and e.is_alive for e in self.enemies
-            )
+            boss_alive = self.enemies.boss is not None
 
             # 普通敵人的目標數量
             normal_enemy_count = level_config.get("enemy_count", 0)
@@ -666,10 +977,11 @@ class GameEngine:
                 #     self.selected_scene = next_level_config["scene"]
                 self.enemies.clear()
 
-                # 檢查是否進入第3關並播放專用音樂
-                if self.current_level == 3:
-                    get_sound_manager().play_level3_boss_music()
-                    print("進入第3關！播放BOSS音樂")
+                # 排入下一關的背景音樂（已在上一關開始時預先載入，不會阻塞）
+                get_sound_manager().music_service.request_level_music(
+                    self.selected_difficulty, self.current_level
+                )
+                self.mark_transition_frame()
 
                 self.game_ui.add_message(
                     f"{next_level_config['name']}", "achievement", COLORS["blue"]
@@ -677,6 +989,9 @@ class GameEngine:
                 self.game_ui.add_message(
                     f"{next_level_config['description']}", "info", COLORS["yellow"]
                 )
+
+                # 建立新關卡開始的檢查點
+                self.snapshot_manager.create_checkpoint()
             else:
                 self.game_completed = True
                 self.enemies.clear()
@@ -693,8 +1008,6 @@ class GameEngine:
 
         for hit_info in results["enemies_hit"]:
             self.game_stats["shots_hit"] += hit_info["bullets_count"]
-            if hit_info["killed"]:
-                self.game_ui.add_message("敵人被擊敗！", "achievement", COLORS["green"])
 
         for powerup_info in results["powerups_collected"]:
             self.game_stats["powerups_collected"] += 1
@@ -707,27 +1020,24 @@ class GameEngine:
         """
         渲染當前遊戲狀態\n
         """
-        current_state = self.state_manager.get_current_state()
-
-        if current_state == GAME_STATES["menu"]:
-            self._draw_menu()
-        elif current_state in [
-            GAME_STATES["character_select"],
-            GAME_STATES["difficulty_select"],
-            GAME_STATES["scene_select"],
-        ]:
-            self.selection_ui.draw(self.screen)
-        elif current_state == GAME_STATES["countdown"]:
-            self._draw_countdown()
-        elif current_state == GAME_STATES["playing"]:
-            self._draw_game()
-        elif current_state == GAME_STATES["paused"]:
-            self._draw_paused()
-        elif current_state == GAME_STATES["game_over"]:
-            self._draw_game_over()
+        self.state_manager.active_state.render(self.screen)
+
+        # 效能面板（F3 切換，面板關閉時不收集統計）
+        if latency_tracker.overlay_visible:
+            latency_tracker.draw_overlay(
+                self.screen,
+                self.clock.get_fps(),
+                self.event_handler.get_overlay_lines()
+                + self.time_scale.get_overlay_lines()
+                + image_manager.get_overlay_lines()
+                + get_sound_manager().get_overlay_lines(),
+            )
 
         pygame.display.flip()
 
+        # 畫面已送出，記錄這一幀完成的輸入延遲
+        latency_tracker.mark_present()
+
     def _draw_menu(self):
         """
         繪製主選單\n
@@ -751,7 +1061,7 @@ class GameEngine:
         # 選單項目
         menu_items = [
             "按 SPACE 開始選擇角色",
-            "",
+            "按 V 觀看最近一場的重播",
             "遊戲設定:",
             f"AI難度: {AI_CONFIGS[self.enemy_difficulty]['name']} (按 1/2/3 切換)",
             f"玩家血量: {self.player_max_health} (+/-調整)",
@@ -828,6 +1138,9 @@ class GameEngine:
             print(f"場景背景設置錯誤: {e}, 使用預設黑色背景")
             self.screen.fill(COLORS["black"])
 
+        # 繪製場景障礙物
+        self.flow_field.draw(self.screen)
+
         # 繪製遊戲物件
         if self.player:
             self.player.draw(self.screen)
@@ -853,6 +1166,10 @@ class GameEngine:
             self.bullet_manager,
         )
 
+        # 不是正常速度時顯示目前的倍率
+        if self.time_scale.scale != 1:
+            self.game_ui.draw_time_scale(self.screen, self.time_scale.get_label())
+
     def _draw_game_over(self):
         """
         繪製遊戲結束畫面\n
@@ -1010,22 +1327,88 @@ class GameEngine:
             )
             self.screen.blit(info_surface, info_rect)
 
+    @property
+    def active_flow_field(self):
+        """
+        目前場景使用的流場（場景沒有障礙物時為 None，敵人維持直線移動）\n
+        """
+        if self.flow_field.has_obstacles:
+            return self.flow_field
+        return None
+
+    def mark_transition_frame(self):
+        """
+        標記目前這一幀包含關卡或音樂切換，幀結束時記錄耗時\n
+        """
+        self.transition_frame_pending = True
+
+    def _record_transition_frame(self, frame_start):
+        """
+        記錄關卡切換幀的耗時（事件處理 + 更新 + 渲染）\n
+        \n
+        參數:\n
+        frame_start (float): 這一幀開始的 time.perf_counter() 時間\n
+        """
+        frame_ms = (time.perf_counter() - frame_start) * 1000
+        self.transition_frame_times.append(frame_ms)
+        self.transition_frame_pending = False
+        print(
+            f"📊 關卡切換幀耗時: {frame_ms:.1f} ms（一般幀預算 {1000 / FPS:.1f} ms）"
+        )
+
     def run(self):
         """
         主遊戲迴圈\n
         """
         while self.running:
+            frame_start = time.perf_counter()
+
             # 處理事件
             self.event_handler.handle_events()
 
             # 更新遊戲邏輯
             self.update_game()
 
-            # 渲染畫面
-            self.render()
+            # 渲染畫面（靜態畫面沒有變化、視窗隱藏、高倍率快轉時略過）
+            active_state = self.state_manager.active_state
+            if (
+                not active_state.time_scaled or self.time_scale.should_render()
+            ) and self.render_throttle.should_render(
+                active_state, latency_tracker.overlay_visible
+            ):
+                self.render()
+
+            if self.transition_frame_pending:
+                self._record_transition_frame(frame_start)
 
-            # 控制幀率
-            self.clock.tick(FPS)
+            # 記錄第一個可互動選單畫面，之後逐幀執行延後初始化
+            if startup_profiler.first_frame_ms is None:
+                startup_profiler.mark_first_frame()
+                if self.exit_after_first_frame:
+                    startup_profiler.print_report(
+                        STARTUP_CONFIGS["first_frame_budget_ms"]
+                    )
+                    self.running = False
+            else:
+                self._run_deferred_tasks()
+
+            # 控制幀率（閒置、失去焦點或隱藏時降低）
+            self.clock.tick(self.render_throttle.get_tick_rate(active_state))
+
+        # 完成還在錄製的重播檔
+        self.replay_recorder.stop()
+
+        # 輸出輸入延遲遙測
+        if (
+            LATENCY_CONFIGS["export_on_exit"]
+            and latency_tracker.total_samples > 0
+        ):
+            latency_tracker.export_telemetry(
+                extra_stats={
+                    "image_cache": image_manager.get_cache_stats(),
+                    "voices": get_sound_manager().get_voice_stats(),
+                }
+            )
 
         # 清理並退出
         pygame.quit()
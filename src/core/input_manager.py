@@ -2,6 +2,92 @@
 import pygame
 from src.config import *
 
+######################輸入快照######################
+
+# 滑鼠按鈕編號（pygame 事件的 1, 2, 3）對應到 mouse_buttons 的索引
+MOUSE_BUTTON_INDEXES = {1: 0, 2: 1, 3: 2}
+
+
+class InputSnapshot:
+    """
+    每幀輸入快照 - 由這一幀的 KEYDOWN/KEYUP/滑鼠事件建立，所有系統唯讀使用\n
+    \n
+    只記錄 KEYS 中對應的按鍵，可以用 snapshot[key_code] 取代\n
+    pygame.key.get_pressed() 的結果；也可以轉成紀錄格式供錄製和重播使用\n
+    """
+
+    __slots__ = (
+        "keys_pressed",
+        "keys_just_pressed",
+        "keys_just_released",
+        "mouse_pos",
+        "mouse_buttons",
+        "mouse_just_pressed",
+    )
+
+    def __init__(
+        self,
+        keys_pressed=(),
+        keys_just_pressed=(),
+        keys_just_released=(),
+        mouse_pos=(0, 0),
+        mouse_buttons=(False, False, False),
+        mouse_just_pressed=(),
+    ):
+        """
+        建立輸入快照\n
+        \n
+        參數:\n
+        keys_pressed: 按住中的按鍵代碼\n
+        keys_just_pressed: 這一幀剛按下的按鍵代碼\n
+        keys_just_released: 這一幀剛放開的按鍵代碼\n
+        mouse_pos (tuple): 滑鼠位置\n
+        mouse_buttons (tuple): 三個滑鼠按鈕是否按住\n
+        mouse_just_pressed: 這一幀剛按下的滑鼠按鈕索引\n
+        """
+        self.keys_pressed = frozenset(keys_pressed)
+        self.keys_just_pressed = frozenset(keys_just_pressed)
+        self.keys_just_released = frozenset(keys_just_released)
+        self.mouse_pos = tuple(mouse_pos)
+        self.mouse_buttons = tuple(mouse_buttons)
+        self.mouse_just_pressed = frozenset(mouse_just_pressed)
+
+    def __getitem__(self, key_code):
+        """
+        和 pygame.key.get_pressed() 相同的用法：snapshot[pygame.K_w]\n
+        """
+        return key_code in self.keys_pressed
+
+    def to_record(self):
+        """
+        轉成可序列化的紀錄（錄製輸入使用）\n
+        \n
+        回傳:\n
+        tuple: 只包含數字和 tuple 的紀錄\n
+        """
+        return (
+            tuple(sorted(self.keys_pressed)),
+            tuple(sorted(self.keys_just_pressed)),
+            tuple(sorted(self.keys_just_released)),
+            self.mouse_pos,
+            self.mouse_buttons,
+            tuple(sorted(self.mouse_just_pressed)),
+        )
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        從錄製的紀錄還原快照（重播輸入使用）\n
+        \n
+        參數:\n
+        record (tuple): to_record() 產生的紀錄\n
+        \n
+        回傳:\n
+        InputSnapshot: 還原的快照\n
+        """
+        return cls(*record)
+
+
 ######################輸入管理系統######################
 
 
@@ -10,10 +96,17 @@ class InputManager:
     輸入管理系統 - 統一處理各種輸入設備的控制\n
     \n
     此系統負責：\n
-    1. 鍵盤輸入的統一處理\n
-    2. 滑鼠輸入的統一處理\n
+    1. 從 EventHandler 取出的事件更新鍵盤和滑鼠狀態（不再每幀掃描所有按鍵）\n
+    2. 每幀建立一份輸入快照，所有系統都讀取這份快照\n
     3. 輸入映射和自訂按鍵支援\n
-    4. 輸入狀態的快取和管理\n
+    4. 視窗失去焦點時清除按住的按鍵，避免角色一直移動\n
+    5. 錄製每幀的輸入快照，供重播使用\n
+    \n
+    使用方式（每幀）:\n
+    input_manager.begin_frame()\n
+    for event in pygame.event.get():\n
+        input_manager.process_event(event)\n
+    input_manager.end_frame()  # 建立 input_manager.snapshot\n
     """
 
     def __init__(self, game_engine):
@@ -29,15 +122,23 @@ class InputManager:
         self.keys_pressed = set()
         self.keys_just_pressed = set()
         self.keys_just_released = set()
-        self.previous_keys = pygame.key.get_pressed()
 
         # 滑鼠狀態
-        self.mouse_pos = (0, 0)
+        self.mouse_pos = pygame.mouse.get_pos()
         self.mouse_buttons = (False, False, False)
         self.previous_mouse_buttons = (False, False, False)
+        self.mouse_just_pressed = set()
 
         # 輸入映射配置（可自訂）
         self.key_mappings = KEYS.copy()
+        self._update_tracked_keys()
+
+        # 這一幀的輸入快照
+        self.snapshot = InputSnapshot(mouse_pos=self.mouse_pos)
+
+        # 輸入錄製（每幀一筆 InputSnapshot.to_record() 紀錄）
+        self.is_recording = False
+        self.recorded_frames = []
 
         # 輸入鎖定（在某些狀態下禁用特定輸入）
         self.input_locks = {
@@ -47,39 +148,114 @@ class InputManager:
             "skill": False,
         }
 
-    def update_input_state(self):
+    def _update_tracked_keys(self):
         """
-        更新輸入狀態（每幀呼叫）\n
-        \n
-        收集鍵盤和滑鼠的狀態變化\n
+        更新需要追蹤的按鍵代碼（只追蹤有對應動作的按鍵）\n
         """
-        # 更新鍵盤狀態
-        current_keys = pygame.key.get_pressed()
+        self.tracked_keys = {
+            key_code
+            for action_name, key_code in self.key_mappings.items()
+            if not action_name.startswith("mouse_")
+        }
 
-        # 計算剛按下和剛釋放的按鍵
+    def begin_frame(self):
+        """
+        開始新的一幀（在處理事件之前呼叫），清除上一幀的剛按下/剛放開狀態\n
+        """
         self.keys_just_pressed.clear()
         self.keys_just_released.clear()
+        self.mouse_just_pressed.clear()
+        self.previous_mouse_buttons = self.mouse_buttons
 
-        for i in range(len(current_keys)):
-            # 剛按下（這幀按下，上幀沒按）
-            if current_keys[i] and not self.previous_keys[i]:
-                self.keys_just_pressed.add(i)
-            # 剛釋放（這幀沒按，上幀按下）
-            elif not current_keys[i] and self.previous_keys[i]:
-                self.keys_just_released.add(i)
-
-        # 更新持續按下的按鍵集合
-        self.keys_pressed.clear()
-        for i in range(len(current_keys)):
-            if current_keys[i]:
-                self.keys_pressed.add(i)
+    def process_event(self, event):
+        """
+        用一個 pygame 事件更新輸入狀態\n
+        \n
+        參數:\n
+        event (pygame.event.Event): 事件物件\n
+        """
+        if event.type == pygame.KEYDOWN:
+            if event.key in self.tracked_keys and event.key not in self.keys_pressed:
+                self.keys_pressed.add(event.key)
+                self.keys_just_pressed.add(event.key)
+
+        elif event.type == pygame.KEYUP:
+            if event.key in self.keys_pressed:
+                self.keys_pressed.discard(event.key)
+                self.keys_just_released.add(event.key)
+
+        elif event.type == pygame.MOUSEMOTION:
+            self.mouse_pos = event.pos
+
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            self.mouse_pos = event.pos
+            button_index = MOUSE_BUTTON_INDEXES.get(event.button)
+            if button_index is None:
+                return
+            pressed = event.type == pygame.MOUSEBUTTONDOWN
+            buttons = list(self.mouse_buttons)
+            buttons[button_index] = pressed
+            self.mouse_buttons = tuple(buttons)
+            if pressed:
+                self.mouse_just_pressed.add(button_index)
+
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            # 失去焦點時收不到 KEYUP，放開所有按住的按鍵和滑鼠按鈕
+            self.keys_just_released.update(self.keys_pressed)
+            self.keys_pressed.clear()
+            self.mouse_buttons = (False, False, False)
+
+    def end_frame(self):
+        """
+        建立這一幀的輸入快照（處理完所有事件後呼叫）\n
+        \n
+        回傳:\n
+        InputSnapshot: 這一幀的輸入快照\n
+        """
+        self.snapshot = InputSnapshot(
+            self.keys_pressed,
+            self.keys_just_pressed,
+            self.keys_just_released,
+            self.mouse_pos,
+            self.mouse_buttons,
+            self.mouse_just_pressed,
+        )
+        if self.is_recording:
+            self.recorded_frames.append(self.snapshot.to_record())
+        return self.snapshot
+
+    def apply_snapshot(self, snapshot):
+        """
+        用外部的快照取代這一幀的輸入（重播錄製的輸入時使用）\n
+        \n
+        參數:\n
+        snapshot (InputSnapshot): 要套用的輸入快照\n
+        """
+        self.keys_pressed = set(snapshot.keys_pressed)
+        self.keys_just_pressed = set(snapshot.keys_just_pressed)
+        self.keys_just_released = set(snapshot.keys_just_released)
+        self.previous_mouse_buttons = self.mouse_buttons
+        self.mouse_pos = snapshot.mouse_pos
+        self.mouse_buttons = snapshot.mouse_buttons
+        self.mouse_just_pressed = set(snapshot.mouse_just_pressed)
+        self.snapshot = snapshot
 
-        self.previous_keys = current_keys
+    def start_recording(self):
+        """
+        開始錄製每幀的輸入快照\n
+        """
+        self.recorded_frames = []
+        self.is_recording = True
 
-        # 更新滑鼠狀態
-        self.mouse_pos = pygame.mouse.get_pos()
-        self.previous_mouse_buttons = self.mouse_buttons
-        self.mouse_buttons = pygame.mouse.get_pressed()
+    def stop_recording(self):
+        """
+        停止錄製輸入\n
+        \n
+        回傳:\n
+        list: 錄製的每幀輸入紀錄\n
+        """
+        self.is_recording = False
+        return self.recorded_frames
 
     def is_key_pressed(self, key_name):
         """
@@ -183,11 +359,7 @@ class InputManager:
         回傳:\n
         bool: 是否剛按下\n
         """
-        if 0 <= button < len(self.mouse_buttons):
-            return (
-                self.mouse_buttons[button] and not self.previous_mouse_buttons[button]
-            )
-        return False
+        return button in self.mouse_just_pressed
 
     def is_shooting_input_active(self):
         """
@@ -283,6 +455,7 @@ class InputManager:
         if action_name in self.key_mappings:
             old_key = self.key_mappings[action_name]
             self.key_mappings[action_name] = new_key
+            self._update_tracked_keys()
             print(f"🔧 按鍵重新映射: {action_name} {old_key} -> {new_key}")
 
     def get_key_mappings(self):
@@ -299,6 +472,7 @@ class InputManager:
         重置按鍵映射為預設值\n
         """
         self.key_mappings = KEYS.copy()
+        self._update_tracked_keys()
         print("🔧 按鍵映射已重置為預設值")
 
     def clear_input_state(self):
@@ -308,4 +482,7 @@ class InputManager:
         self.keys_pressed.clear()
         self.keys_just_pressed.clear()
         self.keys_just_released.clear()
+        self.mouse_buttons = (False, False, False)
+        self.mouse_just_pressed.clear()
+        self.snapshot = InputSnapshot(mouse_pos=self.mouse_pos)
         print("🧹 輸入狀態已清空")
@@ -0,0 +1,141 @@
+######################載入套件######################
+import pygame
+from src.config import *
+
+######################畫面節流系統######################
+
+# 讓視窗變成隱藏 / 重新顯示的事件
+WINDOW_HIDDEN_EVENTS = (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN)
+WINDOW_SHOWN_EVENTS = (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN)
+
+
+class RenderThrottle:
+    """
+    畫面節流系統 - 靜態畫面和背景視窗不用每幀全速重繪\n
+    \n
+    此系統負責：\n
+    1. 追蹤視窗是否有焦點、是否被最小化或隱藏\n
+    2. 不需要模擬的狀態（選單、暫停、遊戲結束）只在有輸入、狀態改變或動畫到期時重繪\n
+    3. 一段時間沒有輸入就降低更新頻率，視窗隱藏時暫停重繪\n
+    \n
+    使用方式:\n
+    render_throttle.process_event(event)  # 每個事件\n
+    if render_throttle.should_render(state): render()\n
+    clock.tick(render_throttle.get_tick_rate(state))\n
+    """
+
+    def __init__(self):
+        """
+        初始化畫面節流系統\n
+        """
+        self.window_focused = True
+        self.window_visible = True
+
+        self.needs_redraw = True  # 有輸入或視窗重新顯示時需要重繪
+        self.last_input_time = 0
+        self.last_render_time = 0
+        self.last_rendered_state = None
+
+        # 統計資料
+        self.rendered_frames = 0
+        self.skipped_frames = 0
+
+    def process_event(self, event):
+        """
+        用事件更新視窗狀態和重繪需求\n
+        \n
+        參數:\n
+        event (pygame.event.Event): 事件物件\n
+        """
+        if event.type == pygame.WINDOWFOCUSLOST:
+            self.window_focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.window_focused = True
+        elif event.type in WINDOW_HIDDEN_EVENTS:
+            self.window_visible = False
+        elif event.type in WINDOW_SHOWN_EVENTS:
+            self.window_visible = True
+
+        # 任何事件（輸入、視窗被蓋住後重新露出等）都重繪一次
+        self.needs_redraw = True
+        self.last_input_time = pygame.time.get_ticks()
+
+    def should_render(self, state, overlay_visible=False):
+        """
+        判斷這一幀是否需要重繪\n
+        \n
+        參數:\n
+        state (GameState): 目前的狀態物件\n
+        overlay_visible (bool): 效能面板是否顯示中（顯示時持續更新）\n
+        \n
+        回傳:\n
+        bool: 是否需要重繪\n
+        """
+        if not RENDER_THROTTLE_CONFIGS["enabled"]:
+            return True
+
+        # 視窗看不到時不重繪
+        if not self.window_visible:
+            self.skipped_frames += 1
+            return False
+
+        current_time = pygame.time.get_ticks()
+        render = (
+            state.needs_simulation
+            or overlay_visible
+            or self.needs_redraw
+            or state is not self.last_rendered_state
+            or (
+                state.redraw_interval_ms is not None
+                and current_time - self.last_render_time >= state.redraw_interval_ms
+            )
+        )
+
+        if render:
+            self.needs_redraw = False
+            self.last_render_time = current_time
+            self.last_rendered_state = state
+            self.rendered_frames += 1
+        else:
+            self.skipped_frames += 1
+        return render
+
+    def get_tick_rate(self, state):
+        """
+        取得這一幀的更新頻率\n
+        \n
+        參數:\n
+        state (GameState): 目前的狀態物件\n
+        \n
+        回傳:\n
+        int: 每秒幀數上限\n
+        """
+        if not RENDER_THROTTLE_CONFIGS["enabled"]:
+            return FPS
+
+        if state.needs_simulation:
+            # 遊戲邏輯以幀為單位，降低頻率會讓遊戲變慢
+            return FPS
+        if not self.window_visible:
+            return RENDER_THROTTLE_CONFIGS["hidden_fps"]
+        if not self.window_focused:
+            return RENDER_THROTTLE_CONFIGS["unfocused_fps"]
+
+        idle_time = pygame.time.get_ticks() - self.last_input_time
+        if idle_time >= RENDER_THROTTLE_CONFIGS["idle_after_ms"]:
+            return RENDER_THROTTLE_CONFIGS["idle_fps"]
+        return FPS
+
+    def get_stats(self):
+        """
+        取得畫面節流統計資料\n
+        \n
+        回傳:\n
+        dict: 重繪和略過的幀數、視窗狀態\n
+        """
+        return {
+            "rendered_frames": self.rendered_frames,
+            "skipped_frames": self.skipped_frames,
+            "window_focused": self.window_focused,
+            "window_visible": self.window_visible,
+        }
@@ -0,0 +1,663 @@
+######################載入套件######################
+import pygame
+import bisect
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from src.config import *
+from src.core.input_manager import InputSnapshot
+from src.utils.sound_manager import get_sound_manager
+
+######################重播檔格式######################
+
+# 檔案結構（整數都是 little-endian）：
+#   檔頭   REPLAY_HEADER（識別碼、版本、FPS、關鍵幀間隔）
+#   區塊×N CHUNK_HEADER（區塊第一幀、關鍵幀長度、輸入長度）+ zlib 關鍵幀 + zlib JSON 每幀輸入
+#   索引×N INDEX_ENTRY（區塊第一幀、區塊在檔案中的位置）
+#   檔尾   REPLAY_TRAILER（索引位置、區塊數、總幀數、識別碼）
+# 關鍵幀是 SnapshotManager.capture() 的完整狀態，跳到任何一幀只需要讀一個區塊
+# 重播檔會傳給別人重現問題：每幀輸入只存數字和字串（JSON），
+# 關鍵幀由 SnapshotUnpickler 還原，只接受遊戲實體和系統的類別
+REPLAY_MAGIC = b"BARPLY"
+REPLAY_VERSION = 2
+REPLAY_HEADER = struct.Struct("<6sHHH")
+CHUNK_HEADER = struct.Struct("<III")
+INDEX_ENTRY = struct.Struct("<IQ")
+REPLAY_TRAILER = struct.Struct("<QII6s")
+REPLAY_EXTENSION = ".barp"
+
+# 重播時不重現的按鍵（暫停、存檔、讀檔會打斷重播，讀檔後的狀態已經存成關鍵幀；
+# 遊戲速度由觀看的人自己控制）
+REPLAY_SKIPPED_KEYS = (
+    pygame.K_ESCAPE,
+    SNAPSHOT_CONFIGS["quick_save_key"],
+    SNAPSHOT_CONFIGS["quick_load_key"],
+    TIME_SCALE_CONFIGS["slower_key"],
+    TIME_SCALE_CONFIGS["faster_key"],
+    TIME_SCALE_CONFIGS["reset_key"],
+)
+REPLAY_SKIPPED_BUTTONS = (3,)  # 右鍵重新開始會開始新的錄影
+
+
+def encode_frames(frames, compress_level):
+    """
+    把每幀輸入壓縮成 bytes（相同的連續幀合併成一筆，轉成 JSON 再用 zlib 壓縮）\n
+    \n
+    參數:\n
+    frames (list): 每幀的 (輸入快照紀錄, 事件) \n
+    compress_level (int): zlib 壓縮等級\n
+    \n
+    回傳:\n
+    bytes: 壓縮後的資料\n
+    """
+    # 沒有輸入變化的幀（站著不動、按住同樣的按鍵）只記錄重複次數
+    runs = []
+    for frame in frames:
+        if runs and runs[-1][0] == frame:
+            runs[-1][1] += 1
+        else:
+            runs.append([frame, 1])
+    data = json.dumps(runs, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(data, compress_level)
+
+
+def _to_tuples(value):
+    """
+    把 JSON 還原的 list 轉回 tuple（錄製時的紀錄都是 tuple）\n
+    """
+    if isinstance(value, list):
+        return tuple(_to_tuples(item) for item in value)
+    return value
+
+
+def decode_frames(data):
+    """
+    還原 encode_frames() 壓縮的每幀輸入\n
+    \n
+    參數:\n
+    data (bytes): 壓縮後的資料\n
+    \n
+    回傳:\n
+    list: 每幀的 (輸入快照紀錄, 事件)\n
+    \n
+    例外:\n
+    ValueError: 資料不是 encode_frames() 的格式\n
+    """
+    frames = []
+    for frame, count in json.loads(zlib.decompress(data)):
+        frames.extend([_to_tuples(frame)] * count)
+    return frames
+
+
+def find_latest_replay(directory=None):
+    """
+    找出資料夾中最新的重播檔\n
+    \n
+    參數:\n
+    directory (str): 重播檔資料夾，None 時使用 REPLAY_CONFIGS 的設定\n
+    \n
+    回傳:\n
+    str: 重播檔路徑，沒有重播檔時回傳 None\n
+    """
+    if directory is None:
+        directory = REPLAY_CONFIGS["directory"]
+    try:
+        file_paths = [
+            os.path.join(directory, file_name)
+            for file_name in os.listdir(directory)
+            if file_name.endswith(REPLAY_EXTENSION)
+        ]
+    except OSError:
+        return None
+    if not file_paths:
+        return None
+    return max(file_paths, key=os.path.getmtime)
+
+
+def prune_old_replays(directory, keep):
+    """
+    刪除最舊的重播檔，只保留最新的 keep 個\n
+    \n
+    參數:\n
+    directory (str): 重播檔資料夾\n
+    keep (int): 保留的重播檔數量\n
+    \n
+    回傳:\n
+    int: 刪除的檔案數量\n
+    """
+    try:
+        file_paths = [
+            os.path.join(directory, file_name)
+            for file_name in os.listdir(directory)
+            if file_name.endswith(REPLAY_EXTENSION)
+        ]
+        file_paths.sort(key=os.path.getmtime)
+    except OSError:
+        return 0
+
+    removed_count = 0
+    for file_path in file_paths[: max(0, len(file_paths) - keep)]:
+        try:
+            os.remove(file_path)
+            removed_count += 1
+        except OSError as e:
+            print(f"⚠️ 無法刪除舊的重播檔: {e}")
+    return removed_count
+
+
+######################重播錄製######################
+
+
+class ReplayRecorder:
+    """
+    重播錄製器 - 把一場遊戲寫成重播檔\n
+    \n
+    此系統負責：\n
+    1. 每場遊戲開始時建立新的重播檔，先存一個完整狀態的關鍵幀（超過保留數量時刪除最舊的）\n
+    2. 記錄每個模擬幀的輸入快照和遊戲中的按鍵、點擊事件\n
+    3. 每 keyframe_interval 幀把輸入壓縮寫入檔案，並存下一個關鍵幀\n
+    4. 讀檔或重新開始關卡（狀態不連續）時立刻存新的關鍵幀\n
+    5. 結束錄製時寫入區塊索引，讀取時可以直接跳到任何區塊\n
+    \n
+    使用方式:\n
+    replay_recorder.start()  # 遊戲開始\n
+    replay_recorder.record_event(event)  # 遊戲中的每個事件\n
+    replay_recorder.end_frame(input_snapshot)  # 每模擬一幀\n
+    replay_recorder.stop()  # 寫入索引並關閉檔案\n
+    """
+
+    def __init__(self, game_engine):
+        """
+        初始化重播錄製器\n
+        \n
+        參數:\n
+        game_engine: 遊戲引擎主物件\n
+        """
+        self.game_engine = game_engine
+        self.enabled = REPLAY_CONFIGS["enabled"]  # 訓練環境等不需要重播檔時關閉
+
+        self.file = None
+        self.file_path = None
+        self.index = []  # [(區塊第一幀, 區塊位置), ...]
+        self.frame_count = 0
+
+        # 目前區塊（還沒寫入檔案）
+        self.chunk_first_frame = 0
+        self.chunk_keyframe = None
+        self.chunk_frames = []
+        self.pending_events = []  # 下一個模擬幀之前發生的事件
+
+    @property
+    def is_recording(self):
+        """
+        是否正在錄製\n
+        """
+        return self.file is not None
+
+    def _new_file_path(self):
+        """
+        依目前時間產生不重複的重播檔路徑\n
+        """
+        directory = REPLAY_CONFIGS["directory"]
+        base_name = time.strftime("replay_%Y%m%d_%H%M%S")
+        file_path = os.path.join(directory, base_name + REPLAY_EXTENSION)
+        suffix = 1
+        while os.path.exists(file_path):
+            suffix += 1
+            file_path = os.path.join(
+                directory, f"{base_name}_{suffix}{REPLAY_EXTENSION}"
+            )
+        return file_path
+
+    def start(self):
+        """
+        開始錄製新的一場遊戲（上一場還在錄製時先結束）\n
+        \n
+        回傳:\n
+        bool: 是否開始錄製\n
+        """
+        self.stop()
+        if not self.enabled:
+            return False
+
+        try:
+            os.makedirs(REPLAY_CONFIGS["directory"], exist_ok=True)
+            # 加上這一場之後不超過保留數量
+            max_files = REPLAY_CONFIGS["max_files"]
+            if max_files is not None:
+                prune_old_replays(REPLAY_CONFIGS["directory"], max(0, max_files - 1))
+            file_path = self._new_file_path()
+            self.file = open(file_path, "wb")
+            self.file.write(
+                REPLAY_HEADER.pack(
+                    REPLAY_MAGIC,
+                    REPLAY_VERSION,
+                    FPS,
+                    REPLAY_CONFIGS["keyframe_interval"],
+                )
+            )
+        except OSError as e:
+            print(f"⚠️ 無法建立重播檔: {e}")
+            self.file = None
+            return False
+
+        self.file_path = file_path
+        self.index = []
+        self.frame_count = 0
+        self.pending_events = []
+        self._begin_chunk()
+        return True
+
+    def _begin_chunk(self):
+        """
+        從目前的狀態開始新的區塊（存下關鍵幀）\n
+        """
+        self.chunk_first_frame = self.frame_count
+        self.chunk_keyframe = self.game_engine.snapshot_manager.capture()
+        self.chunk_frames = []
+
+    def _write_chunk(self):
+        """
+        把目前區塊的關鍵幀和每幀輸入寫入檔案\n
+        """
+        compress_level = REPLAY_CONFIGS["compress_level"]
+        keyframe = zlib.compress(self.chunk_keyframe, compress_level)
+        inputs = encode_frames(self.chunk_frames, compress_level)
+
+        self.index.append((self.chunk_first_frame, self.file.tell()))
+        self.file.write(
+            CHUNK_HEADER.pack(self.chunk_first_frame, len(keyframe), len(inputs))
+        )
+        self.file.write(keyframe)
+        self.file.write(inputs)
+        self.chunk_frames = []
+
+    def record_event(self, event):
+        """
+        記錄遊戲中的按鍵和點擊事件（在這一幀模擬之前重現）\n
+        \n
+        參數:\n
+        event (pygame.event.Event): 事件物件\n
+        """
+        if not self.is_recording:
+            return
+        if event.type == pygame.KEYDOWN:
+            self.pending_events.append(("key", event.key))
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self.pending_events.append(("mouse", event.button) + tuple(event.pos))
+
+    def end_frame(self, input_snapshot):
+        """
+        記錄剛模擬完的一幀，區塊滿了就寫入檔案並開始新的區塊\n
+        \n
+        參數:\n
+        input_snapshot (InputSnapshot): 這一幀使用的輸入快照\n
+        """
+        if not self.is_recording:
+            return
+        self.chunk_frames.append(
+            (input_snapshot.to_record(), tuple(self.pending_events))
+        )
+        self.pending_events = []
+        self.frame_count += 1
+
+        if len(self.chunk_frames) >= REPLAY_CONFIGS["keyframe_interval"]:
+            try:
+                self._write_chunk()
+            except OSError as e:
+                print(f"⚠️ 無法寫入重播檔，停止錄製: {e}")
+                self._close_file()
+                return
+            self._begin_chunk()
+
+    def mark_discontinuity(self):
+        """
+        狀態被直接替換（讀檔、重新開始關卡）後呼叫，從新的狀態開始新的區塊\n
+        """
+        if not self.is_recording:
+            return
+        # 之前的事件已經反映在新的狀態裡
+        self.pending_events = []
+        if not self.chunk_frames:
+            # 目前區塊還沒有任何幀，直接換掉關鍵幀
+            self._begin_chunk()
+            return
+        try:
+            self._write_chunk()
+        except OSError as e:
+            print(f"⚠️ 無法寫入重播檔，停止錄製: {e}")
+            self._close_file()
+            return
+        self._begin_chunk()
+
+    def stop(self):
+        """
+        結束錄製：寫入最後的區塊、索引和檔尾\n
+        \n
+        回傳:\n
+        str: 重播檔路徑，沒有在錄製時回傳 None\n
+        """
+        if not self.is_recording:
+            return None
+
+        file_path = self.file_path
+        try:
+            if self.chunk_frames or not self.index:
+                self._write_chunk()
+            index_offset = self.file.tell()
+            for first_frame, offset in self.index:
+                self.file.write(INDEX_ENTRY.pack(first_frame, offset))
+            self.file.write(
+                REPLAY_TRAILER.pack(
+                    index_offset, len(self.index), self.frame_count, REPLAY_MAGIC
+                )
+            )
+            print(
+                f"🎬 重播已儲存: {file_path}（{self.frame_count} 幀，"
+                f"{len(self.index)} 個關鍵幀）"
+            )
+        except OSError as e:
+            print(f"⚠️ 無法完成重播檔: {e}")
+            file_path = None
+        self._close_file()
+        return file_path
+
+    def _close_file(self):
+        """
+        關閉重播檔並清除錄製狀態\n
+        """
+        try:
+            self.file.close()
+        except OSError:
+            pass
+        self.file = None
+        self.chunk_keyframe = None
+        self.chunk_frames = []
+        self.pending_events = []
+
+
+######################重播讀取######################
+
+
+class ReplayReader:
+    """
+    重播檔讀取器 - 用 mmap 開啟重播檔，隨機讀取任何區塊\n
+    \n
+    開啟時只讀檔頭、檔尾和索引，讀取區塊時才解壓縮那一個區塊，\n
+    檔案再大（長時間的遊戲）跳轉的成本也只和關鍵幀間隔有關\n
+    \n
+    使用方式:\n
+    reader = ReplayReader("replays/replay_20250101_120000.barp")\n
+    chunk_index = reader.find_chunk(frame)\n
+    first_frame, keyframe, frames = reader.read_chunk(chunk_index)\n
+    reader.close()\n
+    """
+
+    def __init__(self, file_path):
+        """
+        開啟重播檔\n
+        \n
+        參數:\n
+        file_path (str): 重播檔路徑\n
+        \n
+        例外:\n
+        OSError: 無法開啟檔案\n
+        ValueError: 檔案格式錯誤、版本不相容或沒有正常結束錄製\n
+        """
+        self.file_path = file_path
+        self.file = open(file_path, "rb")
+        try:
+            size = os.fstat(self.file.fileno()).st_size
+            if size < REPLAY_HEADER.size + REPLAY_TRAILER.size:
+                raise ValueError(f"重播檔太小: {file_path}")
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.file.close()
+            raise
+
+        try:
+            self._read_index(size)
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+    def _read_index(self, size):
+        """
+        讀取檔頭、檔尾和區塊索引\n
+        """
+        magic, version, self.fps, self.keyframe_interval = (
+            REPLAY_HEADER.unpack_from(self.data, 0)
+        )
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"重播檔格式或版本不相容: {self.file_path}")
+
+        index_offset, chunk_count, self.frame_count, trailer_magic = (
+            REPLAY_TRAILER.unpack_from(self.data, size - REPLAY_TRAILER.size)
+        )
+        if trailer_magic != REPLAY_MAGIC or chunk_count == 0:
+            raise ValueError(f"重播檔沒有正常結束錄製: {self.file_path}")
+
+        self.chunk_first_frames = []
+        self.chunk_offsets = []
+        for chunk_index in range(chunk_count):
+            first_frame, offset = INDEX_ENTRY.unpack_from(
+                self.data, index_offset + chunk_index * INDEX_ENTRY.size
+            )
+            self.chunk_first_frames.append(first_frame)
+            self.chunk_offsets.append(offset)
+
+    @property
+    def chunk_count(self):
+        """
+        區塊（關鍵幀）數量\n
+        """
+        return len(self.chunk_offsets)
+
+    def find_chunk(self, frame):
+        """
+        找出包含指定幀的區塊\n
+        \n
+        參數:\n
+        frame (int): 幀編號（0 表示遊戲開始時的狀態）\n
+        \n
+        回傳:\n
+        int: 區塊編號\n
+        """
+        return max(0, bisect.bisect_right(self.chunk_first_frames, frame) - 1)
+
+    def read_chunk(self, chunk_index):
+        """
+        讀取一個區塊\n
+        \n
+        參數:\n
+        chunk_index (int): 區塊編號\n
+        \n
+        回傳:\n
+        tuple: (區塊第一幀, 關鍵幀狀態 bytes, 每幀輸入 list)\n
+        \n
+        例外:\n
+        ValueError: 區塊資料損壞\n
+        """
+        offset = self.chunk_offsets[chunk_index]
+        first_frame, keyframe_size, inputs_size = CHUNK_HEADER.unpack_from(
+            self.data, offset
+        )
+        keyframe_start = offset + CHUNK_HEADER.size
+        inputs_start = keyframe_start + keyframe_size
+        try:
+            keyframe = zlib.decompress(self.data[keyframe_start:inputs_start])
+            frames = decode_frames(
+                self.data[inputs_start : inputs_start + inputs_size]
+            )
+        except (zlib.error, ValueError, TypeError) as e:
+            raise ValueError(f"重播檔區塊 {chunk_index} 損壞: {e}") from e
+        return first_frame, keyframe, frames
+
+    def close(self):
+        """
+        關閉重播檔\n
+        """
+        self.data.close()
+        self.file.close()
+
+
+######################重播播放######################
+
+
+class ReplayPlayer:
+    """
+    重播播放器 - 還原關鍵幀後重現錄製的輸入\n
+    \n
+    此系統負責：\n
+    1. 跳轉：還原最近的關鍵幀，再靜音快轉到目標幀（最多 keyframe_interval 幀）\n
+    2. 播放：每幀套用錄製的輸入快照、重現按鍵和點擊，然後模擬一幀\n
+    3. 播到區塊結尾時還原下一個關鍵幀（讀檔等不連續的狀態也能正確重現）\n
+    \n
+    遊戲時鐘以固定步長前進，遊戲邏輯和畫面特效使用不同的亂數，\n
+    所以同樣的關鍵幀加上同樣的輸入會得到和錄製時相同的結果\n
+    """
+
+    def __init__(self, game_engine, reader):
+        """
+        初始化重播播放器\n
+        \n
+        參數:\n
+        game_engine: 遊戲引擎主物件\n
+        reader (ReplayReader): 已開啟的重播檔\n
+        """
+        self.game_engine = game_engine
+        self.reader = reader
+
+        self.current_frame = 0
+        self.playing = True
+
+        # 目前區塊
+        self.chunk_index = None
+        self.chunk_first_frame = 0
+        self.chunk_frames = []
+
+        # 統計資料
+        self.last_seek_ms = 0
+
+    @property
+    def frame_count(self):
+        """
+        重播的總幀數\n
+        """
+        return self.reader.frame_count
+
+    def _load_chunk(self, chunk_index):
+        """
+        讀取區塊並還原它的關鍵幀（失敗時停止播放）\n
+        \n
+        回傳:\n
+        bool: 是否成功還原\n
+        """
+        try:
+            first_frame, keyframe, frames = self.reader.read_chunk(chunk_index)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            self.playing = False
+            return False
+        if not self.game_engine.snapshot_manager.restore(
+            keyframe, resume_playing=False
+        ):
+            print(f"⚠️ 重播檔區塊 {chunk_index} 的關鍵幀無法還原")
+            self.playing = False
+            return False
+
+        self.chunk_index = chunk_index
+        self.chunk_first_frame = first_frame
+        self.chunk_frames = frames
+        self.current_frame = first_frame
+        return True
+
+    def seek(self, frame):
+        """
+        跳到指定的幀\n
+        \n
+        參數:\n
+        frame (int): 目標幀編號（超出範圍時限制在 0 到總幀數之間）\n
+        \n
+        回傳:\n
+        bool: 是否成功跳轉（區塊損壞時停在原本的狀態）\n
+        """
+        start_time = time.perf_counter()
+        frame = max(0, min(int(frame), self.frame_count))
+        if not self._load_chunk(self.reader.find_chunk(frame)):
+            return False
+
+        # 快轉到目標幀（不播放快轉過程的音效）
+        sound_manager = get_sound_manager()
+        sound_manager.muted = True
+        try:
+            for frame_input in self.chunk_frames[: frame - self.chunk_first_frame]:
+                self._simulate(frame_input)
+        finally:
+            sound_manager.muted = False
+        self.current_frame = frame
+
+        self.last_seek_ms = (time.perf_counter() - start_time) * 1000
+        return True
+
+    def step(self):
+        """
+        播放下一幀\n
+        \n
+        回傳:\n
+        bool: 是否還有下一幀\n
+        """
+        if self.current_frame >= self.frame_count:
+            self.playing = False
+            return False
+
+        offset = self.current_frame - self.chunk_first_frame
+        if offset >= len(self.chunk_frames):
+            if not self._load_chunk(self.chunk_index + 1):
+                return False
+            offset = 0
+
+        self._simulate(self.chunk_frames[offset])
+        self.current_frame += 1
+        return True
+
+    def update(self):
+        """
+        播放中時每幀前進一幀\n
+        """
+        if self.playing:
+            self.step()
+
+    def _simulate(self, frame_input):
+        """
+        重現一幀的輸入並模擬一幀\n
+        \n
+        參數:\n
+        frame_input (tuple): (輸入快照紀錄, 事件)\n
+        """
+        engine = self.game_engine
+        event_handler = engine.event_handler
+        record, events = frame_input
+
+        engine.input_manager.apply_snapshot(InputSnapshot.from_record(record))
+        for event in events:
+            if event[0] == "key":
+                if event[1] not in REPLAY_SKIPPED_KEYS:
+                    event_handler._handle_game_keys(event[1])
+            elif event[1] not in REPLAY_SKIPPED_BUTTONS:
+                event_handler._handle_game_click(event[1], event[2:])
+
+        # 錄製的最後一幀是偵測到遊戲結束的那一幀，重播時停在遊戲畫面
+        if not engine.player or not engine.player.is_alive or engine.game_completed:
+            return
+        event_handler._handle_continuous_input()
+        engine._update_playing()
+
+    def close(self):
+        """
+        關閉重播檔\n
+        """
+        self.reader.close()
@@ -0,0 +1,362 @@
+######################載入套件######################
+import pygame
+import io
+import os
+import pickle
+import random
+import struct
+import time
+import zlib
+from src.config import *
+from src.core.game_clock import game_clock
+from src.systems.timer_scheduler import timer_scheduler
+from src.systems.damage_queue import damage_queue
+from src.utils.image_manager import image_manager
+
+######################遊戲存檔系統######################
+
+# 存檔格式：檔頭（識別碼、版本、原始資料長度）+ zlib 壓縮的 pickle 資料
+SNAPSHOT_MAGIC = b"BASNAP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<6sHI")
+
+# 存進存檔的 GameEngine 欄位（關卡進度、分數、統計、選擇的設定）
+ENGINE_STATE_FIELDS = (
+    "score",
+    "current_level",
+    "level_enemies_killed",
+    "game_completed",
+    "game_stats",
+    "game_start_time",
+    "last_skill_activation",
+    "last_skill_damage_time",
+    "enemy_spawn_count",
+    "current_level_enemy_counts",
+    "current_level_enemy_type",
+    "selected_character",
+    "selected_difficulty",
+    "selected_scene",
+    "enemy_difficulty",
+    "player_max_health",
+)
+
+# 存檔中允許還原的類別所在的模組（只有遊戲實體和系統，其他類別和函式一律拒絕）
+SNAPSHOT_ALLOWED_MODULES = ("src.entities.", "src.systems.")
+
+
+def _is_game_class(cls):
+    """
+    檢查類別是否屬於遊戲實體或系統\n
+    """
+    return isinstance(cls, type) and cls.__module__.startswith(
+        SNAPSHOT_ALLOWED_MODULES
+    )
+
+
+def _restricted_getattr(obj, name):
+    """
+    存檔專用的 getattr：只取得遊戲物件自己的方法（計時器的回呼存成 getattr(物件, 方法名稱)）\n
+    \n
+    參數:\n
+    obj: 已還原的遊戲物件\n
+    name (str): 方法名稱\n
+    \n
+    回傳:\n
+    method: 綁定在 obj 上的方法\n
+    \n
+    例外:\n
+    pickle.UnpicklingError: 不是遊戲物件的方法\n
+    """
+    if (
+        not isinstance(name, str)
+        or name.startswith("__")
+        or not _is_game_class(type(obj))
+    ):
+        raise pickle.UnpicklingError(f"存檔不允許取得屬性: {name!r}")
+    method = getattr(obj, name)
+    if getattr(method, "__self__", None) is not obj:
+        raise pickle.UnpicklingError(f"存檔不允許取得屬性: {name!r}")
+    return method
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """
+    存檔專用的 Unpickler - 只能還原遊戲實體和系統的類別\n
+    \n
+    存檔和重播檔會在不同的電腦之間傳遞，一般的 pickle.loads 可以執行任意程式碼，\n
+    這裡拒絕所有不在 SNAPSHOT_ALLOWED_MODULES 中的類別和函式\n
+    """
+
+    def find_class(self, module, name):
+        """
+        依模組和名稱取得類別（不在允許清單中時拒絕）\n
+        \n
+        參數:\n
+        module (str): 模組名稱\n
+        name (str): 類別名稱\n
+        \n
+        回傳:\n
+        type: 遊戲類別\n
+        \n
+        例外:\n
+        pickle.UnpicklingError: 不允許的類別或函式\n
+        """
+        if (module, name) == ("builtins", "getattr"):
+            return _restricted_getattr
+        # 不接受 "類別.屬性" 形式的名稱，避免透過類別取得其他物件
+        if module.startswith(SNAPSHOT_ALLOWED_MODULES) and "." not in name:
+            cls = super().find_class(module, name)
+            if _is_game_class(cls) and cls.__module__ == module:
+                return cls
+        raise pickle.UnpicklingError(f"存檔不允許載入: {module}.{name}")
+
+
+
+class SnapshotManager:
+    """
+    遊戲存檔系統 - 擷取和還原完整的模擬狀態\n
+    \n
+    此系統負責：\n
+    1. 把玩家、敵人（含 AI 和狀態效果）、子彈、道具、計時器、亂數狀態、\n
+       遊戲時鐘、分數和關卡一次序列化成 bytes（同一次 pickle，物件之間的參考不會斷開）\n
+    2. 從 bytes 還原狀態，不需要重新建立玩家、管理系統和 UI\n
+    3. 關卡開始時自動建立檢查點，重新開始關卡時直接還原\n
+    4. 把狀態壓縮寫成存檔，之後可以讀回繼續遊戲\n
+    \n
+    使用方式:\n
+    data = snapshot_manager.capture()\n
+    snapshot_manager.restore(data)\n
+    snapshot_manager.save_to_file("saves/quicksave.bas")\n
+    """
+
+    def __init__(self, game_engine):
+        """
+        初始化遊戲存檔系統\n
+        \n
+        參數:\n
+        game_engine: 遊戲引擎主物件\n
+        """
+        self.game_engine = game_engine
+
+        # 關卡開始時的檢查點
+        self.checkpoint = None
+        self.checkpoint_level = None
+
+        # 統計資料
+        self.last_capture_us = 0
+        self.last_restore_us = 0
+        self.last_snapshot_size = 0
+
+    def capture(self):
+        """
+        擷取目前的完整模擬狀態\n
+        \n
+        回傳:\n
+        bytes: 序列化後的狀態\n
+        """
+        start_time = time.perf_counter()
+        engine = self.game_engine
+        game_ui = engine.game_ui
+
+        state = {
+            "version": SNAPSHOT_VERSION,
+            "engine": {field: getattr(engine, field) for field in ENGINE_STATE_FIELDS},
+            "player": engine.player,
+            "enemies": engine.enemies,
+            "bullets": engine.bullet_manager.bullets,
+            "powerups": engine.powerup_manager.powerups,
+            "powerup_last_spawn_time": engine.powerup_manager.last_spawn_time,
+            "ai_scheduler": (
+                engine.ai_scheduler.frame_index,
+                engine.ai_scheduler.next_phase,
+            ),
+            # 訊息淡出的計時器屬於 UI，不存進存檔
+            "timers": [
+                handle
+                for handle in timer_scheduler.get_state()
+                if getattr(handle.callback, "__self__", None) is not game_ui
+            ],
+            "game_time": game_clock.get_state(),
+            "rng": random.getstate(),
+        }
+        data = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+
+        self.last_capture_us = (time.perf_counter() - start_time) * 1000000
+        self.last_snapshot_size = len(data)
+        return data
+
+    def restore(self, data, resume_playing=True):
+        """
+        還原 capture() 擷取的狀態，並回到遊戲中狀態\n
+        \n
+        參數:\n
+        data (bytes): capture() 回傳的資料\n
+        resume_playing (bool): 是否切換回遊戲中狀態（重播跳轉時維持重播狀態）\n
+        \n
+        回傳:\n
+        bool: 是否成功還原\n
+        """
+        start_time = time.perf_counter()
+        try:
+            state = SnapshotUnpickler(io.BytesIO(data)).load()
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"⚠️ 無法讀取存檔資料: {e}")
+            return False
+
+        version = state.get("version") if isinstance(state, dict) else None
+        if version != SNAPSHOT_VERSION:
+            print(f"⚠️ 存檔版本不相容: {version}")
+            return False
+
+        engine = self.game_engine
+        for field in ENGINE_STATE_FIELDS:
+            setattr(engine, field, state["engine"][field])
+
+        engine.player = state["player"]
+        engine.enemies = state["enemies"]
+        engine.bullet_manager.bullets = state["bullets"]
+        engine.powerup_manager.powerups = state["powerups"]
+        engine.powerup_manager.last_spawn_time = state["powerup_last_spawn_time"]
+        engine.ai_scheduler.frame_index, engine.ai_scheduler.next_phase = state[
+            "ai_scheduler"
+        ]
+
+        # 時鐘先還原，存檔中記錄的時間（計時器、效果開始時間等）才會對得上
+        game_clock.set_state(state["game_time"])
+        timer_scheduler.set_state(state["timers"])
+        random.setstate(state["rng"])
+
+        # 尚未結算的傷害和畫面上的訊息不屬於存檔
+        damage_queue.clear()
+        engine.game_ui.messages.clear()
+
+        # 場景相關資源（障礙物、固定的圖片）依存檔的設定重新準備
+        scene_config = SCENE_CONFIGS.get(engine.selected_scene, {})
+        engine.flow_field.set_obstacles(scene_config.get("obstacles", []))
+        image_manager.pin_match_assets(engine.selected_scene, engine.selected_character)
+
+        # 強制回到遊戲狀態（避免狀態轉換檢查）
+        if resume_playing:
+            state_manager = engine.state_manager
+            state_manager.previous_state = state_manager.current_state
+            state_manager.current_state = GAME_STATES["playing"]
+            state_manager.state_change_time = pygame.time.get_ticks()
+
+        self.last_restore_us = (time.perf_counter() - start_time) * 1000000
+        return True
+
+    def create_checkpoint(self):
+        """
+        在關卡開始時建立檢查點\n
+        """
+        if not SNAPSHOT_CONFIGS["checkpoint_on_level_start"]:
+            return
+        self.checkpoint = self.capture()
+        self.checkpoint_level = self.game_engine.current_level
+
+    def has_checkpoint(self):
+        """
+        檢查目前的關卡是否有檢查點\n
+        \n
+        回傳:\n
+        bool: 是否可以從檢查點重新開始\n
+        """
+        return (
+            self.checkpoint is not None
+            and self.checkpoint_level == self.game_engine.current_level
+        )
+
+    def restore_checkpoint(self):
+        """
+        還原目前關卡的檢查點\n
+        \n
+        回傳:\n
+        bool: 是否成功還原\n
+        """
+        if not self.has_checkpoint():
+            return False
+        return self.restore(self.checkpoint)
+
+    def save_to_file(self, file_path=None, data=None):
+        """
+        把狀態壓縮寫成存檔\n
+        \n
+        參數:\n
+        file_path (str): 存檔路徑，None 時使用 SNAPSHOT_CONFIGS 的設定\n
+        data (bytes): 要寫入的狀態，None 時擷取目前的狀態\n
+        \n
+        回傳:\n
+        bool: 是否成功寫入\n
+        """
+        if file_path is None:
+            file_path = SNAPSHOT_CONFIGS["save_file"]
+        if data is None:
+            data = self.capture()
+
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(data))
+        compressed = zlib.compress(data, SNAPSHOT_CONFIGS["compress_level"])
+        try:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, "wb") as file:
+                file.write(header)
+                file.write(compressed)
+            print(f"💾 遊戲已存檔: {file_path}（{len(header) + len(compressed)} bytes）")
+            return True
+        except OSError as e:
+            print(f"⚠️ 無法寫入存檔: {e}")
+            return False
+
+    def load_from_file(self, file_path=None):
+        """
+        讀取存檔（不會直接還原，回傳的資料交給 restore()，由 SnapshotUnpickler 還原）\n
+        \n
+        參數:\n
+        file_path (str): 存檔路徑，None 時使用 SNAPSHOT_CONFIGS 的設定\n
+        \n
+        回傳:\n
+        bytes: 存檔中的狀態，讀取失敗時回傳 None\n
+        """
+        if file_path is None:
+            file_path = SNAPSHOT_CONFIGS["save_file"]
+
+        try:
+            with open(file_path, "rb") as file:
+                header = file.read(SNAPSHOT_HEADER.size)
+                compressed = file.read()
+        except OSError as e:
+            print(f"⚠️ 無法讀取存檔: {e}")
+            return None
+
+        if len(header) < SNAPSHOT_HEADER.size:
+            print(f"⚠️ 存檔格式錯誤: {file_path}")
+            return None
+        magic, version, size = SNAPSHOT_HEADER.unpack(header)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            print(f"⚠️ 存檔格式或版本不相容: {file_path}")
+            return None
+
+        try:
+            data = zlib.decompress(compressed)
+        except zlib.error as e:
+            print(f"⚠️ 存檔資料損壞: {e}")
+            return None
+        if len(data) != size:
+            print(f"⚠️ 存檔資料長度不符: {file_path}")
+            return None
+        return data
+
+    def get_stats(self):
+        """
+        取得存檔系統統計資料\n
+        \n
+        回傳:\n
+        dict: 最近一次擷取/還原的耗時（微秒）和資料大小\n
+        """
+        return {
+            "last_capture_us": self.last_capture_us,
+            "last_restore_us": self.last_restore_us,
+            "last_snapshot_size": self.last_snapshot_size,
+            "checkpoint_level": self.checkpoint_level,
+        }
@@ -1,6 +1,7 @@
 ######################載入套件######################
 import pygame
 from src.config import *
+from src.core.states import STATE_CLASSES
 
 ######################狀態管理系統######################
 
@@ -11,9 +12,9 @@ class StateManager:
     \n
     此系統負責：\n
     1. 遊戲狀態切換（選單、遊戲中、結束等）\n
-    2. 狀態轉換邏輯驗證\n
+    2. 狀態轉換邏輯驗證（預先算好的轉換表）\n
     3. 狀態相關的資料管理\n
-    4. 狀態切換時的清理工作\n
+    4. 狀態切換時呼叫狀態物件的 enter/exit\n
     """
 
     def __init__(self, game_engine):
@@ -24,6 +25,19 @@ class StateManager:
         game_engine: 遊戲引擎主物件\n
         """
         self.game_engine = game_engine
+
+        # 狀態名稱 -> 狀態物件（每幀直接呼叫 active_state，不需要比對名稱）
+        self.states = {
+            state_name: state_class(game_engine)
+            for state_name, state_class in STATE_CLASSES.items()
+        }
+
+        # 預先算好的狀態轉換表（任何狀態都可以強制回到選單）
+        self.transition_table = {
+            state_name: frozenset(state.next_states) | {GAME_STATES["menu"]}
+            for state_name, state in self.states.items()
+        }
+
         self.current_state = GAME_STATES["menu"]
         self.previous_state = None
         self.state_change_time = 0
@@ -32,32 +46,18 @@ class StateManager:
         self.state_before_pause = None  # 暫停前的狀態
         self.pause_start_time = 0  # 暫停開始時間
 
-        # 狀態轉換規則定義
-        self.valid_transitions = {
-            GAME_STATES["menu"]: [GAME_STATES["character_select"]],
-            GAME_STATES["character_select"]: [
-                GAME_STATES["menu"],
-                GAME_STATES["difficulty_select"],
-            ],
-            GAME_STATES["difficulty_select"]: [
-                GAME_STATES["character_select"],
-                GAME_STATES["scene_select"],
-            ],
-            GAME_STATES["scene_select"]: [
-                GAME_STATES["difficulty_select"],
-                GAME_STATES["countdown"],
-            ],
-            GAME_STATES["countdown"]: [
-                GAME_STATES["playing"],
-            ],
-            GAME_STATES["playing"]: [
-                GAME_STATES["menu"],
-                GAME_STATES["game_over"],
-                GAME_STATES["paused"],
-            ],
-            GAME_STATES["game_over"]: [GAME_STATES["menu"], GAME_STATES["playing"]],
-            GAME_STATES["paused"]: [GAME_STATES["playing"], GAME_STATES["menu"]],
-        }
+    @property
+    def current_state(self):
+        """
+        目前的狀態名稱\n
+        """
+        return self._current_state
+
+    @current_state.setter
+    def current_state(self, state_name):
+        # 直接設定狀態時（例如重新開始關卡）同步切換狀態物件，不執行 enter/exit
+        self._current_state = state_name
+        self.active_state = self.states[state_name]
 
     def change_state(self, new_state_name):
         """
@@ -69,24 +69,20 @@ class StateManager:
         回傳:\n
         bool: 是否成功切換狀態\n
         """
+        new_state = GAME_STATES.get(new_state_name, new_state_name)
+
         # 檢查新狀態是否存在
-        if new_state_name not in GAME_STATES.values():
+        if new_state not in self.states:
             print(f"⚠️ 無效的遊戲狀態: {new_state_name}")
             return False
 
-        new_state = (
-            GAME_STATES[new_state_name]
-            if new_state_name in GAME_STATES
-            else new_state_name
-        )
-
         # 檢查狀態轉換是否合法
         if not self._is_valid_transition(self.current_state, new_state):
             print(f"⚠️ 無效的狀態轉換: {self.current_state} -> {new_state}")
             return False
 
         # 執行狀態離開處理
-        self._on_state_exit(self.current_state)
+        self.active_state.exit(new_state)
 
         # 更新狀態
         self.previous_state = self.current_state
@@ -94,7 +90,7 @@ class StateManager:
         self.state_change_time = pygame.time.get_ticks()
 
         # 執行狀態進入處理
-        self._on_state_enter(new_state)
+        self.active_state.enter(self.previous_state)
 
         print(f"🔄 狀態切換: {self.previous_state} -> {self.current_state}")
         return True
@@ -110,91 +106,7 @@ class StateManager:
         回傳:\n
         bool: 轉換是否合法\n
         """
-        # 允許強制回到選單（緊急退出）
-        if to_state == GAME_STATES["menu"]:
-            return True
-
-        # 檢查轉換規則
-        if from_state in self.valid_transitions:
-            return to_state in self.valid_transitions[from_state]
-
-        return False
-
-    def _on_state_exit(self, state):
-        """
-        狀態離開時的處理\n
-        \n
-        參數:\n
-        state (str): 離開的狀態\n
-        """
-        if state == GAME_STATES["playing"]:
-            # 離開遊戲狀態時暫停計時
-            if hasattr(self.game_engine, "game_start_time"):
-                current_time = pygame.time.get_ticks()
-                self.game_engine.game_stats["game_time"] = (
-                    current_time - self.game_engine.game_start_time
-                ) / 1000
-
-        elif state == GAME_STATES["character_select"]:
-            # 重置選擇UI
-            if hasattr(self.game_engine, "selection_ui"):
-                self.game_engine.selection_ui.reset_selection()
-
-    def _on_state_enter(self, state):
-        """
-        狀態進入時的處理\n
-        \n
-        參數:\n
-        state (str): 進入的狀態\n
-        """
-        if state == GAME_STATES["menu"]:
-            # 進入選單時重置某些設定
-            pass
-
-        elif state == GAME_STATES["character_select"]:
-            # 進入角色選擇時設置UI
-            if hasattr(self.game_engine, "selection_ui"):
-                self.game_engine.selection_ui.current_selection_type = "character"
-                self.game_engine.selection_ui.reset_selection()
-
-        elif state == GAME_STATES["difficulty_select"]:
-            # 進入難度選擇時設置UI
-            if hasattr(self.game_engine, "selection_ui"):
-                self.game_engine.selection_ui.current_selection_type = "difficulty"
-
-        elif state == GAME_STATES["scene_select"]:
-            # 進入場景選擇時設置UI
-            if hasattr(self.game_engine, "selection_ui"):
-                self.game_engine.selection_ui.current_selection_type = "scene"
-
-        elif state == GAME_STATES["countdown"]:
-            # 進入倒數計時狀態時初始化倒數計時器
-            self.game_engine.countdown_start_time = pygame.time.get_ticks()
-            self.game_engine.countdown_duration = 3000  # 3秒倒數（毫秒）
-
-        elif state == GAME_STATES["playing"]:
-            # 進入遊戲時記錄開始時間
-            if (
-                not hasattr(self.game_engine, "game_start_time")
-                or self.game_engine.game_start_time == 0
-            ):
-                self.game_engine.game_start_time = pygame.time.get_ticks()
-
-        elif state == GAME_STATES["game_over"]:
-            # 進入遊戲結束狀態時停止計時
-            if hasattr(self.game_engine, "game_start_time"):
-                current_time = pygame.time.get_ticks()
-                if self.game_engine.game_start_time > 0:
-                    self.game_engine.game_stats["game_time"] = (
-                        current_time - self.game_engine.game_start_time
-                    ) / 1000
-
-        elif state == GAME_STATES["paused"]:
-            # 進入暫停狀態時記錄暫停前的狀態和時間
-            if self.previous_state and self.previous_state != GAME_STATES["paused"]:
-                self.state_before_pause = self.previous_state
-            self.pause_start_time = pygame.time.get_ticks()
-            print(f"🔒 遊戲已暫停，暫停前狀態: {self.state_before_pause}")
+        return to_state in self.transition_table.get(from_state, ())
 
     def get_current_state(self):
         """
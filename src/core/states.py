@@ -0,0 +1,397 @@
+######################載入套件######################
+import pygame
+from src.config import *
+from src.utils.image_manager import image_manager
+from src.core.game_clock import game_clock
+
+######################遊戲狀態物件######################
+
+
+class GameState:
+    """
+    遊戲狀態基底類別 - 每個遊戲狀態提供自己的進入、離開、更新、繪製和事件處理\n
+    \n
+    StateManager 在切換狀態時呼叫 enter/exit，GameEngine 和 EventHandler\n
+    每幀直接呼叫目前狀態物件的 update/render/handle_event，不需要比對狀態名稱\n
+    \n
+    新增狀態時：\n
+    1. 繼承 GameState，設定 name、next_states，視需要覆寫各個方法\n
+    2. 在 GAME_STATES 加入狀態名稱，並把類別登錄到 STATE_CLASSES\n
+    """
+
+    name = None  # 狀態名稱（GAME_STATES 的值）
+    next_states = ()  # 可以切換過去的狀態（任何狀態都可以回到選單）
+    needs_simulation = False  # 是否需要每幀呼叫 update()（同時每幀重繪）
+    redraw_interval_ms = None  # 不需要模擬時的動畫重繪間隔，None 表示只在輸入時重繪
+    time_scaled = False  # 模擬是否跟著遊戲速度（快轉、慢動作）
+
+    def __init__(self, game_engine):
+        """
+        初始化遊戲狀態\n
+        \n
+        參數:\n
+        game_engine: 遊戲引擎主物件\n
+        """
+        self.game_engine = game_engine
+
+    def enter(self, previous_state):
+        """
+        進入狀態時的處理\n
+        \n
+        參數:\n
+        previous_state (str): 上一個狀態名稱\n
+        """
+        pass
+
+    def exit(self, next_state):
+        """
+        離開狀態時的處理\n
+        \n
+        參數:\n
+        next_state (str): 下一個狀態名稱\n
+        """
+        pass
+
+    def update(self):
+        """
+        更新狀態邏輯（needs_simulation 為 True 時每幀呼叫）\n
+        """
+        pass
+
+    def render(self, screen):
+        """
+        繪製狀態畫面\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 遊戲畫面物件\n
+        """
+        pass
+
+    def handle_event(self, event):
+        """
+        處理一個事件（預設把按鍵和滑鼠點擊分給 handle_key/handle_mouse_click）\n
+        \n
+        參數:\n
+        event (pygame.event.Event): 事件物件\n
+        """
+        if event.type == pygame.KEYDOWN:
+            self.handle_key(event.key)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self.handle_mouse_click(event.button, event.pos)
+
+    def handle_key(self, key):
+        """
+        處理按鍵按下\n
+        \n
+        參數:\n
+        key: 按下的按鍵\n
+        """
+        pass
+
+    def handle_mouse_click(self, button, pos):
+        """
+        處理滑鼠點擊\n
+        \n
+        參數:\n
+        button (int): 滑鼠按鈕（1=左鍵, 3=右鍵）\n
+        pos (tuple): 滑鼠點擊位置\n
+        """
+        pass
+
+
+class MenuState(GameState):
+    """主選單狀態"""
+
+    name = GAME_STATES["menu"]
+    next_states = (GAME_STATES["character_select"], GAME_STATES["replay"])
+
+    def enter(self, previous_state):
+        # 回到選單時解除對戰圖片的固定，讓快取可以回收記憶體
+        image_manager.unpin_match_assets()
+
+    def render(self, screen):
+        self.game_engine._draw_menu()
+
+    def handle_key(self, key):
+        self.game_engine.event_handler._handle_menu_keys(key)
+
+    def handle_mouse_click(self, button, pos):
+        if button == 3:  # 選單中也可以右鍵重啟（清除設定）
+            self.game_engine.reset_game_settings()
+
+
+class SelectionState(GameState):
+    """
+    選擇界面狀態（角色、難度、場景共用）\n
+    \n
+    事件交給 SelectionUI 處理，selection_type 決定進入時顯示哪一種選擇\n
+    """
+
+    selection_type = None
+
+    def enter(self, previous_state):
+        selection_ui = self.game_engine.selection_ui
+        selection_ui.current_selection_type = self.selection_type
+
+    def render(self, screen):
+        self.game_engine.selection_ui.draw(screen)
+
+    def handle_event(self, event):
+        # 選擇界面只使用鍵盤
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            return
+        selection_result = self.game_engine.selection_ui.handle_input(event)
+        self.game_engine.event_handler._handle_selection_result(selection_result)
+
+
+class CharacterSelectState(SelectionState):
+    """角色選擇狀態"""
+
+    name = GAME_STATES["character_select"]
+    next_states = (GAME_STATES["menu"], GAME_STATES["difficulty_select"])
+    selection_type = "character"
+
+    def enter(self, previous_state):
+        super().enter(previous_state)
+        self.game_engine.selection_ui.reset_selection()
+
+    def exit(self, next_state):
+        self.game_engine.selection_ui.reset_selection()
+
+
+class DifficultySelectState(SelectionState):
+    """難度選擇狀態"""
+
+    name = GAME_STATES["difficulty_select"]
+    next_states = (GAME_STATES["character_select"], GAME_STATES["scene_select"])
+    selection_type = "difficulty"
+
+
+class SceneSelectState(SelectionState):
+    """場景選擇狀態"""
+
+    name = GAME_STATES["scene_select"]
+    next_states = (GAME_STATES["difficulty_select"], GAME_STATES["countdown"])
+    selection_type = "scene"
+
+
+class CountdownState(GameState):
+    """倒數計時狀態（倒數結束後開始遊戲）"""
+
+    name = GAME_STATES["countdown"]
+    next_states = (GAME_STATES["playing"],)
+    needs_simulation = True
+
+    def enter(self, previous_state):
+        # 進入倒數計時狀態時初始化倒數計時器
+        self.game_engine.countdown_start_time = pygame.time.get_ticks()
+        self.game_engine.countdown_duration = 3000  # 3秒倒數（毫秒）
+
+    def update(self):
+        self.game_engine._update_countdown()
+
+    def render(self, screen):
+        self.game_engine._draw_countdown()
+
+
+class PlayingState(GameState):
+    """遊戲進行中狀態"""
+
+    name = GAME_STATES["playing"]
+    next_states = (
+        GAME_STATES["menu"],
+        GAME_STATES["game_over"],
+        GAME_STATES["paused"],
+    )
+    needs_simulation = True
+    time_scaled = True
+
+    def enter(self, previous_state):
+        # 進入遊戲時記錄開始時間
+        if (
+            not hasattr(self.game_engine, "game_start_time")
+            or self.game_engine.game_start_time == 0
+        ):
+            self.game_engine.game_start_time = game_clock.get_ticks()
+
+    def exit(self, next_state):
+        # 離開遊戲狀態時暫停計時
+        if hasattr(self.game_engine, "game_start_time"):
+            current_time = game_clock.get_ticks()
+            self.game_engine.game_stats["game_time"] = (
+                current_time - self.game_engine.game_start_time
+            ) / 1000
+
+    def update(self):
+        # 每模擬一幀都依這一幀的輸入快照處理移動和連續射擊（快轉時一個畫面幀有多幀）
+        if self.game_engine.player:
+            self.game_engine.event_handler._handle_continuous_input()
+        self.game_engine._update_playing()
+        # 這一幀的輸入寫進重播（遊戲結束的那一幀也要記錄）
+        self.game_engine.replay_recorder.end_frame(
+            self.game_engine.input_manager.snapshot
+        )
+
+    def handle_event(self, event):
+        # 視窗失去焦點或最小化時自動暫停，避免玩家看不到畫面時受到攻擊
+        if event.type in (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED):
+            if RENDER_THROTTLE_CONFIGS["pause_on_focus_loss"]:
+                self.game_engine.state_manager.pause_game()
+            return
+        # 先記錄再處理：處理時可能讀檔或重新開始，錄製器會捨棄之前的事件
+        self.game_engine.replay_recorder.record_event(event)
+        super().handle_event(event)
+
+    def render(self, screen):
+        self.game_engine._draw_game()
+
+    def handle_key(self, key):
+        self.game_engine.event_handler._handle_game_keys(key)
+
+    def handle_mouse_click(self, button, pos):
+        self.game_engine.event_handler._handle_game_click(button, pos)
+
+
+class PausedState(GameState):
+    """暫停狀態（不更新遊戲邏輯）"""
+
+    name = GAME_STATES["paused"]
+    next_states = (GAME_STATES["playing"], GAME_STATES["menu"])
+    redraw_interval_ms = 100  # 暫停時間顯示到 0.1 秒
+
+    def enter(self, previous_state):
+        # 進入暫停狀態時記錄暫停前的狀態和時間
+        state_manager = self.game_engine.state_manager
+        if previous_state and previous_state != self.name:
+            state_manager.state_before_pause = previous_state
+        state_manager.pause_start_time = pygame.time.get_ticks()
+        print(f"🔒 遊戲已暫停，暫停前狀態: {state_manager.state_before_pause}")
+
+    def render(self, screen):
+        self.game_engine._draw_paused()
+
+    def handle_key(self, key):
+        self.game_engine.event_handler._handle_paused_keys(key)
+
+
+class GameOverState(GameState):
+    """遊戲結束狀態"""
+
+    name = GAME_STATES["game_over"]
+    next_states = (GAME_STATES["menu"], GAME_STATES["playing"])
+    redraw_interval_ms = 250  # 背景的遊戲畫面有閃爍效果
+
+    def enter(self, previous_state):
+        # 進入遊戲結束狀態時停止計時
+        if hasattr(self.game_engine, "game_start_time"):
+            current_time = game_clock.get_ticks()
+            if self.game_engine.game_start_time > 0:
+                self.game_engine.game_stats["game_time"] = (
+                    current_time - self.game_engine.game_start_time
+                ) / 1000
+
+    def render(self, screen):
+        self.game_engine._draw_game_over()
+
+    def handle_key(self, key):
+        self.game_engine.event_handler._handle_game_over_keys(key)
+
+    def handle_mouse_click(self, button, pos):
+        if button == 3:  # 滑鼠右鍵 - 重新開始遊戲
+            self.game_engine.start_new_game()
+
+
+class ReplayState(GameState):
+    """
+    重播觀看狀態\n
+    \n
+    每幀由 ReplayPlayer 重現錄製的輸入並模擬一幀，畫面下方的時間軸可以點擊或拖曳跳轉\n
+    """
+
+    name = GAME_STATES["replay"]
+    next_states = (GAME_STATES["menu"],)
+    needs_simulation = True
+    time_scaled = True
+
+    def __init__(self, game_engine):
+        super().__init__(game_engine)
+        self.dragging = False  # 是否正在拖曳時間軸
+
+    def enter(self, previous_state):
+        self.dragging = False
+
+    def exit(self, next_state):
+        # 關閉重播檔（引擎裡留下的是重播的狀態，下一場遊戲開始時會重新建立）
+        if self.game_engine.replay_player:
+            self.game_engine.replay_player.close()
+            self.game_engine.replay_player = None
+        # 重播選的速度不帶到之後的遊戲
+        self.game_engine.time_scale.reset()
+
+    def update(self):
+        self.game_engine.replay_player.update()
+
+    def render(self, screen):
+        self.game_engine._draw_game()
+        self.game_engine.game_ui.draw_replay_bar(screen, self.game_engine.replay_player)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONUP:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self._seek_to_position(event.pos)
+        else:
+            super().handle_event(event)
+
+    def handle_key(self, key):
+        replay_player = self.game_engine.replay_player
+        step = REPLAY_CONFIGS["seek_step_frames"]
+        if self.game_engine.time_scale.handle_key(key):
+            return
+        if key == pygame.K_ESCAPE:
+            self.game_engine.state_manager.change_state("menu")
+        elif key == pygame.K_SPACE:
+            replay_player.playing = not replay_player.playing
+        elif key == pygame.K_LEFT:
+            replay_player.seek(replay_player.current_frame - step)
+        elif key == pygame.K_RIGHT:
+            replay_player.seek(replay_player.current_frame + step)
+        elif key == pygame.K_HOME:
+            replay_player.seek(0)
+        elif key == pygame.K_END:
+            replay_player.seek(replay_player.frame_count)
+
+    def handle_mouse_click(self, button, pos):
+        bar_rect = self.game_engine.game_ui.get_replay_bar_rect()
+        if button == 1 and bar_rect.inflate(0, 16).collidepoint(pos):
+            self.dragging = True
+            self._seek_to_position(pos)
+
+    def _seek_to_position(self, pos):
+        """
+        跳到時間軸上滑鼠位置對應的幀\n
+        \n
+        參數:\n
+        pos (tuple): 滑鼠位置\n
+        """
+        bar_rect = self.game_engine.game_ui.get_replay_bar_rect()
+        ratio = min(1, max(0, (pos[0] - bar_rect.left) / bar_rect.width))
+        replay_player = self.game_engine.replay_player
+        replay_player.seek(round(ratio * replay_player.frame_count))
+
+
+# 狀態名稱 -> 狀態類別（StateManager 依此建立狀態物件）
+STATE_CLASSES = {
+    state_class.name: state_class
+    for state_class in (
+        MenuState,
+        CharacterSelectState,
+        DifficultySelectState,
+        SceneSelectState,
+        CountdownState,
+        PlayingState,
+        PausedState,
+        GameOverState,
+        ReplayState,
+    )
+}
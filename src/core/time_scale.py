@@ -0,0 +1,172 @@
+######################載入套件######################
+import pygame
+import time
+from src.config import *
+
+######################遊戲速度控制######################
+
+
+class TimeScaleController:
+    """
+    遊戲速度控制 - 決定每個畫面幀要模擬幾個遊戲幀\n
+    \n
+    此系統負責：\n
+    1. 在 TIME_SCALE_CONFIGS 的倍率之間切換（慢動作、快轉、不限速）\n
+    2. 每個畫面幀累加倍率，累積到整數時模擬對應的幀數（0.25× 每四個畫面模擬一次）\n
+    3. 不限速時在時間預算內盡量模擬\n
+    4. 高倍率時降低重繪頻率，把時間留給模擬\n
+    \n
+    遊戲時鐘以模擬的幀數前進，所以任何倍率下的遊戲結果都和正常速度相同\n
+    \n
+    使用方式:\n
+    time_scale.run_steps(state.update, is_active)  # 每個畫面幀\n
+    if time_scale.should_render(): render()\n
+    """
+
+    def __init__(self):
+        """
+        初始化遊戲速度控制\n
+        """
+        self.scales = TIME_SCALE_CONFIGS["scales"]
+        self.scale_index = self.scales.index(1)
+        self.step_accumulator = 0.0  # 還沒模擬的幀數（小數部分留到下一個畫面幀）
+        self.last_render_time = 0
+
+        # 統計資料
+        self.steps_last_frame = 0
+        self.total_steps = 0
+
+    @property
+    def scale(self):
+        """
+        目前的倍率（None 表示不限速）\n
+        """
+        return self.scales[self.scale_index]
+
+    def get_label(self):
+        """
+        取得目前倍率的顯示文字\n
+        \n
+        回傳:\n
+        str: 例如 "×0.25"、"×4"、"不限速"\n
+        """
+        if self.scale is None:
+            return "不限速"
+        return f"×{self.scale:g}"
+
+    def set_scale_index(self, scale_index):
+        """
+        切換倍率\n
+        \n
+        參數:\n
+        scale_index (int): TIME_SCALE_CONFIGS["scales"] 的索引（超出範圍時限制在兩端）\n
+        """
+        scale_index = max(0, min(scale_index, len(self.scales) - 1))
+        if scale_index == self.scale_index:
+            return
+        self.scale_index = scale_index
+        self.step_accumulator = 0.0
+        print(f"⏩ 遊戲速度: {self.get_label()}")
+
+    def faster(self):
+        """
+        切換到下一個較快的倍率\n
+        """
+        self.set_scale_index(self.scale_index + 1)
+
+    def slower(self):
+        """
+        切換到下一個較慢的倍率\n
+        """
+        self.set_scale_index(self.scale_index - 1)
+
+    def reset(self):
+        """
+        回到正常速度\n
+        """
+        self.set_scale_index(self.scales.index(1))
+
+    def handle_key(self, key):
+        """
+        處理速度切換按鍵\n
+        \n
+        參數:\n
+        key: 按下的按鍵\n
+        \n
+        回傳:\n
+        bool: 是否為速度切換按鍵\n
+        """
+        if key == TIME_SCALE_CONFIGS["faster_key"]:
+            self.faster()
+        elif key == TIME_SCALE_CONFIGS["slower_key"]:
+            self.slower()
+        elif key == TIME_SCALE_CONFIGS["reset_key"]:
+            self.reset()
+        else:
+            return False
+        return True
+
+    def run_steps(self, step_function, is_active):
+        """
+        依目前倍率模擬這個畫面幀的遊戲幀\n
+        \n
+        參數:\n
+        step_function (function): 模擬一幀的函數\n
+        is_active (function): 回傳是否繼續模擬（狀態改變時停止）\n
+        \n
+        回傳:\n
+        int: 這個畫面幀模擬的幀數\n
+        """
+        steps = 0
+        if self.scale is None:
+            # 不限速：在時間預算內盡量模擬
+            budget_seconds = TIME_SCALE_CONFIGS["uncapped_budget_ms"] / 1000
+            deadline = time.perf_counter() + budget_seconds
+            max_steps = TIME_SCALE_CONFIGS["uncapped_max_steps"]
+            while steps < max_steps:
+                step_function()
+                steps += 1
+                if not is_active() or time.perf_counter() >= deadline:
+                    break
+        else:
+            self.step_accumulator += self.scale
+            steps_due = int(self.step_accumulator)
+            self.step_accumulator -= steps_due
+            steps_due = min(steps_due, TIME_SCALE_CONFIGS["max_steps_per_frame"])
+            while steps < steps_due:
+                step_function()
+                steps += 1
+                if not is_active():
+                    break
+
+        self.steps_last_frame = steps
+        self.total_steps += steps
+        return steps
+
+    def should_render(self):
+        """
+        判斷高倍率時這一幀是否需要重繪\n
+        \n
+        回傳:\n
+        bool: 是否需要重繪（一般倍率一律重繪）\n
+        """
+        scale = self.scale
+        if scale is not None and scale < TIME_SCALE_CONFIGS["skip_render_scale"]:
+            return True
+
+        current_time = pygame.time.get_ticks()
+        render_interval = TIME_SCALE_CONFIGS["fast_render_interval_ms"]
+        if current_time - self.last_render_time < render_interval:
+            return False
+        self.last_render_time = current_time
+        return True
+
+    def get_overlay_lines(self):
+        """
+        取得效能面板顯示的速度資訊\n
+        \n
+        回傳:\n
+        list: 要顯示的文字行\n
+        """
+        speed = "uncapped" if self.scale is None else f"x{self.scale:g}"
+        return [f"speed: {speed} ({self.steps_last_frame} steps/frame)"]
@@ -3,6 +3,7 @@ import pygame
 import math
 from src.config import *
 from src.utils.image_manager import image_manager
+from src.core.game_clock import game_clock
 
 ######################物件類別######################
 
@@ -61,7 +62,7 @@ class Bullet:
         self.velocity_x = speed * math.cos(rad_angle)
         self.velocity_y = speed * math.sin(rad_angle)
 
-    def update(self, screen_width, screen_height):
+    def update(self, screen_width, screen_height, world=None):
         """
         更新子彈位置和狀態（每幀呼叫）\n
         \n
@@ -73,6 +74,7 @@ class Bullet:
         參數:\n
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
+        world (WorldContext): 這一幀的世界快照（一般子彈不使用，追蹤子彈用來找目標）\n
         \n
         回傳:\n
         bool: 子彈是否仍然有效\n
@@ -290,7 +292,7 @@ class SkillBullet(Bullet):
 
         # 生命時間管理
         self.lifetime = lifetime  # 子彈生命時間（毫秒）
-        self.start_time = pygame.time.get_ticks()  # 記錄創建時間
+        self.start_time = game_clock.get_ticks()  # 記錄創建時間
 
         # 如果沒有指定目標，尋找最近的敵人
         if self.target is None:
@@ -300,10 +302,21 @@ class SkillBullet(Bullet):
         self.trail_positions = []
         self.max_trail_length = 10  # 增加軌跡長度
 
-    def _find_nearest_target(self):
+    def _find_nearest_target(self, world=None):
         """
         尋找最近的活著敵人作為追蹤目標\n
+        \n
+        參數:\n
+        world (WorldContext): 這一幀的世界快照，有的話使用預先算好的敵人中心點\n
         """
+        if world is not None:
+            self.target = world.nearest_enemy(
+                self.x + self.size / 2,
+                self.y + self.size / 2,
+                self.max_tracking_distance,
+            )
+            return
+
         if not self.enemies_list:
             return
 
@@ -332,20 +345,26 @@ class SkillBullet(Bullet):
 
         self.target = nearest_enemy
 
-    def _update_tracking(self):
+    def _update_tracking(self, world=None):
         """
         更新追蹤邏輯 - 調整子彈方向朝向目標\n
+        \n
+        參數:\n
+        world (WorldContext): 這一幀的世界快照（可省略）\n
         """
         if not self.target or not self.target.is_alive:
             # 目標死亡或消失，重新尋找目標
-            self._find_nearest_target()
+            self._find_nearest_target(world)
             return
 
         # 計算子彈和目標的中心點
         bullet_center_x = self.x + self.size / 2
         bullet_center_y = self.y + self.size / 2
-        target_center_x = self.target.x + self.target.width / 2
-        target_center_y = self.target.y + self.target.height / 2
+        if world is not None:
+            target_center_x, target_center_y = world.get_enemy_center(self.target)
+        else:
+            target_center_x = self.target.x + self.target.width / 2
+            target_center_y = self.target.y + self.target.height / 2
 
         # 檢查目標是否還在追蹤範圍內
         distance = math.sqrt(
@@ -355,7 +374,7 @@ class SkillBullet(Bullet):
 
         if distance > self.max_tracking_distance:
             # 目標太遠，重新尋找目標
-            self._find_nearest_target()
+            self._find_nearest_target(world)
             return
 
         # 計算朝向目標的角度
@@ -388,13 +407,14 @@ class SkillBullet(Bullet):
         self.velocity_x = current_speed * math.cos(new_angle_rad)
         self.velocity_y = current_speed * math.sin(new_angle_rad)
 
-    def update(self, screen_width, screen_height):
+    def update(self, screen_width, screen_height, world=None):
         """
         更新技能子彈狀態（覆寫父類別方法）\n
         \n
         參數:\n
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
+        world (WorldContext): 這一幀的世界快照，追蹤目標時使用\n
         \n
         回傳:\n
         bool: 子彈是否仍然有效\n
@@ -403,7 +423,7 @@ class SkillBullet(Bullet):
             return False
 
         # 檢查生命時間是否已過
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         if current_time - self.start_time >= self.lifetime:
             self.is_active = False
             return False
@@ -414,7 +434,7 @@ class SkillBullet(Bullet):
             self.trail_positions.pop(0)
 
         # 更新追蹤邏輯
-        self._update_tracking()
+        self._update_tracking(world)
 
         # 調用父類別的位置更新
         return super().update(screen_width, screen_height)
@@ -717,7 +737,7 @@ class BulletManager:
 
         return created_bullets
 
-    def update(self, screen_width, screen_height):
+    def update(self, screen_width, screen_height, world=None):
         """
         更新所有子彈狀態\n
         \n
@@ -726,12 +746,13 @@ class BulletManager:
         參數:\n
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
+        world (WorldContext): 這一幀的世界快照（追蹤子彈使用）\n
         """
         # 更新所有子彈並收集還活著的子彈
         active_bullets = []
 
         for bullet in self.bullets:
-            if bullet.update(screen_width, screen_height):
+            if bullet.update(screen_width, screen_height, world):
                 active_bullets.append(bullet)
 
         # 更新子彈列表（移除無效子彈）
@@ -4,6 +4,10 @@ import math
 import random
 from src.config import *
 from src.utils.font_manager import font_manager
+from src.utils.image_manager import image_manager
+from src.systems.timer_scheduler import timer_scheduler
+from src.systems.damage_queue import damage_queue
+from src.core.game_clock import game_clock
 
 ######################物件類別######################
 
@@ -96,7 +100,14 @@ class Enemy:
 
         # 狀態機
         self.state = "patrol"  # 可能狀態: patrol, chase, attack, dodge
-        self.state_timer = 0
+        self.state_timer = 0  # 每幀遞增（不論這一幀是否重新規劃）
+        self.last_think_timer = 0  # 上次重新規劃時的 state_timer
+
+        # AI 排程（由 AIScheduler 設定下一次重新規劃的幀）
+        self.next_think_frame = None
+
+        # 場景流場（由 update 從世界快照取得，沒有障礙物時為 None）
+        self.flow_field = None
 
         # BOSS 特殊攻擊設定（若為 BOSS 才會使用）
         self.special_cooldown = 3000  # 毫秒，BOSS 使用特殊攻擊的冷卻
@@ -114,7 +125,7 @@ class Enemy:
         """
         載入敵人圖片\n
         \n
-        嘗試載入敵人類型對應的圖片檔案，\n
+        透過圖片管理器載入敵人類型對應的圖片（共用快取，不會每次生成都重新解碼），\n
         如果載入失敗則回傳 None，使用預設圖形\n
         \n
         回傳:\n
@@ -125,16 +136,24 @@ class Enemy:
             # 沒有指定圖片路徑，使用預設圖形
             return None
 
-        try:
-            # 嘗試載入圖片
-            enemy_image = pygame.image.load(image_path).convert_alpha()
-            # 調整圖片大小到敵人尺寸
-            enemy_image = pygame.transform.scale(enemy_image, (self.width, self.height))
-            return enemy_image
-        except pygame.error as e:
-            # 圖片載入失敗，印出錯誤訊息並使用預設圖形
-            print(f"載入敵人圖片失敗 ({self.enemy_type}): {e}")
-            return None
+        # 載入並調整圖片大小到敵人尺寸（失敗時回傳 None，使用預設圖形）
+        return image_manager.load_image(image_path, (self.width, self.height))
+
+    def __getstate__(self):
+        """
+        取得存檔用的狀態（圖片和流場不存進存檔，還原後重新取得）\n
+        """
+        state = self.__dict__.copy()
+        state["enemy_image"] = None
+        state["flow_field"] = None
+        return state
+
+    def __setstate__(self, state):
+        """
+        從存檔還原狀態並重新載入敵人圖片\n
+        """
+        self.__dict__.update(state)
+        self.enemy_image = self._load_enemy_image()
 
     def update_ai_behavior(self, player, screen_width, screen_height):
         """
@@ -150,11 +169,6 @@ class Enemy:
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
         """
-        current_time = pygame.time.get_ticks()
-
-        # 更新狀態計時器
-        self.state_timer += 1
-
         # 計算與玩家的距離和角度
         distance_to_player = self._calculate_distance_to_player(player)
         angle_to_player = self._calculate_angle_to_player(player)
@@ -173,6 +187,22 @@ class Enemy:
                 player, distance_to_player, angle_to_player, screen_width, screen_height
             )
 
+        self.last_think_timer = self.state_timer
+
+    def _period_elapsed(self, period):
+        """
+        檢查上次重新規劃之後是否跨過了 period 的整數倍\n
+        \n
+        敵人不一定每幀思考，所以不能用 state_timer % period == 0 判斷週期事件\n
+        \n
+        參數:\n
+        period (int): 週期（幀數）\n
+        \n
+        回傳:\n
+        bool: 是否到了週期事件的時間\n
+        """
+        return self.state_timer // period != self.last_think_timer // period
+
     def _simple_ai_behavior(self, player, distance, angle, screen_width, screen_height):
         """
         簡單AI行為（弱AI）\n
@@ -297,7 +327,7 @@ class Enemy:
     def _adaptive_tactics(self, player, distance, angle, screen_width, screen_height):
         """自適應戰術（根據情況調整）"""
         # 分析玩家移動模式並做出反應
-        if self.state_timer % 180 == 0:  # 每3秒重新評估戰術
+        if self._period_elapsed(180):  # 每3秒重新評估戰術
             self._analyze_player_behavior(player)
 
         # 執行當前戰術
@@ -308,14 +338,35 @@ class Enemy:
         else:
             self._long_range_tactics(player, screen_width, screen_height)
 
+    def _get_chase_direction(self):
+        """
+        從場景流場取得繞過障礙物朝玩家前進的方向\n
+        \n
+        回傳:\n
+        tuple: 方向單位向量 (dx, dy)，沒有流場或已在玩家格子時回傳 None\n
+        """
+        if self.flow_field is None:
+            return None
+        return self.flow_field.sample(
+            self.x + self.width / 2, self.y + self.height / 2
+        )
+
     def _move_towards_player(self, player, speed_factor=1.0):
         """
         朝玩家方向移動\n
         \n
+        場景有障礙物時沿流場繞路，否則直線朝玩家移動\n
+        \n
         參數:\n
         player: 玩家物件\n
         speed_factor (float): 速度調整係數\n
         """
+        chase_direction = self._get_chase_direction()
+        if chase_direction is not None:
+            self.velocity_x = chase_direction[0] * self.speed * speed_factor
+            self.velocity_y = chase_direction[1] * self.speed * speed_factor
+            return
+
         dx = player.x - self.x
         dy = player.y - self.y
         distance = math.sqrt(dx * dx + dy * dy)
@@ -363,12 +414,12 @@ class Enemy:
             self.velocity_y = perpendicular_y * self.speed * 0.7
 
         # 偶爾改變繞行方向
-        if self.state_timer % 120 == 0:
+        if self._period_elapsed(120):
             self.dodge_direction *= -1
 
     def _random_movement(self, screen_width, screen_height):
         """隨機移動模式（巡邏用）"""
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
 
         # 每2秒改變一次移動方向
         if current_time - self.direction_change_time > 2000:
@@ -409,10 +460,10 @@ class Enemy:
         回傳:\n
         bool: 是否可以射擊\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         return current_time - self.last_shot_time >= self.fire_rate
 
-    def calculate_shot_angle(self, player):
+    def calculate_shot_angle(self, player, world=None):
         """
         計算射擊角度（包含預測性瞄準）\n
         \n
@@ -420,25 +471,33 @@ class Enemy:
         \n
         參數:\n
         player: 玩家物件\n
+        world (WorldContext): 這一幀的世界快照，有的話直接使用預先算好的玩家中心和預測位移\n
         \n
         回傳:\n
         float: 射擊角度（度數）\n
         """
+        if world is not None:
+            player_center_x, player_center_y = world.player_center
+        else:
+            player_center_x = player.x + player.width / 2
+            player_center_y = player.y + player.height / 2
+
         # 基本角度計算
-        base_dx = player.x + player.width / 2 - (self.x + self.width / 2)
-        base_dy = player.y + player.height / 2 - (self.y + self.height / 2)
+        base_dx = player_center_x - (self.x + self.width / 2)
+        base_dy = player_center_y - (self.y + self.height / 2)
 
         # 預測性瞄準（根據玩家移動速度）
         if self.move_pattern in ["tactical", "advanced"]:
-            # 計算玩家移動預測
-            prediction_time = 0.5  # 預測0.5秒後的位置
-            predicted_x = (
-                base_dx + player.velocity_x * prediction_time * 60
-            )  # 60fps假設
-            predicted_y = base_dy + player.velocity_y * prediction_time * 60
+            if world is not None:
+                lead_x, lead_y = world.player_lead
+            else:
+                # 計算玩家移動預測
+                prediction_time = 0.5  # 預測0.5秒後的位置
+                lead_x = player.velocity_x * prediction_time * 60  # 60fps假設
+                lead_y = player.velocity_y * prediction_time * 60
 
-            base_dx = predicted_x
-            base_dy = predicted_y
+            base_dx += lead_x
+            base_dy += lead_y
 
         # 計算角度
         angle = math.degrees(math.atan2(base_dy, base_dx)) + 90  # +90調整為向上為0度
@@ -449,17 +508,18 @@ class Enemy:
 
         return angle
 
-    def shoot(self, player):
+    def shoot(self, player, world=None):
         """
         執行射擊動作\n
         \n
         參數:\n
         player: 玩家物件（用於瞄準）\n
+        world (WorldContext): 這一幀的世界快照（可省略）\n
         \n
         回傳:\n
         dict: 射擊資訊，如果不能射擊則回傳 None\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
 
         # BOSS 的特殊攻擊：放射狀子彈（360度）
         if self.enemy_type == "boss":
@@ -497,7 +557,7 @@ class Enemy:
         self.last_shot_time = current_time
 
         # 計算射擊角度
-        angle = self.calculate_shot_angle(player)
+        angle = self.calculate_shot_angle(player, world)
 
         # 準備射擊資料
         shot_data = {
@@ -549,7 +609,13 @@ class Enemy:
         duration (int): 效果持續時間（毫秒）\n
         damage_per_second (int): 每秒造成的傷害（僅用於燃燒效果）\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
+
+        # 重複套用時取消舊效果的計時器，效果重新計時
+        previous_effect = self.status_effects.get(effect_type)
+        if previous_effect:
+            for timer in previous_effect["timers"]:
+                timer_scheduler.cancel(timer)
 
         if effect_type == "freeze":
             # 冰凍效果：減速50%
@@ -557,56 +623,56 @@ class Enemy:
                 "start_time": current_time,
                 "duration": duration,
                 "speed_reduction": 0.5,  # 減速50%
+                "timers": [
+                    timer_scheduler.schedule(
+                        duration, self._remove_status_effect, "freeze"
+                    )
+                ],
             }
             # 立即套用減速效果
             self.speed = self.original_speed * (1 - 0.5)
 
         elif effect_type == "burn":
-            # 燃燒效果：持續傷害
-            self.status_effects["burn"] = {
+            # 燃燒效果：持續傷害（先排程結束，同時到期時效果先結束不再造成傷害）
+            effect_data = {
                 "start_time": current_time,
                 "duration": duration,
                 "damage_per_second": damage_per_second,
                 "last_damage_time": current_time,
             }
+            effect_data["timers"] = [
+                timer_scheduler.schedule(duration, self._remove_status_effect, "burn"),
+                timer_scheduler.schedule(1000, self._apply_burn_damage, effect_data),
+            ]
+            self.status_effects["burn"] = effect_data
 
-    def update_status_effects(self):
+    def _apply_burn_damage(self, effect_data):
         """
-        更新並處理所有狀態效果\n
+        燃燒效果計時器：排入一次燃燒傷害並排程下一次（每1000毫秒）\n
         \n
-        檢查效果是否過期，處理持續傷害等\n
+        參數:\n
+        effect_data (dict): 觸發這次傷害的燃燒效果資料\n
         """
-        current_time = pygame.time.get_ticks()
-        expired_effects = []
+        # 效果已結束或被新的燃燒效果取代
+        if not self.is_alive or self.status_effects.get("burn") is not effect_data:
+            return
 
-        for effect_type, effect_data in self.status_effects.items():
-            # 檢查效果是否過期
-            elapsed_time = current_time - effect_data["start_time"]
-            if elapsed_time >= effect_data["duration"]:
-                expired_effects.append(effect_type)
-                continue
-
-            # 處理各種效果的持續作用
-            if effect_type == "burn":
-                # 燃燒效果：每秒造成傷害
-                time_since_last_damage = current_time - effect_data["last_damage_time"]
-                if time_since_last_damage >= 1000:  # 每1000毫秒（1秒）造成一次傷害
-                    burn_damage = effect_data["damage_per_second"]
-                    self.health -= burn_damage
-                    effect_data["last_damage_time"] = current_time
-
-                    # 確保生命值不會低於0
-                    if self.health <= 0:
-                        self.health = 0
-                        self.is_alive = False
-
-        # 移除過期的效果
-        for effect_type in expired_effects:
-            self._remove_status_effect(effect_type)
+        # 傷害在這一幀的傷害佇列結算時才扣血
+        damage_queue.add(self, effect_data["damage_per_second"], "burn")
+        effect_data["last_damage_time"] += 1000
+
+        # 以上一次傷害的時間點排程，不受幀時間誤差累積影響
+        effect_data["timers"].append(
+            timer_scheduler.schedule_at(
+                effect_data["last_damage_time"] + 1000,
+                self._apply_burn_damage,
+                effect_data,
+            )
+        )
 
     def _remove_status_effect(self, effect_type):
         """
-        移除指定的狀態效果並恢復正常狀態\n
+        移除指定的狀態效果並恢復正常狀態（效果到期時由計時器呼叫）\n
         \n
         參數:\n
         effect_type (str): 要移除的狀態效果類型\n
@@ -616,7 +682,9 @@ class Enemy:
                 # 恢復原始移動速度
                 self.speed = self.original_speed
 
-            # 移除效果
+            # 取消這個效果還沒觸發的計時器，並移除效果
+            for timer in self.status_effects[effect_type]["timers"]:
+                timer_scheduler.cancel(timer)
             del self.status_effects[effect_type]
 
     def has_status_effect(self, effect_type):
@@ -638,7 +706,7 @@ class Enemy:
         回傳:\n
         dict: 狀態效果資訊\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         effects_info = {}
 
         for effect_type, effect_data in self.status_effects.items():
@@ -675,7 +743,7 @@ class Enemy:
 
         return self.is_alive
 
-    def update(self, player, screen_width, screen_height):
+    def update(self, player, screen_width, screen_height, think=True, world=None):
         """
         更新敵人狀態（每幀呼叫）\n
         \n
@@ -683,23 +751,28 @@ class Enemy:
         player: 玩家物件\n
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
+        think (bool): 這一幀是否重新規劃行為，False 時沿用上次的移動方向\n
+        world (WorldContext): 這一幀的世界快照（提供場景流場）\n
         """
         if not self.is_alive:
             return
 
-        # 更新狀態效果
-        self.update_status_effects()
+        self.flow_field = world.flow_field if world is not None else None
 
-        # 如果被狀態效果殺死則直接返回
-        if not self.is_alive:
-            return
+        # 更新狀態計時器
+        self.state_timer += 1
 
-        # 更新AI行為
-        self.update_ai_behavior(player, screen_width, screen_height)
+        # 更新AI行為（沒有輪到思考時繼續執行上次規劃的移動）
+        if think:
+            self.update_ai_behavior(player, screen_width, screen_height)
 
-        # 更新位置
-        self.x += self.velocity_x
-        self.y += self.velocity_y
+        # 更新位置（不能走進障礙物）
+        new_x = self.x + self.velocity_x
+        new_y = self.y + self.velocity_y
+        if self.flow_field is not None:
+            new_x, new_y = self.flow_field.resolve_movement(self, new_x, new_y)
+        self.x = new_x
+        self.y = new_y
 
         # 邊界檢查
         if self.x < 0:
@@ -1078,8 +1151,14 @@ class Enemy:
 
     def _tactical_approach(self, player, screen_width, screen_height):
         """戰術接近"""
-        # 不直接衝向玩家，而是採用曲折路線
-        angle_to_player = self._calculate_angle_to_player(player)
+        # 不直接衝向玩家，而是採用曲折路線（有障礙物時以流場方向為準）
+        chase_direction = self._get_chase_direction()
+        if chase_direction is not None:
+            angle_to_player = math.degrees(
+                math.atan2(chase_direction[1], chase_direction[0])
+            )
+        else:
+            angle_to_player = self._calculate_angle_to_player(player)
 
         # 添加隨機偏移角度
         offset_angle = random.uniform(-45, 45)
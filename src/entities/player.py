@@ -4,6 +4,8 @@ import math
 from src.config import *
 from src.utils.image_manager import image_manager
 from src.utils.sound_manager import get_sound_manager
+from src.systems.timer_scheduler import timer_scheduler
+from src.core.game_clock import game_clock
 
 ######################物件類別######################
 
@@ -99,6 +101,23 @@ class Player:
             self.character_type
         )
 
+    def __getstate__(self):
+        """
+        取得存檔用的狀態（圖片不存進存檔，還原時重新從快取取得）\n
+        """
+        state = self.__dict__.copy()
+        state["character_image"] = None
+        return state
+
+    def __setstate__(self, state):
+        """
+        從存檔還原狀態並重新取得角色圖片\n
+        """
+        self.__dict__.update(state)
+        self.character_image = image_manager.get_character_image_for_game(
+            self.character_type
+        )
+
     def _init_weapons(self):
         """
         初始化所有武器的彈藥和狀態\n
@@ -125,7 +144,7 @@ class Player:
         - 技能方向：當技能啟動時，技能攻擊方向跟隨滑鼠位置\n
         \n
         參數:\n
-        keys (pygame.key): pygame 按鍵狀態物件\n
+        keys (InputSnapshot): 這一幀的輸入快照（用 keys[按鍵代碼] 查詢是否按住）\n
         mouse_pos (tuple): 滑鼠位置座標 (x, y)，用於準心顯示和技能方向控制\n
         mouse_buttons (tuple): 滑鼠按鍵狀態，暫時保留但不用於移動控制\n
         """
@@ -195,7 +214,7 @@ class Player:
         處理鍵盤移動控制（WASD）\n
         \n
         參數:\n
-        keys (pygame.key): pygame 按鍵狀態物件\n
+        keys (InputSnapshot): 這一幀的輸入快照\n
         """
         # 檢查移動按鍵（WASD）
         if keys[KEYS["move_left"]]:
@@ -277,7 +296,7 @@ class Player:
         if not self.is_reloading:
             return
 
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         weapon_config = WEAPON_CONFIGS[self.current_weapon]
 
         # 檢查填裝時間是否足夠
@@ -316,7 +335,7 @@ class Player:
         #     return False
 
         # 檢查射擊冷卻時間（應用角色射速倍率）
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         weapon_config = WEAPON_CONFIGS[self.current_weapon]
 
         # 角色射速倍率影響射擊間隔（射速高則間隔短）
@@ -349,7 +368,7 @@ class Player:
         # weapon_state["current_ammo"] -= 1
 
         # 記錄射擊時間
-        self.last_shot_time = pygame.time.get_ticks()
+        self.last_shot_time = game_clock.get_ticks()
 
         # 播放武器射擊音效
         get_sound_manager().play_weapon_sound(self.current_weapon)
@@ -442,7 +461,7 @@ class Player:
         回傳:\n
         dict: 技能使用結果，包含是否成功和技能資訊\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         skill_config = self.character_config["skill"]
 
         # 檢查技能冷卻時間
@@ -486,6 +505,9 @@ class Player:
             "start_time": current_time,
             "duration": skill_config["duration"],  # 3000ms = 3秒
         }
+        timer_scheduler.schedule(
+            skill_config["duration"], self._end_skill, self.active_skill
+        )
 
         # 計算玩家中心點作為發射起點
         start_x = self.x + self.width / 2
@@ -540,7 +562,7 @@ class Player:
         參數:\n
         powerup_type (str): 強化類型（'fire_boost', 'ammo_refill', 'scatter_shot', 'machinegun_powerup', 'submachinegun_powerup', 'victory_star'）\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
 
         if powerup_type == "ammo_refill":
             # 立即補充所有武器彈藥
@@ -574,47 +596,37 @@ class Player:
                 weapon_config = WEAPON_CONFIGS[weapon_type]
                 self.weapons[weapon_type]["current_ammo"] = weapon_config["max_ammo"]
         else:
-            # 時間性強化效果
+            # 時間性強化效果（重複拾取時重新計時）
             effect_config = POWERUP_EFFECTS[powerup_type]
+            previous_powerup = self.powerups.get(powerup_type)
+            if previous_powerup:
+                timer_scheduler.cancel(previous_powerup.get("timer"))
             self.powerups[powerup_type] = {
                 "start_time": current_time,
                 "duration": effect_config["duration"],
+                "timer": timer_scheduler.schedule(
+                    effect_config["duration"], self._expire_powerup, powerup_type
+                ),
             }
 
-    def update_powerups(self):
+    def _expire_powerup(self, powerup_type):
         """
-        更新所有強化效果的時間\n
+        移除到期的強化效果（由計時器在效果到期時呼叫）\n
         \n
-        移除已過期的強化效果\n
+        參數:\n
+        powerup_type (str): 強化效果類型\n
         """
-        current_time = pygame.time.get_ticks()
-        expired_powerups = []
-
-        for powerup_type, powerup_data in self.powerups.items():
-            if "duration" in powerup_data:
-                if (
-                    current_time - powerup_data["start_time"]
-                    >= powerup_data["duration"]
-                ):
-                    expired_powerups.append(powerup_type)
+        self.powerups.pop(powerup_type, None)
 
-        # 移除過期的強化效果
-        for powerup_type in expired_powerups:
-            del self.powerups[powerup_type]
-
-    def update_skill_effects(self):
+    def _end_skill(self, skill):
         """
-        更新技能效果狀態\n
+        結束技能效果（由計時器在技能持續時間結束時呼叫）\n
         \n
-        檢查技能是否已經結束，並清除過期的技能效果\n
+        參數:\n
+        skill (dict): 排程時啟用的技能（已被新技能取代時不處理）\n
         """
-        if self.active_skill:
-            current_time = pygame.time.get_ticks()
-            skill_elapsed_time = current_time - self.active_skill["start_time"]
-
-            if skill_elapsed_time >= self.active_skill["duration"]:
-                # 技能時間結束
-                self.active_skill = None
+        if self.active_skill is skill:
+            self.active_skill = None
 
     def get_skill_damage_per_second(self):
         """
@@ -631,12 +643,13 @@ class Player:
         duration_seconds = self.active_skill["duration"] / 1000  # 轉成秒
         return total_damage / duration_seconds
 
-    def can_deal_skill_damage_to_enemy(self, enemy):
+    def can_deal_skill_damage_to_enemy(self, enemy, world=None):
         """
         檢查是否可以對指定敵人造成技能傷害
 
         參數:
         enemy: 敵人物件
+        world (WorldContext): 這一幀的世界快照，有的話使用預先算好的中心點
 
         回傳:
         bool: 是否可以造成傷害
@@ -649,10 +662,14 @@ class Player:
             return False
 
         # 計算距離
-        player_center_x = self.x + self.width / 2
-        player_center_y = self.y + self.height / 2
-        enemy_center_x = enemy.x + enemy.width / 2
-        enemy_center_y = enemy.y + enemy.height / 2
+        if world is not None:
+            player_center_x, player_center_y = world.player_center
+            enemy_center_x, enemy_center_y = world.get_enemy_center(enemy)
+        else:
+            player_center_x = self.x + self.width / 2
+            player_center_y = self.y + self.height / 2
+            enemy_center_x = enemy.x + enemy.width / 2
+            enemy_center_y = enemy.y + enemy.height / 2
 
         distance = math.sqrt(
             (enemy_center_x - player_center_x) ** 2
@@ -682,7 +699,7 @@ class Player:
         if not self.active_skill:
             return None
 
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         remaining_time = self.active_skill["duration"] - (
             current_time - self.active_skill["start_time"]
         )
@@ -793,28 +810,32 @@ class Player:
             "max_health": self.max_health,
         }
 
-    def update(self, screen_width, screen_height):
+    def update(self, screen_width, screen_height, flow_field=None):
         """
         更新玩家狀態（每幀呼叫）\n
         \n
         處理：\n
         1. 位置更新和邊界檢查\n
         2. 填裝狀態更新\n
-        3. 強化效果時間管理\n
-        4. 技能效果套用\n
+        3. 技能效果套用\n
         \n
         參數:\n
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
+        flow_field (FlowField): 場景流場，用來阻擋玩家走進障礙物\n
         """
         # 套用技能速度加成
         current_speed = self.speed
         if "skill_boost" in self.powerups:
             current_speed *= self.powerups["skill_boost"]["speed_boost"]
 
-        # 更新位置
-        self.x += self.velocity_x
-        self.y += self.velocity_y
+        # 更新位置（不能走進障礙物）
+        new_x = self.x + self.velocity_x
+        new_y = self.y + self.velocity_y
+        if flow_field is not None:
+            new_x, new_y = flow_field.resolve_movement(self, new_x, new_y)
+        self.x = new_x
+        self.y = new_y
 
         # 邊界檢查 - 不讓玩家跑出螢幕
         if self.x < 0:
@@ -827,10 +848,8 @@ class Player:
         elif self.y + self.height > screen_height:
             self.y = screen_height - self.height
 
-        # 更新各種系統狀態
+        # 更新各種系統狀態（強化效果和技能結束由計時排程系統處理）
         self.update_reload()
-        self.update_powerups()
-        self.update_skill_effects()
 
     def draw(self, screen):
         """
@@ -864,7 +883,7 @@ class Player:
             border_width = 4  # 技能時邊框更粗
 
             # 技能啟用時添加閃爍效果
-            current_time = pygame.time.get_ticks()
+            current_time = game_clock.get_ticks()
             pulse_cycle = 300  # 300ms一個週期
             if (current_time // pulse_cycle) % 2 == 0:
                 border_width = 6  # 閃爍時更粗
@@ -919,7 +938,7 @@ class Player:
         if not enemies:
             return
 
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         skill_elapsed_time = current_time - self.active_skill["start_time"]
 
         # 計算玩家中心點
@@ -1002,7 +1021,7 @@ class Player:
         if not self.active_skill:
             return
 
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         skill_elapsed_time = current_time - self.active_skill["start_time"]
 
         # 計算光環半徑（隨時間脈動）
@@ -1123,7 +1142,7 @@ class Player:
         回傳:\n
         list: 生效中的強化效果列表\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         active_powerups = []
 
         for powerup_type, powerup_data in self.powerups.items():
@@ -1151,7 +1170,7 @@ class Player:
         回傳:\n
         dict: 技能冷卻狀態資訊\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         skill_cooldown_duration = self.character_config["skill"]["cooldown"]
         time_since_last_skill = current_time - self.last_skill_time
 
@@ -4,6 +4,13 @@ import random
 import math
 from src.config import *
 from src.utils.sound_manager import get_sound_manager
+from src.utils.image_manager import image_manager
+from src.systems.timer_scheduler import timer_scheduler
+from src.core.game_clock import game_clock
+
+# 畫面特效使用獨立的亂數產生器，繪製次數不會影響遊戲邏輯的亂數序列（重播需要）；
+# 每次繪製依遊戲時間重新設定種子，重播輸出的畫面也會和錄製時一樣
+effect_random = random.Random()
 
 ######################物件類別######################
 
@@ -55,12 +62,13 @@ class PowerUp:
 
         # 狀態管理
         self.is_active = True
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = game_clock.get_ticks()
         # 勝利星星永不消失，其他道具15秒後消失
         if powerup_type == "victory_star":
             self.lifetime = float("inf")  # 勝利星星永不消失
         else:
             self.lifetime = 15000  # 15秒後消失
+            timer_scheduler.schedule(self.lifetime, self._expire)
 
         # 視覺效果
         self.pulse_timer = 0
@@ -72,9 +80,10 @@ class PowerUp:
         更新道具狀態（每幀呼叫）\n
         \n
         處理：\n
-        1. 生命週期檢查\n
-        2. 視覺動畫更新\n
-        3. 閃爍效果（即將消失時）\n
+        1. 視覺動畫更新\n
+        2. 閃爍效果（即將消失時）\n
+        \n
+        生命週期到期由計時排程系統呼叫 _expire() 處理\n
         \n
         回傳:\n
         bool: 道具是否仍然有效\n
@@ -82,13 +91,6 @@ class PowerUp:
         if not self.is_active:
             return False
 
-        current_time = pygame.time.get_ticks()
-
-        # 檢查是否超過生命週期
-        if current_time - self.spawn_time > self.lifetime:
-            self.is_active = False
-            return False
-
         # 更新視覺動畫
         self.pulse_timer += 1
         self.float_offset = math.sin(self.pulse_timer * 0.1) * 2  # 上下浮動效果
@@ -96,6 +98,12 @@ class PowerUp:
 
         return True
 
+    def _expire(self):
+        """
+        道具存在時間結束（由計時器呼叫）\n
+        """
+        self.is_active = False
+
     def check_pickup(self, player):
         """
         檢查玩家是否拾取道具\n
@@ -159,7 +167,7 @@ class PowerUp:
             return
 
         # 檢查是否即將消失（閃爍效果）
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         time_left = self.lifetime - (current_time - self.spawn_time)
 
         # 最後3秒開始閃爍
@@ -227,10 +235,11 @@ class PowerUp:
     def _draw_fire_effect(self, screen, x, y, main_color, effect_color):
         """繪製火力增強的火焰效果"""
         # 繪製火焰粒子效果
+        effect_random.seed(game_clock.get_ticks() * 31 + int(x) * 7 + int(y))
         for i in range(3):
-            particle_x = x + random.randint(-3, self.size + 3)
-            particle_y = y + random.randint(-3, 5)
-            particle_size = random.randint(2, 4)
+            particle_x = x + effect_random.randint(-3, self.size + 3)
+            particle_y = y + effect_random.randint(-3, 5)
+            particle_size = effect_random.randint(2, 4)
 
             pygame.draw.circle(
                 screen, effect_color, (int(particle_x), int(particle_y)), particle_size
@@ -322,22 +331,22 @@ class PowerUp:
         center_x = int(x + self.size // 2)
         center_y = int(y + self.size // 2)
 
-        # 載入星星圖片，如果失敗則畫一個星形
-        try:
-            # 嘗試載入外部星星圖片
-            star_image_path = "assets/weapons/powerup_victory_star.png"
-            star_image = pygame.image.load(star_image_path).convert_alpha()
-            # 調整圖片大小
-            star_image = pygame.transform.scale(star_image, (self.size, self.size))
+        # 載入星星圖片（透過圖片管理器快取，不會每幀重新解碼），如果失敗則畫一個星形
+        star_image_path = POWERUP_EFFECTS["victory_star"].get("image_path")
+        star_image = None
+        if star_image_path:
+            star_image = image_manager.load_image(
+                star_image_path, (self.size, self.size)
+            )
 
+        if star_image:
             # 根據時間旋轉星星
             rotated_star = pygame.transform.rotate(star_image, self.rotation_angle)
 
             # 計算旋轉後的位置（保持中心點不變）
             rotated_rect = rotated_star.get_rect(center=(center_x, center_y))
             screen.blit(rotated_star, rotated_rect)
-
-        except pygame.error:
+        else:
             # 如果圖片載入失敗，畫一個簡單的星形
             self._draw_simple_star(screen, center_x, center_y, main_color)
 
@@ -405,7 +414,7 @@ class PowerUp:
         回傳:\n
         dict: 道具狀態資訊\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         time_left = self.lifetime - (current_time - self.spawn_time)
 
         return {
@@ -441,13 +450,14 @@ class PowerUpManager:
         self.spawn_cooldown = 5000  # 5秒最少間隔
         self.max_powerups = 3  # 場上最多3個道具
 
-    def update(self, screen_width, screen_height):
+    def update(self, screen_width, screen_height, flow_field=None):
         """
         更新所有道具狀態並隨機生成新道具\n
         \n
         參數:\n
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
+        flow_field (FlowField): 場景流場，用來避開障礙物（場景沒有障礙物時為 None）\n
         """
         # 更新現有道具
         active_powerups = []
@@ -458,9 +468,9 @@ class PowerUpManager:
         self.powerups = active_powerups
 
         # 嘗試生成新道具
-        self._try_spawn_powerup(screen_width, screen_height)
+        self._try_spawn_powerup(screen_width, screen_height, flow_field)
 
-    def _try_spawn_powerup(self, screen_width, screen_height):
+    def _try_spawn_powerup(self, screen_width, screen_height, flow_field=None):
         """
         嘗試生成新的驚喜包\n
         \n
@@ -472,8 +482,9 @@ class PowerUpManager:
         參數:\n
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
+        flow_field (FlowField): 場景流場，用來避開障礙物\n
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
 
         # 檢查冷卻時間
         if current_time - self.last_spawn_time < self.spawn_cooldown:
@@ -485,23 +496,32 @@ class PowerUpManager:
 
         # 隨機生成檢查
         if random.random() < POWERUP_SPAWN_CHANCE:
-            self._spawn_random_powerup(screen_width, screen_height)
+            self._spawn_random_powerup(screen_width, screen_height, flow_field)
             self.last_spawn_time = current_time
 
-    def _spawn_random_powerup(self, screen_width, screen_height):
+    def _spawn_random_powerup(self, screen_width, screen_height, flow_field=None):
         """
         在隨機位置生成隨機道具\n
         \n
-        確保生成位置不會太靠近邊界\n
+        確保生成位置不會太靠近邊界，也不會在障礙物裡（玩家走不進障礙物，\n
+        生成在裡面的道具撿不到）；重新抽幾次都落在障礙物裡時這次不生成\n
         \n
         參數:\n
         screen_width (int): 螢幕寬度\n
         screen_height (int): 螢幕高度\n
+        flow_field (FlowField): 場景流場，用來避開障礙物\n
         """
         # 計算安全生成區域
         margin = 50
-        safe_x = random.randint(margin, screen_width - margin - POWERUP_SIZE)
-        safe_y = random.randint(margin, screen_height - margin - POWERUP_SIZE)
+        for _ in range(POWERUP_SPAWN_ATTEMPTS):
+            safe_x = random.randint(margin, screen_width - margin - POWERUP_SIZE)
+            safe_y = random.randint(margin, screen_height - margin - POWERUP_SIZE)
+            if flow_field is None or not flow_field.is_rect_blocked(
+                safe_x, safe_y, POWERUP_SIZE, POWERUP_SIZE
+            ):
+                break
+        else:
+            return
 
         # 創建新道具
         powerup = PowerUp(safe_x, safe_y)
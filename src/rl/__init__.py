@@ -0,0 +1,2 @@
+# RL Package
+# 強化學習環境套件（無視窗模擬，訓練 AI 對手用）
@@ -0,0 +1,488 @@
+######################載入套件######################
+import math
+import os
+import random
+from src.config import *
+
+# NumPy 是觀察值的格式（沒有安裝時建立環境會丟出例外）
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# gymnasium 為選用套件：安裝時提供 observation_space / action_space
+try:
+    from gymnasium import spaces
+except ImportError:
+    spaces = None
+
+######################觀察值格式######################
+
+# 玩家狀態：位置、生命、速度、武器、填裝、射擊冷卻、技能冷卻、技能就緒、技能作用中、關卡
+PLAYER_FEATURES = 12
+# 每個敵人：相對位置、生命比例、類型、是否為 BOSS、是否存在
+ENEMY_FEATURES = 6
+# 每顆敵人子彈：相對位置、速度、是否存在
+BULLET_FEATURES = 5
+
+ENEMY_TYPE_INDEXES = {
+    enemy_type: index for index, enemy_type in enumerate(AI_ENEMY_TYPES)
+}
+WEAPON_INDEXES = {weapon: index for index, weapon in enumerate(WEAPON_CONFIGS)}
+
+# 移動動作：0 不動，1-8 從上方開始順時針的八個方向
+MOVE_ACTION_KEYS = (
+    (),
+    ("move_up",),
+    ("move_up", "move_right"),
+    ("move_right",),
+    ("move_down", "move_right"),
+    ("move_down",),
+    ("move_down", "move_left"),
+    ("move_left",),
+    ("move_up", "move_left"),
+)
+
+
+def get_observation_size(nearest_enemies=None, nearest_bullets=None):
+    """
+    計算觀察值的長度\n
+    \n
+    參數:\n
+    nearest_enemies (int): 包含的敵人數量，None 時使用 RL_CONFIGS 的設定\n
+    nearest_bullets (int): 包含的子彈數量，None 時使用 RL_CONFIGS 的設定\n
+    \n
+    回傳:\n
+    int: float32 觀察值的長度\n
+    """
+    if nearest_enemies is None:
+        nearest_enemies = RL_CONFIGS["nearest_enemies"]
+    if nearest_bullets is None:
+        nearest_bullets = RL_CONFIGS["nearest_bullets"]
+    return (
+        PLAYER_FEATURES
+        + nearest_enemies * ENEMY_FEATURES
+        + nearest_bullets * BULLET_FEATURES
+    )
+
+
+def get_action_dims():
+    """
+    取得動作各欄位的選項數量（MultiDiscrete 格式）\n
+    \n
+    回傳:\n
+    tuple: (移動 9 方向, 瞄準方向數, 射擊 0/1, 技能 0/1)\n
+    """
+    return (len(MOVE_ACTION_KEYS), RL_CONFIGS["aim_directions"], 2, 2)
+
+
+######################強化學習環境######################
+
+# 遊戲時鐘、計時器和亂數是全域的：同一個行程有多個環境時，
+# 記錄目前是哪個環境的狀態，輪到別的環境模擬時再交換
+_active_env = None
+
+# 這個行程中還沒關閉的環境數量（最後一個環境關閉時才結束 pygame）
+_live_env_count = 0
+
+
+class BattleArenaEnv:
+    """
+    強化學習環境 - 以 reset/step 介面驅動無視窗的遊戲引擎\n
+    \n
+    此環境負責：\n
+    1. 建立不開視窗、不播放音效、不錄重播的遊戲引擎\n
+    2. 把動作轉成輸入快照，和玩家按鍵一樣經過 PlayingState 模擬（不繪製畫面）\n
+    3. 產生固定長度的 float32 觀察值：玩家狀態、冷卻、最近的敵人和敵人子彈\n
+    4. 依 RL_CONFIGS 的權重計算獎勵（得分、受傷、過關、死亡、勝利）\n
+    \n
+    介面和 gym 相同（不依賴 gym），同樣的種子和動作一定得到同樣的回合\n
+    \n
+    使用方式:\n
+    env = BattleArenaEnv()\n
+    observation = env.reset(seed=0)\n
+    observation, reward, done, info = env.step([move, aim, fire, skill])\n
+    """
+
+    def __init__(
+        self,
+        character=None,
+        difficulty=None,
+        scene=None,
+        frame_skip=None,
+        max_episode_steps=None,
+        headless=True,
+    ):
+        """
+        初始化強化學習環境\n
+        \n
+        參數:\n
+        character (str): 玩家角色，None 時使用 RL_CONFIGS 的設定\n
+        difficulty (str): 關卡難度，None 時使用 RL_CONFIGS 的設定\n
+        scene (str): 場景，None 時使用 RL_CONFIGS 的設定\n
+        frame_skip (int): 每個動作模擬的幀數，None 時使用 RL_CONFIGS 的設定\n
+        max_episode_steps (int): 每回合最多的動作數，None 時使用 RL_CONFIGS 的設定\n
+        headless (bool): 是否使用 SDL 的 dummy 驅動（不開視窗、不輸出聲音）\n
+        """
+        if np is None:
+            raise ImportError("強化學習環境需要 NumPy（pip install numpy）")
+
+        # 沒有螢幕的機器也可以執行（初始化 pygame 之前設定）
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+        # 建立引擎時才載入，讓工作行程在設定好驅動之後才初始化 pygame
+        from src.core.game_engine import GameEngine
+        from src.core.game_clock import game_clock, GAME_CLOCK_START_MS
+        from src.core.input_manager import InputSnapshot
+        from src.systems.timer_scheduler import timer_scheduler
+        from src.utils.sound_manager import get_sound_manager
+
+        self.game_clock = game_clock
+        self.clock_start_ms = GAME_CLOCK_START_MS
+        self.timer_scheduler = timer_scheduler
+        self.input_snapshot_class = InputSnapshot
+
+        global _live_env_count
+        self.engine = GameEngine()
+        self.engine.replay_recorder.enabled = False
+        self.closed = False
+        _live_env_count += 1
+        get_sound_manager().muted = True
+
+        self.engine.selected_character = character or RL_CONFIGS["character"]
+        self.engine.selected_difficulty = difficulty or RL_CONFIGS["difficulty"]
+        self.engine.selected_scene = scene or RL_CONFIGS["scene"]
+        self.frame_skip = frame_skip or RL_CONFIGS["frame_skip"]
+        self.max_episode_steps = max_episode_steps or RL_CONFIGS["max_episode_steps"]
+
+        self.nearest_enemies = RL_CONFIGS["nearest_enemies"]
+        self.nearest_bullets = RL_CONFIGS["nearest_bullets"]
+        self.observation_size = get_observation_size()
+        self.action_dims = get_action_dims()
+        self.reward_weights = RL_CONFIGS["reward_weights"]
+
+        # 瞄準方向的單位向量（0 度為正上方，順時針）
+        aim_directions = RL_CONFIGS["aim_directions"]
+        self.aim_vectors = [
+            (
+                math.sin(2 * math.pi * index / aim_directions),
+                -math.cos(2 * math.pi * index / aim_directions),
+            )
+            for index in range(aim_directions)
+        ]
+
+        if spaces is not None:
+            self.observation_space = spaces.Box(
+                -np.inf, np.inf, (self.observation_size,), np.float32
+            )
+            self.action_space = spaces.MultiDiscrete(self.action_dims)
+
+        # 沒有在模擬時保存的全域狀態（遊戲時間、計時器、亂數）
+        self.saved_globals = None
+
+        # 回合狀態
+        self.episode_steps = 0
+        self.last_score = 0
+        self.last_health = 0
+        self.last_level = 1
+
+    def reset(self, seed=None, out=None):
+        """
+        開始新的回合\n
+        \n
+        參數:\n
+        seed (int): 亂數種子（同樣的種子和動作得到同樣的回合），None 時不重設\n
+        out (numpy.ndarray): 寫入觀察值的陣列（向量化環境的共享記憶體），None 時建立新陣列\n
+        \n
+        回傳:\n
+        numpy.ndarray: 第一個觀察值\n
+        """
+        self._activate()
+        if seed is not None:
+            random.seed(seed)
+
+        # 時鐘、AI 排程和道具生成時間回到起點，每個回合都從同樣的狀態開始
+        # （上一回合的計時器由 start_new_game() 清除）
+        engine = self.engine
+        self.game_clock.set_state(self.clock_start_ms)
+        engine.ai_scheduler.frame_index = 0
+        engine.ai_scheduler.next_phase = 0
+        engine.powerup_manager.last_spawn_time = 0
+        engine.start_new_game()
+
+        self.episode_steps = 0
+        self.last_score = engine.score
+        self.last_health = engine.player.health
+        self.last_level = engine.current_level
+        return self.observe(out)
+
+    def step(self, action, out=None):
+        """
+        執行一個動作（模擬 frame_skip 幀）\n
+        \n
+        參數:\n
+        action: [移動 0-8, 瞄準方向, 射擊 0/1, 技能 0/1]\n
+        out (numpy.ndarray): 寫入觀察值的陣列，None 時建立新陣列\n
+        \n
+        回傳:\n
+        tuple: (觀察值, 獎勵, 是否結束, 資訊)，資訊的 "truncated" 表示超過回合長度\n
+        """
+        engine = self.engine
+        state_manager = engine.state_manager
+        playing_state = state_manager.states[GAME_STATES["playing"]]
+        move, aim, fire, skill = (int(value) for value in action)
+
+        self._activate()
+        snapshot = self._build_snapshot(move, aim, fire)
+        if skill and state_manager.active_state is playing_state:
+            engine.event_handler._handle_skill_activation()
+
+        # 和遊戲中相同的更新流程（連續輸入、模擬一幀），狀態改變時停止
+        for _ in range(self.frame_skip):
+            if state_manager.active_state is not playing_state:
+                break
+            engine.input_manager.apply_snapshot(snapshot)
+            playing_state.update()
+
+        self.episode_steps += 1
+        done = state_manager.current_state != GAME_STATES["playing"]
+        truncated = not done and self.episode_steps >= self.max_episode_steps
+        reward = self._compute_reward(done)
+
+        info = {
+            "score": engine.score,
+            "level": engine.current_level,
+            "enemies_killed": engine.game_stats["enemies_killed"],
+            "victory": engine.game_completed,
+            "truncated": truncated,
+        }
+        return self.observe(out), reward, done or truncated, info
+
+    def _activate(self):
+        """
+        換成這個環境的全域狀態（上一個模擬的環境先保存自己的狀態）\n
+        """
+        global _active_env
+        if _active_env is self:
+            return
+        if _active_env is not None:
+            _active_env.saved_globals = (
+                self.game_clock.get_state(),
+                self.timer_scheduler.get_state(),
+                random.getstate(),
+            )
+        if self.saved_globals is not None:
+            game_time, timers, rng_state = self.saved_globals
+            self.game_clock.set_state(game_time)
+            self.timer_scheduler.set_state(timers)
+            random.setstate(rng_state)
+            self.saved_globals = None
+        _active_env = self
+
+    def _build_snapshot(self, move, aim, fire):
+        """
+        把動作轉成輸入快照\n
+        \n
+        參數:\n
+        move (int): 移動方向\n
+        aim (int): 瞄準方向\n
+        fire (int): 是否按住射擊\n
+        \n
+        回傳:\n
+        InputSnapshot: 這個動作的輸入快照\n
+        """
+        player = self.engine.player
+        keys_pressed = [KEYS[key_name] for key_name in MOVE_ACTION_KEYS[move]]
+
+        # 準心放在玩家中心朝瞄準方向固定距離的位置（限制在畫面內，和滑鼠相同）
+        aim_x, aim_y = self.aim_vectors[aim]
+        aim_distance = RL_CONFIGS["aim_distance"]
+        mouse_x = player.x + player.width / 2 + aim_x * aim_distance
+        mouse_y = player.y + player.height / 2 + aim_y * aim_distance
+        mouse_pos = (
+            int(max(0, min(mouse_x, SCREEN_WIDTH - 1))),
+            int(max(0, min(mouse_y, SCREEN_HEIGHT - 1))),
+        )
+        return self.input_snapshot_class(
+            keys_pressed, mouse_pos=mouse_pos, mouse_buttons=(bool(fire), False, False)
+        )
+
+    def _compute_reward(self, done):
+        """
+        計算上一個動作的獎勵\n
+        \n
+        參數:\n
+        done (bool): 回合是否結束\n
+        \n
+        回傳:\n
+        float: 獎勵\n
+        """
+        engine = self.engine
+        player = engine.player
+        weights = self.reward_weights
+
+        reward = (engine.score - self.last_score) * weights["score"]
+        damage_taken = max(0, self.last_health - player.health)
+        reward += damage_taken * weights["damage_taken"]
+        reward += (engine.current_level - self.last_level) * weights["level_complete"]
+        if done:
+            if engine.game_completed:
+                reward += weights["victory"]
+            elif not player.is_alive:
+                reward += weights["death"]
+
+        self.last_score = engine.score
+        self.last_health = player.health
+        self.last_level = engine.current_level
+        return float(reward)
+
+    def observe(self, out=None):
+        """
+        產生目前的觀察值\n
+        \n
+        座標以畫面大小正規化，敵人和子彈為相對玩家中心的位置，依距離由近到遠排列，\n
+        不足的欄位填 0（「是否存在」欄位為 0）\n
+        \n
+        參數:\n
+        out (numpy.ndarray): 寫入觀察值的陣列，None 時建立新陣列\n
+        \n
+        回傳:\n
+        numpy.ndarray: float32 觀察值\n
+        """
+        if out is None:
+            out = np.zeros(self.observation_size, np.float32)
+        else:
+            out.fill(0)
+
+        engine = self.engine
+        player = engine.player
+        center_x = player.x + player.width / 2
+        center_y = player.y + player.height / 2
+        current_time = self.game_clock.get_ticks()
+
+        # 射擊冷卻（套用角色射速倍率，和 Player.can_shoot() 相同）
+        fire_rate = (
+            WEAPON_CONFIGS[player.current_weapon]["fire_rate"]
+            / player.character_config["attributes"]["fire_rate"]
+        )
+        shot_cooldown = max(0, fire_rate - (current_time - player.last_shot_time))
+        skill_info = player.get_skill_cooldown_info()
+
+        out[0:PLAYER_FEATURES] = (
+            center_x / SCREEN_WIDTH,
+            center_y / SCREEN_HEIGHT,
+            player.health / player.max_health,
+            player.velocity_x / player.speed,
+            player.velocity_y / player.speed,
+            WEAPON_INDEXES[player.current_weapon] / (len(WEAPON_INDEXES) - 1),
+            float(player.is_reloading),
+            shot_cooldown / fire_rate,
+            skill_info["cooldown_remaining"] / skill_info["total_cooldown"],
+            float(skill_info["ready"]),
+            float(bool(player.active_skill)),
+            engine.current_level / len(LEVEL_CONFIGS[engine.selected_difficulty]),
+        )
+
+        offset = PLAYER_FEATURES
+        enemies = [enemy for enemy in engine.enemies if enemy.is_alive]
+        if enemies:
+            features = np.array(
+                [
+                    (
+                        enemy.x + enemy.width / 2,
+                        enemy.y + enemy.height / 2,
+                        enemy.health / enemy.max_health,
+                        ENEMY_TYPE_INDEXES.get(enemy.enemy_type, 0),
+                        enemy.enemy_type == "boss",
+                    )
+                    for enemy in enemies
+                ],
+                np.float32,
+            )
+            nearest = self._select_nearest(
+                features, center_x, center_y, self.nearest_enemies
+            )
+            count = len(nearest)
+            rows = out[offset : offset + count * ENEMY_FEATURES].reshape(
+                count, ENEMY_FEATURES
+            )
+            rows[:, 0] = nearest[:, 0] / SCREEN_WIDTH
+            rows[:, 1] = nearest[:, 1] / SCREEN_HEIGHT
+            rows[:, 2] = nearest[:, 2]
+            rows[:, 3] = nearest[:, 3] / (len(ENEMY_TYPE_INDEXES) - 1)
+            rows[:, 4] = nearest[:, 4]
+            rows[:, 5] = 1
+        offset += self.nearest_enemies * ENEMY_FEATURES
+
+        bullets = [
+            bullet
+            for bullet in engine.bullet_manager.bullets
+            if bullet.is_active and bullet.owner == "enemy"
+        ]
+        if bullets:
+            features = np.array(
+                [
+                    (bullet.x, bullet.y, bullet.velocity_x, bullet.velocity_y)
+                    for bullet in bullets
+                ],
+                np.float32,
+            )
+            nearest = self._select_nearest(
+                features, center_x, center_y, self.nearest_bullets
+            )
+            count = len(nearest)
+            velocity_scale = RL_CONFIGS["velocity_scale"]
+            rows = out[offset : offset + count * BULLET_FEATURES].reshape(
+                count, BULLET_FEATURES
+            )
+            rows[:, 0] = nearest[:, 0] / SCREEN_WIDTH
+            rows[:, 1] = nearest[:, 1] / SCREEN_HEIGHT
+            rows[:, 2] = nearest[:, 2] / velocity_scale
+            rows[:, 3] = nearest[:, 3] / velocity_scale
+            rows[:, 4] = 1
+
+        return out
+
+    def _select_nearest(self, features, center_x, center_y, limit):
+        """
+        找出離玩家最近的物件，並把座標改成相對玩家中心的位置\n
+        \n
+        參數:\n
+        features (numpy.ndarray): 每列前兩欄為物件的 x、y 座標\n
+        center_x (float): 玩家中心 X 座標\n
+        center_y (float): 玩家中心 Y 座標\n
+        limit (int): 最多取幾個\n
+        \n
+        回傳:\n
+        numpy.ndarray: 依距離由近到遠排列的物件（最多 limit 列）\n
+        """
+        features[:, 0] -= center_x
+        features[:, 1] -= center_y
+        distances = features[:, 0] ** 2 + features[:, 1] ** 2
+
+        # 物件很多時先用 argpartition 取出最近的 limit 個，再排序
+        if len(features) > limit:
+            candidates = np.argpartition(distances, limit)[:limit]
+            order = candidates[np.argsort(distances[candidates], kind="stable")]
+        else:
+            order = np.argsort(distances, kind="stable")
+        return features[order]
+
+    def close(self):
+        """
+        關閉環境（同一個行程的其他環境還在使用 pygame 時不結束 pygame）\n
+        """
+        global _active_env, _live_env_count
+        if self.closed:
+            return
+        self.closed = True
+        if _active_env is self:
+            _active_env = None
+
+        _live_env_count -= 1
+        if _live_env_count == 0:
+            import pygame
+
+            pygame.quit()
@@ -0,0 +1,341 @@
+######################載入套件######################
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from multiprocessing import shared_memory
+from src.config import *
+from src.rl.env import BattleArenaEnv, get_observation_size, get_action_dims
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+######################共享記憶體緩衝區######################
+
+
+def get_buffer_layout(num_envs):
+    """
+    取得共享記憶體緩衝區的格式（主行程和工作行程用同一份格式建立陣列）\n
+    \n
+    參數:\n
+    num_envs (int): 環境數量\n
+    \n
+    回傳:\n
+    tuple: 觀察值、獎勵、結束旗標、動作四個緩衝區的 (形狀, 資料型態)\n
+    """
+    return (
+        ((num_envs, get_observation_size()), np.float32),
+        ((num_envs,), np.float32),
+        ((num_envs,), np.bool_),
+        ((num_envs, len(get_action_dims())), np.int32),
+    )
+
+
+def create_buffer_views(buffers, num_envs):
+    """
+    在共享記憶體上建立 NumPy 陣列（不複製資料）\n
+    \n
+    參數:\n
+    buffers (list): 四個 SharedMemory\n
+    num_envs (int): 環境數量\n
+    \n
+    回傳:\n
+    list: [觀察值, 獎勵, 結束旗標, 動作] 陣列\n
+    """
+    return [
+        np.ndarray(shape, dtype, buffer.buf)
+        for buffer, (shape, dtype) in zip(buffers, get_buffer_layout(num_envs))
+    ]
+
+
+def _worker(connection, buffer_names, start, end, num_envs, env_kwargs):
+    """
+    工作行程：負責 [start, end) 的環境，依主行程的指令重設或執行一步\n
+    \n
+    觀察值、獎勵、結束旗標直接寫進共享記憶體，管線只傳指令和資訊\n
+    \n
+    參數:\n
+    connection: 和主行程溝通的管線\n
+    buffer_names (list): 四個共享記憶體的名稱\n
+    start (int): 第一個環境的索引\n
+    end (int): 最後一個環境的索引 + 1\n
+    num_envs (int): 所有工作行程的環境總數\n
+    env_kwargs (dict): 建立 BattleArenaEnv 的參數\n
+    """
+    # 遊戲訊息大量輸出會拖慢模擬
+    if RL_CONFIGS["quiet_workers"]:
+        sys.stdout = open(os.devnull, "w")
+
+    buffers = [shared_memory.SharedMemory(name=name) for name in buffer_names]
+    observations, rewards, dones, actions = create_buffer_views(buffers, num_envs)
+    envs = []
+    try:
+        envs = [BattleArenaEnv(**env_kwargs) for _ in range(start, end)]
+        connection.send(("ready", None))
+
+        while True:
+            command, data = connection.recv()
+            if command == "reset":
+                for index, env in enumerate(envs, start):
+                    seed = None if data is None else data + index
+                    env.reset(seed, out=observations[index])
+                    rewards[index] = 0
+                    dones[index] = False
+                connection.send(("ok", None))
+
+            elif command == "step":
+                infos = []
+                for index, env in enumerate(envs, start):
+                    observation, reward, done, info = env.step(
+                        actions[index], out=observations[index]
+                    )
+                    rewards[index] = reward
+                    dones[index] = done
+                    # 回合結束時自動重設，結束那一步的觀察值放在資訊中
+                    if done:
+                        info["final_observation"] = observation.copy()
+                        env.reset(out=observations[index])
+                    infos.append(info)
+                connection.send(("ok", infos))
+
+            elif command == "close":
+                break
+    except Exception:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        for env in envs:
+            env.close()
+        del observations, rewards, dones, actions
+        for buffer in buffers:
+            buffer.close()
+        connection.close()
+
+
+######################向量化環境######################
+
+
+class VectorBattleArenaEnv:
+    """
+    向量化強化學習環境 - 在多個工作行程中同時執行多個遊戲引擎\n
+    \n
+    此系統負責：\n
+    1. 把環境平均分給工作行程（每個行程依序模擬自己負責的環境）\n
+    2. 觀察值、獎勵、結束旗標和動作放在共享記憶體，不經過管線複製\n
+    3. 回合結束的環境自動重設，結束那一步的觀察值放在 info["final_observation"]\n
+    \n
+    使用方式:\n
+    vector_env = VectorBattleArenaEnv(16, num_workers=4)\n
+    observations = vector_env.reset(seed=0)  # (16, 觀察值長度)\n
+    observations, rewards, dones, infos = vector_env.step(actions)  # actions: (16, 4)\n
+    vector_env.close()\n
+    """
+
+    def __init__(self, num_envs, num_workers=None, env_kwargs=None):
+        """
+        初始化向量化環境（建立共享記憶體並啟動工作行程）\n
+        \n
+        參數:\n
+        num_envs (int): 環境數量\n
+        num_workers (int): 工作行程數量，None 時使用 CPU 核心數（不超過環境數量）\n
+        env_kwargs (dict): 建立 BattleArenaEnv 的參數（角色、難度、場景等）\n
+        \n
+        例外:\n
+        RuntimeError: 工作行程無法建立環境\n
+        """
+        if np is None:
+            raise ImportError("強化學習環境需要 NumPy（pip install numpy）")
+
+        self.num_envs = num_envs
+        self.num_workers = max(1, min(num_envs, num_workers or os.cpu_count() or 1))
+        self.observation_size = get_observation_size()
+        self.action_dims = get_action_dims()
+        self.closed = False
+
+        # 共享記憶體緩衝區
+        self.buffers = [
+            shared_memory.SharedMemory(
+                create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            )
+            for shape, dtype in get_buffer_layout(num_envs)
+        ]
+        self.observations, self.rewards, self.dones, self.actions = (
+            create_buffer_views(self.buffers, num_envs)
+        )
+        self.actions.fill(0)
+
+        # 使用 spawn 啟動工作行程，每個行程各自初始化 pygame
+        if RL_CONFIGS["quiet_workers"]:
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        context = multiprocessing.get_context("spawn")
+        buffer_names = [buffer.name for buffer in self.buffers]
+        self.connections = []
+        self.processes = []
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(
+                    child_connection,
+                    buffer_names,
+                    int(start),
+                    int(end),
+                    num_envs,
+                    env_kwargs or {},
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            self.connections.append(parent_connection)
+            self.processes.append(process)
+
+        self._receive_all()
+
+    def _receive_all(self):
+        """
+        等待所有工作行程回應\n
+        \n
+        回傳:\n
+        list: 每個工作行程回傳的資料\n
+        \n
+        例外:\n
+        RuntimeError: 工作行程發生錯誤（所有工作行程結束，環境不能再使用）\n
+        """
+        results = []
+        error = None
+        for connection in self.connections:
+            try:
+                status, data = connection.recv()
+            except EOFError:
+                status, data = "error", "工作行程意外結束"
+            if status == "error":
+                error = error or data
+            results.append(data)
+
+        if error is not None:
+            self.close()
+            raise RuntimeError(f"強化學習工作行程發生錯誤:\n{error}")
+        return results
+
+    def reset(self, seed=None):
+        """
+        重設所有環境\n
+        \n
+        參數:\n
+        seed (int): 亂數種子，第 i 個環境使用 seed + i，None 時不重設\n
+        \n
+        回傳:\n
+        numpy.ndarray: (環境數量, 觀察值長度) 的觀察值\n
+        """
+        for connection in self.connections:
+            connection.send(("reset", seed))
+        self._receive_all()
+        return self.observations.copy()
+
+    def step_async(self, actions):
+        """
+        送出所有環境的動作（不等待結果，可以同時在主行程計算其他東西）\n
+        \n
+        參數:\n
+        actions: (環境數量, 4) 的動作陣列\n
+        """
+        self.actions[:] = actions
+        for connection in self.connections:
+            connection.send(("step", None))
+
+    def step_wait(self):
+        """
+        等待 step_async() 的結果\n
+        \n
+        回傳:\n
+        tuple: (觀察值, 獎勵, 結束旗標, 資訊列表)\n
+        """
+        infos = []
+        for worker_infos in self._receive_all():
+            infos.extend(worker_infos)
+        return (
+            self.observations.copy(),
+            self.rewards.copy(),
+            self.dones.copy(),
+            infos,
+        )
+
+    def step(self, actions):
+        """
+        所有環境執行一步\n
+        \n
+        參數:\n
+        actions: (環境數量, 4) 的動作陣列\n
+        \n
+        回傳:\n
+        tuple: (觀察值, 獎勵, 結束旗標, 資訊列表)\n
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        """
+        結束工作行程並釋放共享記憶體\n
+        """
+        if self.closed:
+            return
+        self.closed = True
+
+        for connection in self.connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+
+        # 先釋放陣列，共享記憶體才能關閉
+        self.observations = self.rewards = self.dones = self.actions = None
+        for buffer in self.buffers:
+            buffer.close()
+            buffer.unlink()
+
+
+def main():
+    """
+    吞吐量測試進入點：python -m src.rl.vector_env [環境數量] [工作行程數量] [步數]\n
+    """
+    arguments = sys.argv[1:]
+    num_envs = int(arguments[0]) if len(arguments) > 0 else 8
+    num_workers = int(arguments[1]) if len(arguments) > 1 else None
+    steps = int(arguments[2]) if len(arguments) > 2 else 1000
+
+    vector_env = VectorBattleArenaEnv(num_envs, num_workers)
+    print(f"🤖 {num_envs} 個環境、{vector_env.num_workers} 個工作行程")
+    rng = np.random.default_rng(0)
+    try:
+        vector_env.reset(seed=0)
+        episodes = 0
+        start_time = time.perf_counter()
+        for _ in range(steps):
+            actions = rng.integers(
+                0, vector_env.action_dims, (num_envs, len(vector_env.action_dims))
+            )
+            _, _, dones, _ = vector_env.step(actions)
+            episodes += int(dones.sum())
+        elapsed = time.perf_counter() - start_time
+    finally:
+        vector_env.close()
+
+    steps_per_second = steps * num_envs / elapsed
+    print(
+        f"✅ {steps * num_envs} 步（{episodes} 個回合）{elapsed:.1f} 秒："
+        f"{steps_per_second:.0f} 步/秒，約 {steps_per_second * 3600 / 1e6:.1f} 百萬步/小時"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+######################載入套件######################
+from src.config import *
+
+######################AI 排程系統######################
+
+
+class AIScheduler:
+    """
+    AI 排程系統 - 控制每個敵人重新規劃行為的頻率\n
+    \n
+    此系統負責：\n
+    1. 依難度和與玩家的距離決定每個敵人的思考間隔（幀數）\n
+    2. 把敵人的思考時間錯開，每幀只有一部分敵人重新規劃\n
+    3. 沒有輪到思考的敵人繼續執行上一次規劃的移動方向\n
+    4. 統計每幀實際思考的敵人數量\n
+    \n
+    使用方式:\n
+    ai_scheduler.begin_frame()\n
+    for enemy in enemies:\n
+        enemy.update(player, w, h, think=ai_scheduler.should_think(enemy, player))\n
+    """
+
+    def __init__(self):
+        """
+        初始化 AI 排程系統\n
+        """
+        self.frame_index = 0
+        self.next_phase = 0  # 新敵人的錯開位移（輪流分配）
+
+        # 統計資料
+        self.thinks_this_frame = 0
+        self.enemies_this_frame = 0
+        self.total_thinks = 0
+        self.total_enemy_updates = 0
+
+    def begin_frame(self):
+        """
+        開始新的一幀（每幀呼叫一次，在更新敵人之前）\n
+        """
+        self.frame_index += 1
+        self.thinks_this_frame = 0
+        self.enemies_this_frame = 0
+
+    def get_think_interval(self, enemy, distance_squared):
+        """
+        計算敵人的思考間隔\n
+        \n
+        參數:\n
+        enemy: 敵人物件\n
+        distance_squared (float): 與玩家距離的平方\n
+        \n
+        回傳:\n
+        int: 思考間隔（幀數），1 表示每幀思考\n
+        """
+        if enemy.enemy_type == "boss":
+            return AI_SCHEDULER_CONFIGS["boss_think_interval"]
+
+        think_intervals = AI_SCHEDULER_CONFIGS["think_intervals"]
+        base_interval = think_intervals.get(enemy.difficulty, 1)
+
+        # 距離越遠，思考頻率越低
+        multiplier = AI_SCHEDULER_CONFIGS["far_multiplier"]
+        for max_distance, band_multiplier in AI_SCHEDULER_CONFIGS["distance_bands"]:
+            if distance_squared <= max_distance * max_distance:
+                multiplier = band_multiplier
+                break
+
+        return max(1, int(base_interval * multiplier))
+
+    def should_think(self, enemy, player):
+        """
+        檢查敵人這一幀是否要重新規劃行為\n
+        \n
+        參數:\n
+        enemy: 敵人物件\n
+        player: 玩家物件\n
+        \n
+        回傳:\n
+        bool: 是否要重新規劃\n
+        """
+        self.enemies_this_frame += 1
+        self.total_enemy_updates += 1
+
+        if not AI_SCHEDULER_CONFIGS["enabled"]:
+            self.thinks_this_frame += 1
+            self.total_thinks += 1
+            return True
+
+        dx = player.x - enemy.x
+        dy = player.y - enemy.y
+        interval = self.get_think_interval(enemy, dx * dx + dy * dy)
+
+        # 第一次看到的敵人：立刻思考一次，之後依錯開位移排程
+        if enemy.next_think_frame is None:
+            enemy.next_think_frame = self.frame_index
+            self.next_phase += 1
+            phase = self.next_phase % interval
+        else:
+            phase = 0
+
+        if self.frame_index < enemy.next_think_frame:
+            return False
+
+        enemy.next_think_frame = self.frame_index + interval + phase
+        self.thinks_this_frame += 1
+        self.total_thinks += 1
+        return True
+
+    def get_stats(self):
+        """
+        取得排程統計資料\n
+        \n
+        回傳:\n
+        dict: 這一幀的思考數量和平均思考比例\n
+        """
+        think_ratio = 0.0
+        if self.total_enemy_updates:
+            think_ratio = self.total_thinks / self.total_enemy_updates
+        return {
+            "thinks_this_frame": self.thinks_this_frame,
+            "enemies_this_frame": self.enemies_this_frame,
+            "think_ratio": think_ratio,
+        }
@@ -0,0 +1,459 @@
+######################載入套件######################
+import random
+from src.config import *
+from src.core.game_clock import game_clock
+
+try:
+    import numpy as np
+except ImportError:
+    # 沒有 numpy 時停用批次 AI，所有敵人使用原本的逐一更新
+    np = None
+
+######################批次 AI 常數######################
+
+# 移動模式代碼（對應 Enemy.move_pattern）
+PATTERN_CODES = {"simple": 0, "tactical": 1, "advanced": 2}
+
+# 狀態代碼（對應 Enemy.state），-1 表示不改變狀態
+STATE_NAMES = ["patrol", "chase", "attack", "dodge"]
+KEEP_STATE = -1
+
+# 戰術撤退的 8 個方向（與 Enemy._tactical_retreat 相同順序）
+RETREAT_DIRECTIONS = [
+    (-1, -1),
+    (0, -1),
+    (1, -1),
+    (-1, 0),
+    (1, 0),
+    (-1, 1),
+    (0, 1),
+    (1, 1),
+]
+
+######################批次 AI 系統######################
+
+
+class BatchAI:
+    """
+    批次 AI 系統 - 以 NumPy 陣列一次計算所有敵人的移動\n
+    \n
+    此系統負責：\n
+    1. 每幀把敵人的位置、速度、移動模式收集成陣列\n
+    2. 向量化計算與玩家的距離、角度和三種移動模式的行為\n
+    3. 向量化移動和邊界限制\n
+    4. 把結果寫回每個敵人物件\n
+    \n
+    行為和 Enemy 的逐一更新相同，只在敵人數量超過門檻時使用，\n
+    讓數百個敵人的大型波次不會被 AI 計算拖慢\n
+    """
+
+    def __init__(self):
+        """
+        初始化批次 AI 系統\n
+        """
+        self.batched_frames = 0
+        self.last_batch_size = 0
+
+    def is_active(self, enemy_count):
+        """
+        檢查這一幀是否使用批次 AI\n
+        \n
+        參數:\n
+        enemy_count (int): 敵人數量\n
+        \n
+        回傳:\n
+        bool: 是否使用批次計算\n
+        """
+        return (
+            np is not None
+            and BATCH_AI_CONFIGS["enabled"]
+            and enemy_count >= BATCH_AI_CONFIGS["min_enemies"]
+        )
+
+    def update(
+        self,
+        enemies,
+        player,
+        ai_scheduler,
+        screen_width,
+        screen_height,
+        flow_field=None,
+    ):
+        """
+        批次更新所有敵人的 AI 行為和位置\n
+        \n
+        取代每個敵人的 Enemy.update()，射擊仍由呼叫端逐一處理\n
+        \n
+        參數:\n
+        enemies (list): 敵人列表\n
+        player: 玩家物件\n
+        ai_scheduler: AI 排程系統（決定哪些敵人這一幀重新規劃）\n
+        screen_width (int): 螢幕寬度\n
+        screen_height (int): 螢幕高度\n
+        flow_field: 場景流場（沒有障礙物時為 None）\n
+        """
+        # 排程仍需逐一處理（狀態效果由計時排程系統處理）
+        batch = []
+        think_flags = []
+        for enemy in enemies:
+            if not enemy.is_alive:
+                continue
+            enemy.state_timer += 1
+            batch.append(enemy)
+            think_flags.append(ai_scheduler.should_think(enemy, player))
+
+        self.last_batch_size = len(batch)
+        if not batch:
+            return
+        self.batched_frames += 1
+
+        # 一次收集所有數值欄位成陣列（每個敵人一個 tuple，比逐欄收集快）
+        values = np.array(
+            [
+                (
+                    e.x,
+                    e.y,
+                    e.width,
+                    e.height,
+                    e.speed,
+                    e.velocity_x,
+                    e.velocity_y,
+                    PATTERN_CODES.get(e.move_pattern, -1),
+                )
+                for e in batch
+            ],
+            dtype=np.float64,
+        )
+        x, y, width, height, speed, vx, vy, pattern = values.T
+        think = np.array(think_flags, dtype=bool)
+
+        if think.any():
+            state = np.full(len(batch), KEEP_STATE, dtype=np.int8)
+            new_vx, new_vy, flip = self._steer(
+                batch,
+                player,
+                (x, y, width, height, speed, vx, vy),
+                pattern,
+                think,
+                state,
+                screen_width,
+                screen_height,
+                flow_field,
+            )
+            vx = np.where(think, new_vx, vx)
+            vy = np.where(think, new_vy, vy)
+            self._write_back_plans(batch, think, state, flip)
+
+        # 向量化移動和邊界限制
+        x = x + vx
+        y = y + vy
+        if flow_field is not None and flow_field.has_obstacles:
+            # 障礙物碰撞需要逐一檢查（和 Enemy.update 相同，先擋障礙物再限制邊界）
+            resolved = [
+                flow_field.resolve_movement(enemy, new_x, new_y)
+                for enemy, new_x, new_y in zip(batch, x.tolist(), y.tolist())
+            ]
+            x, y = np.array(resolved, dtype=np.float64).T
+        x = np.clip(x, 0, np.maximum(screen_width - width, 0))
+        y = np.clip(y, 0, np.maximum(screen_height - height, 0))
+
+        for enemy, new_x, new_y, new_vx, new_vy in zip(
+            batch, x.tolist(), y.tolist(), vx.tolist(), vy.tolist()
+        ):
+            enemy.x = new_x
+            enemy.y = new_y
+            enemy.velocity_x = new_vx
+            enemy.velocity_y = new_vy
+
+    def _steer(
+        self,
+        batch,
+        player,
+        arrays,
+        pattern,
+        think,
+        state,
+        screen_width,
+        screen_height,
+        flow_field=None,
+    ):
+        """
+        向量化計算三種移動模式的速度（對應 Enemy 的各個行為方法）\n
+        \n
+        參數:\n
+        batch (list): 這一幀批次處理的敵人\n
+        player: 玩家物件\n
+        arrays (tuple): (x, y, width, height, speed, vx, vy) 陣列\n
+        pattern (ndarray): 移動模式代碼\n
+        think (ndarray): 這一幀要重新規劃的敵人（其他敵人保持原本速度）\n
+        state (ndarray): 輸出的狀態代碼（KEEP_STATE 表示不改變）\n
+        screen_width, screen_height (int): 螢幕尺寸\n
+        flow_field: 場景流場（沒有障礙物時為 None）\n
+        \n
+        回傳:\n
+        tuple: (新 X 速度, 新 Y 速度, 是否改變繞行方向)\n
+        """
+        x, y, width, height, speed, vx, vy = arrays
+        count = len(batch)
+        new_vx = vx.copy()
+        new_vy = vy.copy()
+
+        # 與玩家的距離和方向（和 Enemy 一樣以左上角計算）
+        dx = player.x - x
+        dy = player.y - y
+        distance = np.hypot(dx, dy)
+        safe_distance = np.where(distance > 0, distance, 1.0)
+        unit_x = dx / safe_distance
+        unit_y = dy / safe_distance
+        has_distance = distance > 0
+
+        # 追擊方向：有流場時沿流場繞過障礙物（對應 Enemy._get_chase_direction）
+        chase_x = unit_x
+        chase_y = unit_y
+        if flow_field is not None:
+            sampled = flow_field.sample_many(x + width / 2, y + height / 2)
+            if sampled is not None:
+                flow_x, flow_y, has_flow = sampled
+                chase_x = np.where(has_flow, flow_x, unit_x)
+                chase_y = np.where(has_flow, flow_y, unit_y)
+
+        state_timer = np.array([e.state_timer for e in batch], dtype=np.int64)
+        last_think = np.array([e.last_think_timer for e in batch], dtype=np.int64)
+        dodge_direction = np.array([e.dodge_direction for e in batch], np.float64)
+        my_health_ratio = np.array(
+            [e.health / e.max_health for e in batch], dtype=np.float64
+        )
+        player_health_ratio = player.health / player.max_health
+
+        def apply(mask, move_x, move_y):
+            np.copyto(new_vx, move_x, where=mask)
+            np.copyto(new_vy, move_y, where=mask)
+
+        def towards(mask, factor):
+            apply(
+                mask & has_distance, chase_x * speed * factor, chase_y * speed * factor
+            )
+
+        def away(mask, factor):
+            apply(
+                mask & has_distance, -unit_x * speed * factor, -unit_y * speed * factor
+            )
+
+        # 繞圈攻擊：垂直於玩家方向，週期性改變繞行方向
+        strafe_mask = np.zeros(count, dtype=bool)
+
+        def circle_strafe(mask):
+            strafe_mask[:] |= mask
+            apply(
+                mask & has_distance,
+                -unit_y * dodge_direction * speed * 0.7,
+                unit_x * dodge_direction * speed * 0.7,
+            )
+
+        simple = (pattern == 0) & think
+        tactical = (pattern == 1) & think
+        advanced = (pattern == 2) & think
+
+        # ---- 簡單AI ----
+        patrol = simple & (distance > 200)
+        state[patrol] = STATE_NAMES.index("patrol")
+        self._random_movement(
+            batch, patrol, x, y, speed, new_vx, new_vy, screen_width, screen_height
+        )
+        simple_attack = simple & ~patrol
+        state[simple_attack] = STATE_NAMES.index("attack")
+        towards(simple_attack & (distance > 150), 0.5)
+        away(simple_attack & (distance < 100), 0.3)
+        hold = simple_attack & (distance <= 150) & (distance >= 100)
+        apply(hold, 0.0, 0.0)
+
+        # ---- 戰術AI（最適攻擊距離 180）----
+        chase = tactical & (distance > 300)
+        state[chase] = STATE_NAMES.index("chase")
+        towards(chase, 0.8)
+
+        dodge = tactical & ~chase & (distance < 150)
+        state[dodge] = STATE_NAMES.index("dodge")
+        self._tactical_retreat(
+            dodge,
+            arrays,
+            distance,
+            player,
+            new_vx,
+            new_vy,
+            screen_width,
+            screen_height,
+        )
+
+        approach = tactical & ~chase & ~dodge & (distance > 210)
+        state[approach] = STATE_NAMES.index("chase")
+        if approach.any():
+            # 曲折路線：朝玩家方向加上 ±45 度隨機偏移
+            offsets = np.zeros(count)
+            for index in np.flatnonzero(approach).tolist():
+                offsets[index] = random.uniform(-45, 45)
+            approach_angle = np.arctan2(chase_y, chase_x) + np.radians(offsets)
+            apply(
+                approach,
+                np.cos(approach_angle) * speed * 0.8,
+                np.sin(approach_angle) * speed * 0.8,
+            )
+
+        tactical_attack = tactical & ~chase & ~dodge & ~approach
+        state[tactical_attack] = STATE_NAMES.index("attack")
+        circle_strafe(tactical_attack)
+
+        # ---- 高級AI（依雙方血量選擇戰術）----
+        defensive = advanced & (my_health_ratio < 0.3)
+        aggressive = advanced & ~defensive & (player_health_ratio < 0.3)
+        adaptive = advanced & ~defensive & ~aggressive
+
+        evasive = defensive & (distance < 250)
+        self._evasive_retreat(
+            evasive, arrays, player, new_vx, new_vy, screen_width, screen_height
+        )
+        hit_and_run = defensive & ~evasive
+        first_half = state_timer % 120 < 60
+        towards(hit_and_run & first_half, 0.8)
+        away(hit_and_run & ~first_half, 1.0)
+
+        aggressive_far = aggressive & (distance > 150)
+        towards(aggressive_far, 1.2)
+        close_combat = aggressive & ~aggressive_far
+        combat_strafe = close_combat & (state_timer % 60 < 30)
+        circle_strafe(combat_strafe)
+        towards(close_combat & ~combat_strafe, 0.5)
+
+        circle_strafe(adaptive & (distance < 120))
+        medium_range = adaptive & (distance >= 120) & (distance < 220)
+        # 側向移動（朝玩家角度 +90 度）
+        apply(medium_range, -unit_y * speed * 0.6, unit_x * speed * 0.6)
+        towards(adaptive & (distance >= 220), 0.3)
+
+        # 繞圈攻擊時，跨過 120 幀週期就改變繞行方向
+        flip = strafe_mask & (state_timer // 120 != last_think // 120)
+        return new_vx, new_vy, flip
+
+    def _random_movement(
+        self, batch, mask, x, y, speed, new_vx, new_vy, screen_width, screen_height
+    ):
+        """
+        巡邏隨機移動（對應 Enemy._random_movement）\n
+        """
+        if not mask.any():
+            return
+
+        current_time = game_clock.get_ticks()
+        target_x = np.empty(len(batch))
+        target_y = np.empty(len(batch))
+        for index in np.flatnonzero(mask).tolist():
+            enemy = batch[index]
+            # 每2秒改變一次移動方向
+            if current_time - enemy.direction_change_time > 2000:
+                enemy.target_x = random.randint(50, screen_width - 50)
+                enemy.target_y = random.randint(50, screen_height - 50)
+                enemy.direction_change_time = current_time
+            target_x[index] = enemy.target_x
+            target_y[index] = enemy.target_y
+
+        dx = np.where(mask, target_x - x, 0.0)
+        dy = np.where(mask, target_y - y, 0.0)
+        distance = np.hypot(dx, dy)
+        moving = mask & (distance > 10)
+        safe_distance = np.where(moving, distance, 1.0)
+        np.copyto(new_vx, dx / safe_distance * speed * 0.5, where=moving)
+        np.copyto(new_vy, dy / safe_distance * speed * 0.5, where=moving)
+        np.copyto(new_vx, 0.0, where=mask & ~moving)
+        np.copyto(new_vy, 0.0, where=mask & ~moving)
+
+    def _tactical_retreat(
+        self,
+        mask,
+        arrays,
+        distance,
+        player,
+        new_vx,
+        new_vy,
+        screen_width,
+        screen_height,
+    ):
+        """
+        戰術撤退（對應 Enemy._tactical_retreat）：選擇邊界內離玩家最遠的方向\n
+        """
+        if not mask.any():
+            return
+
+        x, y, width, height, speed, _, _ = arrays
+
+        directions = np.array(RETREAT_DIRECTIONS, dtype=np.float64)
+        # 形狀 (敵人數, 8)
+        new_x = x[:, None] + directions[None, :, 0] * speed[:, None] * 2
+        new_y = y[:, None] + directions[None, :, 1] * speed[:, None] * 2
+        in_bounds = (
+            (new_x >= 0)
+            & (new_x <= (screen_width - width)[:, None])
+            & (new_y >= 0)
+            & (new_y <= (screen_height - height)[:, None])
+        )
+        new_distance = np.hypot(new_x - player.x, new_y - player.y)
+        valid = in_bounds & (new_distance > distance[:, None])
+        scores = np.where(valid, new_distance, -np.inf)
+        best = np.argmax(scores, axis=1)
+        has_direction = mask & valid.any(axis=1)
+
+        np.copyto(new_vx, directions[best, 0] * speed, where=has_direction)
+        np.copyto(new_vy, directions[best, 1] * speed, where=has_direction)
+
+    def _evasive_retreat(
+        self, mask, arrays, player, new_vx, new_vy, screen_width, screen_height
+    ):
+        """
+        規避撤退（對應 Enemy._evasive_retreat）：8 個角度中選擇離玩家最遠的\n
+        """
+        if not mask.any():
+            return
+
+        x, y, width, height, speed, _, _ = arrays
+
+        angles = np.radians(np.arange(0, 360, 45, dtype=np.float64))
+        cos_a = np.cos(angles)
+        sin_a = np.sin(angles)
+        new_x = x[:, None] + cos_a[None, :] * speed[:, None] * 3
+        new_y = y[:, None] + sin_a[None, :] * speed[:, None] * 3
+        in_bounds = (
+            (new_x >= 0)
+            & (new_x <= (screen_width - width)[:, None])
+            & (new_y >= 0)
+            & (new_y <= (screen_height - height)[:, None])
+        )
+        new_distance = np.hypot(new_x - player.x, new_y - player.y)
+        scores = np.where(in_bounds, new_distance, -np.inf)
+        best = np.argmax(scores, axis=1)
+        has_direction = mask & in_bounds.any(axis=1)
+
+        np.copyto(new_vx, cos_a[best] * speed, where=has_direction)
+        np.copyto(new_vy, sin_a[best] * speed, where=has_direction)
+
+    def _write_back_plans(self, batch, think, state, flip):
+        """
+        把這一幀重新規劃的狀態和繞行方向寫回敵人物件\n
+        """
+        for index in np.flatnonzero(think).tolist():
+            enemy = batch[index]
+            if state[index] != KEEP_STATE:
+                enemy.state = STATE_NAMES[state[index]]
+            if flip[index]:
+                enemy.dodge_direction *= -1
+            enemy.last_think_timer = enemy.state_timer
+
+    def get_stats(self):
+        """
+        取得批次 AI 統計資料\n
+        \n
+        回傳:\n
+        dict: 使用批次計算的幀數和最後一次的批次大小\n
+        """
+        return {
+            "batched_frames": self.batched_frames,
+            "last_batch_size": self.last_batch_size,
+        }
@@ -2,6 +2,7 @@
 import pygame
 import math
 from src.config import *
+from src.systems.damage_queue import damage_queue
 
 ######################碰撞檢測系統######################
 
@@ -106,6 +107,8 @@ class CollisionSystem:
         """
         檢查玩家子彈與敵人的碰撞\n
         \n
+        傷害只排入傷害佇列，由 GameEngine 在這一幀結算\n
+        \n
         參數:\n
         enemies: 敵人列表\n
         bullet_manager: 子彈管理系統\n
@@ -115,7 +118,7 @@ class CollisionSystem:
         """
         hit_enemies = []
 
-        for enemy in enemies[:]:  # 使用切片避免在迴圈中修改列表
+        for enemy in enemies:
             if not enemy.is_alive:
                 continue
 
@@ -128,15 +131,14 @@ class CollisionSystem:
                 # 計算總傷害
                 total_damage = sum(bullet.damage for bullet in hit_bullets)
 
-                # 對敵人造成傷害
-                enemy.take_damage(total_damage)
+                # 排入傷害（擊殺在結算時判斷）
+                damage_queue.add(enemy, total_damage, "bullet")
 
                 # 記錄擊中事件
                 hit_info = {
                     "enemy": enemy,
                     "damage": total_damage,
                     "bullets_count": len(hit_bullets),
-                    "killed": not enemy.is_alive,
                 }
                 hit_enemies.append(hit_info)
 
@@ -147,7 +149,6 @@ class CollisionSystem:
                         "enemy": enemy,
                         "damage": total_damage,
                         "position": (enemy.x, enemy.y),
-                        "killed": not enemy.is_alive,
                     }
                 )
 
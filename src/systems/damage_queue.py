@@ -0,0 +1,85 @@
+######################載入套件######################
+from src.config import *
+
+######################傷害佇列系統######################
+
+
+class DamageQueue:
+    """
+    傷害佇列系統 - 收集一幀內所有對敵人的傷害，再一次結算\n
+    \n
+    此系統負責：\n
+    1. 子彈碰撞、雷射持續傷害、燃燒傷害都只排入 (目標, 傷害, 來源) 紀錄\n
+    2. 每幀結算一次：依排入順序扣血，記錄哪一筆傷害造成擊殺\n
+    3. 每個敵人只會被回報擊殺一次，計分和統計不會重複\n
+    \n
+    使用方式:\n
+    damage_queue.add(enemy, 25, "bullet")\n
+    kills = damage_queue.resolve()  # GameEngine 每幀碰撞檢測後呼叫一次\n
+    """
+
+    def __init__(self):
+        """
+        初始化傷害佇列\n
+        """
+        self.records = []  # (目標, 傷害, 來源)
+
+        # 統計資料
+        self.records_last_frame = 0
+        self.kills_last_frame = 0
+        self.total_kills = 0
+
+    def add(self, target, damage, source):
+        """
+        排入一筆傷害（這一幀結算時才扣血）\n
+        \n
+        參數:\n
+        target: 受到傷害的敵人\n
+        damage (float): 傷害數值\n
+        source (str): 傷害來源（'bullet', 'laser', 'burn'）\n
+        """
+        self.records.append((target, damage, source))
+
+    def resolve(self):
+        """
+        依排入順序結算這一幀的所有傷害\n
+        \n
+        回傳:\n
+        list: 擊殺紀錄 [(敵人, 造成擊殺的傷害來源), ...]，每個敵人最多出現一次\n
+        """
+        kills = []
+        for target, damage, source in self.records:
+            # 已經死亡的敵人不再受到傷害，也不會重複回報擊殺
+            if not target.is_alive:
+                continue
+            if not target.take_damage(damage):
+                kills.append((target, source))
+
+        self.records_last_frame = len(self.records)
+        self.kills_last_frame = len(kills)
+        self.total_kills += len(kills)
+        self.records.clear()
+        return kills
+
+    def clear(self):
+        """
+        清除尚未結算的傷害（換關或重新開始時呼叫）\n
+        """
+        self.records.clear()
+
+    def get_stats(self):
+        """
+        取得傷害佇列統計資料\n
+        \n
+        回傳:\n
+        dict: 上一幀的紀錄數、擊殺數和累計擊殺數\n
+        """
+        return {
+            "records_last_frame": self.records_last_frame,
+            "kills_last_frame": self.kills_last_frame,
+            "total_kills": self.total_kills,
+        }
+
+
+# 全域傷害佇列（由 GameEngine 每幀結算）
+damage_queue = DamageQueue()
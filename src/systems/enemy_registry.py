@@ -0,0 +1,139 @@
+######################載入套件######################
+from src.config import *
+
+######################敵人登錄表######################
+
+
+class EnemyRegistry:
+    """
+    敵人登錄表 - 取代 GameEngine 的敵人列表，維護存活數量和 BOSS 參考\n
+    \n
+    此類別負責：\n
+    1. 像列表一樣儲存敵人（可以迭代、len()、索引、append、clear）\n
+    2. 維護存活敵人總數、各類型存活數量和存活的 BOSS，查詢不需要掃描列表\n
+    3. 敵人死亡時只更新計數，每幀結束時一次壓縮移除死亡的敵人\n
+    \n
+    使用方式:\n
+    enemies.append(enemy)\n
+    enemies.mark_dead(enemy)  # 傷害結算時回報死亡\n
+    enemies.compact()  # 每幀一次移除死亡的敵人\n
+    """
+
+    def __init__(self):
+        """
+        初始化敵人登錄表\n
+        """
+        self._enemies = []
+        self._members = set()  # 登錄中的敵人 id，用來 O(1) 判斷是否在場上
+        self.alive_count = 0
+        self.alive_by_type = {}  # 敵人類型 -> 存活數量
+        self.boss = None  # 存活的 BOSS（沒有時為 None）
+        self.pending_dead = 0  # 等待壓縮移除的死亡敵人數量
+
+    def __getstate__(self):
+        """
+        序列化時不存敵人 id（還原後的敵人是新物件，id 會不同）\n
+        """
+        state = self.__dict__.copy()
+        del state["_members"]
+        return state
+
+    def __setstate__(self, state):
+        """
+        還原時依還原後的敵人重新建立 id 集合\n
+        """
+        self.__dict__.update(state)
+        self._members = {id(enemy) for enemy in self._enemies}
+
+    def __iter__(self):
+        return iter(self._enemies)
+
+    def __len__(self):
+        return len(self._enemies)
+
+    def __getitem__(self, index):
+        return self._enemies[index]
+
+    def __contains__(self, enemy):
+        return id(enemy) in self._members
+
+    def append(self, enemy):
+        """
+        加入新敵人\n
+        \n
+        參數:\n
+        enemy: 敵人物件\n
+        """
+        self._enemies.append(enemy)
+        self._members.add(id(enemy))
+        if not enemy.is_alive:
+            self.pending_dead += 1
+            return
+
+        self.alive_count += 1
+        self.alive_by_type[enemy.enemy_type] = (
+            self.alive_by_type.get(enemy.enemy_type, 0) + 1
+        )
+        if enemy.enemy_type == "boss":
+            self.boss = enemy
+
+    def mark_dead(self, enemy):
+        """
+        回報敵人死亡（更新計數，實際移除在 compact() 中進行）\n
+        \n
+        參數:\n
+        enemy: 已死亡的敵人（每個敵人只能回報一次）\n
+        """
+        if enemy not in self:
+            return
+
+        self.alive_count -= 1
+        self.alive_by_type[enemy.enemy_type] -= 1
+        self.pending_dead += 1
+        if enemy is self.boss:
+            self.boss = None
+
+    def compact(self):
+        """
+        一次移除所有死亡的敵人（每幀結束時呼叫，沒有死亡時不做任何事）\n
+        \n
+        回傳:\n
+        int: 移除的敵人數量\n
+        """
+        if not self.pending_dead:
+            return 0
+
+        alive_enemies = []
+        for enemy in self._enemies:
+            if enemy.is_alive:
+                alive_enemies.append(enemy)
+            else:
+                self._members.discard(id(enemy))
+
+        removed_count = len(self._enemies) - len(alive_enemies)
+        self._enemies = alive_enemies
+        self.pending_dead = 0
+        return removed_count
+
+    def count_alive(self, enemy_type):
+        """
+        取得指定類型的存活敵人數量\n
+        \n
+        參數:\n
+        enemy_type (str): 敵人類型\n
+        \n
+        回傳:\n
+        int: 存活數量\n
+        """
+        return self.alive_by_type.get(enemy_type, 0)
+
+    def clear(self):
+        """
+        清除所有敵人和計數（換關或重新開始時呼叫）\n
+        """
+        self._enemies.clear()
+        self._members.clear()
+        self.alive_count = 0
+        self.alive_by_type.clear()
+        self.boss = None
+        self.pending_dead = 0
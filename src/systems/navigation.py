@@ -0,0 +1,283 @@
+######################載入套件######################
+import pygame
+import heapq
+import math
+from src.config import *
+
+try:
+    import numpy as np
+except ImportError:
+    # 沒有 numpy 時批次 AI 不會啟用，流場只提供逐一取樣
+    np = None
+
+######################流場導航######################
+
+# 8 個鄰近格子的方向和移動成本（斜向成本為 √2）
+NEIGHBOR_STEPS = [
+    (1, 0, 1.0),
+    (-1, 0, 1.0),
+    (0, 1, 1.0),
+    (0, -1, 1.0),
+    (1, 1, math.sqrt(2)),
+    (1, -1, math.sqrt(2)),
+    (-1, 1, math.sqrt(2)),
+    (-1, -1, math.sqrt(2)),
+]
+
+
+class FlowField:
+    """
+    流場導航 - 以格子計算一張朝向玩家的方向圖，所有敵人共用\n
+    \n
+    此類別負責：\n
+    1. 把場景的靜態障礙物（SCENE_CONFIGS 的 obstacles）轉成格子地圖\n
+    2. 從玩家所在格子往外計算每個格子到玩家的最短路徑距離\n
+    3. 每個格子記錄往玩家前進的方向，敵人以 O(1) 取樣\n
+    4. 只有玩家換到不同格子時才重新計算\n
+    5. 阻擋角色移動進入障礙物\n
+    \n
+    場景沒有障礙物時直線就是最短路徑，敵人維持原本的直線移動\n
+    """
+
+    def __init__(self, screen_width, screen_height, cell_size):
+        """
+        初始化流場\n
+        \n
+        參數:\n
+        screen_width (int): 螢幕寬度\n
+        screen_height (int): 螢幕高度\n
+        cell_size (int): 格子大小（像素）\n
+        """
+        self.cell_size = cell_size
+        self.columns = max(1, math.ceil(screen_width / cell_size))
+        self.rows = max(1, math.ceil(screen_height / cell_size))
+        cell_count = self.columns * self.rows
+
+        self.obstacle_rects = []
+        self.blocked = [False] * cell_count
+
+        # 每個格子往玩家前進的方向（單位向量），(0, 0) 表示沒有方向
+        self.direction_x = [0.0] * cell_count
+        self.direction_y = [0.0] * cell_count
+        self.direction_array = None  # 批次 AI 使用的 (格子數, 2) 陣列
+
+        self.target_cell = None
+        self.recompute_count = 0
+
+    @property
+    def has_obstacles(self):
+        """
+        場景是否有障礙物（沒有時不需要流場）\n
+        """
+        return bool(self.obstacle_rects)
+
+    def set_obstacles(self, obstacles):
+        """
+        設定場景的靜態障礙物\n
+        \n
+        參數:\n
+        obstacles (list): 障礙物矩形清單 [(x, y, 寬, 高), ...]\n
+        """
+        self.obstacle_rects = [pygame.Rect(obstacle) for obstacle in obstacles]
+        self.blocked = [False] * (self.columns * self.rows)
+
+        for rect in self.obstacle_rects:
+            first_column = max(0, rect.left // self.cell_size)
+            last_column = min(self.columns - 1, (rect.right - 1) // self.cell_size)
+            first_row = max(0, rect.top // self.cell_size)
+            last_row = min(self.rows - 1, (rect.bottom - 1) // self.cell_size)
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    self.blocked[row * self.columns + column] = True
+
+        # 障礙物改變後需要重新計算
+        self.target_cell = None
+
+    def get_cell_index(self, x, y):
+        """
+        取得座標所在的格子編號\n
+        \n
+        參數:\n
+        x, y (float): 座標\n
+        \n
+        回傳:\n
+        int: 格子編號（超出地圖時限制在邊緣格子）\n
+        """
+        column = min(self.columns - 1, max(0, int(x // self.cell_size)))
+        row = min(self.rows - 1, max(0, int(y // self.cell_size)))
+        return row * self.columns + column
+
+    def update(self, target_x, target_y):
+        """
+        更新流場目標位置（每幀呼叫，目標換格子時才重新計算）\n
+        \n
+        參數:\n
+        target_x, target_y (float): 目標（玩家中心）座標\n
+        \n
+        回傳:\n
+        bool: 這一幀是否重新計算\n
+        """
+        if not self.has_obstacles:
+            return False
+
+        target_cell = self.get_cell_index(target_x, target_y)
+        if target_cell == self.target_cell:
+            return False
+
+        self.target_cell = target_cell
+        self._compute()
+        self.recompute_count += 1
+        return True
+
+    def _is_step_open(self, column, row, step_x, step_y):
+        """
+        檢查從格子往指定方向走一步是否可行（斜向不能穿過障礙物的角）\n
+        """
+        next_column = column + step_x
+        next_row = row + step_y
+        if not (0 <= next_column < self.columns and 0 <= next_row < self.rows):
+            return False
+        if self.blocked[next_row * self.columns + next_column]:
+            return False
+        if step_x and step_y:
+            if self.blocked[row * self.columns + next_column]:
+                return False
+            if self.blocked[next_row * self.columns + column]:
+                return False
+        return True
+
+    def _compute(self):
+        """
+        從目標格子往外計算最短路徑距離，再算出每個格子的前進方向\n
+        """
+        cell_count = self.columns * self.rows
+        distances = [math.inf] * cell_count
+        distances[self.target_cell] = 0.0
+        queue = [(0.0, self.target_cell)]
+
+        # Dijkstra（格子數量很少，每次重新計算都很便宜）
+        while queue:
+            distance, cell = heapq.heappop(queue)
+            if distance > distances[cell]:
+                continue
+            row, column = divmod(cell, self.columns)
+            for step_x, step_y, cost in NEIGHBOR_STEPS:
+                if not self._is_step_open(column, row, step_x, step_y):
+                    continue
+                next_cell = (row + step_y) * self.columns + column + step_x
+                next_distance = distance + cost
+                if next_distance < distances[next_cell]:
+                    distances[next_cell] = next_distance
+                    heapq.heappush(queue, (next_distance, next_cell))
+
+        # 每個格子朝距離最小的鄰近格子前進
+        for cell in range(cell_count):
+            self.direction_x[cell] = 0.0
+            self.direction_y[cell] = 0.0
+            if cell == self.target_cell or distances[cell] == math.inf:
+                continue
+
+            row, column = divmod(cell, self.columns)
+            best_distance = distances[cell]
+            for step_x, step_y, cost in NEIGHBOR_STEPS:
+                if not self._is_step_open(column, row, step_x, step_y):
+                    continue
+                next_cell = (row + step_y) * self.columns + column + step_x
+                if distances[next_cell] < best_distance:
+                    best_distance = distances[next_cell]
+                    length = math.sqrt(step_x * step_x + step_y * step_y)
+                    self.direction_x[cell] = step_x / length
+                    self.direction_y[cell] = step_y / length
+
+        if np is not None:
+            self.direction_array = np.column_stack(
+                (self.direction_x, self.direction_y)
+            )
+
+    def sample(self, x, y):
+        """
+        取得位置往目標前進的方向\n
+        \n
+        參數:\n
+        x, y (float): 位置座標（通常是角色中心）\n
+        \n
+        回傳:\n
+        tuple: 方向單位向量 (dx, dy)，已在目標格子、無法到達或沒有流場時回傳 None\n
+        """
+        if not self.has_obstacles or self.target_cell is None:
+            return None
+
+        cell = self.get_cell_index(x, y)
+        direction_x = self.direction_x[cell]
+        direction_y = self.direction_y[cell]
+        if direction_x == 0.0 and direction_y == 0.0:
+            return None
+        return (direction_x, direction_y)
+
+    def sample_many(self, center_x, center_y):
+        """
+        批次取樣多個位置的前進方向（批次 AI 使用）\n
+        \n
+        參數:\n
+        center_x, center_y (ndarray): 位置座標陣列\n
+        \n
+        回傳:\n
+        tuple: (方向 X 陣列, 方向 Y 陣列, 是否有方向)，沒有流場時回傳 None\n
+        """
+        if (
+            np is None
+            or not self.has_obstacles
+            or self.target_cell is None
+            or self.direction_array is None
+        ):
+            return None
+
+        columns = np.clip(
+            (center_x // self.cell_size).astype(np.int64), 0, self.columns - 1
+        )
+        rows = np.clip(
+            (center_y // self.cell_size).astype(np.int64), 0, self.rows - 1
+        )
+        directions = self.direction_array[rows * self.columns + columns]
+        has_direction = (directions[:, 0] != 0.0) | (directions[:, 1] != 0.0)
+        return directions[:, 0], directions[:, 1], has_direction
+
+    def is_rect_blocked(self, x, y, width, height):
+        """
+        檢查矩形是否和任何障礙物重疊\n
+        """
+        rect = pygame.Rect(int(x), int(y), int(width), int(height))
+        return rect.collidelist(self.obstacle_rects) != -1
+
+    def resolve_movement(self, entity, new_x, new_y):
+        """
+        限制角色不能走進障礙物（X、Y 分開檢查，可以沿著障礙物邊緣滑動）\n
+        \n
+        參數:\n
+        entity: 角色物件（使用目前的 x, y, width, height）\n
+        new_x, new_y (float): 想要移動到的位置\n
+        \n
+        回傳:\n
+        tuple: 實際可以移動到的位置 (x, y)\n
+        """
+        if not self.has_obstacles:
+            return new_x, new_y
+
+        resolved_x = entity.x
+        resolved_y = entity.y
+        if not self.is_rect_blocked(new_x, resolved_y, entity.width, entity.height):
+            resolved_x = new_x
+        if not self.is_rect_blocked(resolved_x, new_y, entity.width, entity.height):
+            resolved_y = new_y
+        return resolved_x, resolved_y
+
+    def draw(self, screen):
+        """
+        繪製場景障礙物\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 遊戲畫面物件\n
+        """
+        for rect in self.obstacle_rects:
+            pygame.draw.rect(screen, NAVIGATION_CONFIGS["obstacle_color"], rect)
+            pygame.draw.rect(screen, COLORS["black"], rect, 2)
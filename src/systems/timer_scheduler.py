@@ -0,0 +1,174 @@
+######################載入套件######################
+import heapq
+import itertools
+from src.core.game_clock import game_clock
+
+######################計時排程系統######################
+
+
+class TimerHandle:
+    """
+    排程計時器的控制代碼 - 用來取消尚未觸發的計時器\n
+    """
+
+    __slots__ = ("due_time", "callback", "args", "cancelled")
+
+    def __init__(self, due_time, callback, args):
+        """
+        建立計時器控制代碼\n
+        \n
+        參數:\n
+        due_time (int): 觸發時間（毫秒，遊戲時鐘的時間軸）\n
+        callback (function): 觸發時呼叫的函數\n
+        args (tuple): 呼叫參數\n
+        """
+        self.due_time = due_time
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class TimerScheduler:
+    """
+    計時排程系統 - 以最小堆積管理所有一次性計時事件\n
+    \n
+    此系統負責：\n
+    1. 狀態效果（燃燒傷害、冰凍結束）、強化效果到期、技能結束、訊息淡出、\n
+       道具消失等計時事件各自排程一次，到期時呼叫對應函數\n
+    2. 每幀只處理已到期的事件，成本和場上物件數量無關\n
+    3. 取消的計時器延遲移除，取消太多時整理堆積\n
+    \n
+    使用方式:\n
+    handle = timer_scheduler.schedule(3000, enemy._remove_status_effect, "freeze")\n
+    timer_scheduler.cancel(handle)  # 提前取消\n
+    timer_scheduler.update()  # 遊戲引擎每幀呼叫一次\n
+    """
+
+    def __init__(self):
+        """
+        初始化計時排程系統\n
+        """
+        self._heap = []  # (觸發時間, 排程順序, 控制代碼)
+        self._sequence = itertools.count()  # 同時到期時依排程順序觸發
+        self.cancelled_count = 0
+
+        # 統計資料
+        self.fired_this_frame = 0
+        self.total_fired = 0
+
+    def schedule(self, delay_ms, callback, *args):
+        """
+        排程在指定時間後呼叫函數\n
+        \n
+        參數:\n
+        delay_ms (int): 延遲時間（毫秒）\n
+        callback (function): 到期時呼叫的函數\n
+        *args: 呼叫參數\n
+        \n
+        回傳:\n
+        TimerHandle: 計時器控制代碼（可用來取消）\n
+        """
+        return self.schedule_at(game_clock.get_ticks() + delay_ms, callback, *args)
+
+    def schedule_at(self, due_time, callback, *args):
+        """
+        排程在指定時間點呼叫函數\n
+        \n
+        參數:\n
+        due_time (int): 觸發時間（毫秒，遊戲時鐘的時間軸）\n
+        callback (function): 到期時呼叫的函數\n
+        *args: 呼叫參數\n
+        \n
+        回傳:\n
+        TimerHandle: 計時器控制代碼（可用來取消）\n
+        """
+        handle = TimerHandle(due_time, callback, args)
+        heapq.heappush(self._heap, (due_time, next(self._sequence), handle))
+        return handle
+
+    def cancel(self, handle):
+        """
+        取消尚未觸發的計時器\n
+        \n
+        參數:\n
+        handle (TimerHandle): 計時器控制代碼，None 時不做任何事\n
+        """
+        if handle is None or handle.cancelled:
+            return
+        handle.cancelled = True
+        self.cancelled_count += 1
+
+        # 取消的計時器超過一半時整理堆積，避免佔用記憶體
+        if self.cancelled_count > 64 and self.cancelled_count * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self.cancelled_count = 0
+
+    def update(self, current_time=None):
+        """
+        觸發所有已到期的計時器（每幀呼叫一次）\n
+        \n
+        參數:\n
+        current_time (int): 目前時間（毫秒），None 時使用 game_clock.get_ticks()\n
+        \n
+        回傳:\n
+        int: 這一幀觸發的計時器數量\n
+        """
+        if current_time is None:
+            current_time = game_clock.get_ticks()
+
+        self.fired_this_frame = 0
+        heap = self._heap
+        while heap and heap[0][0] <= current_time:
+            _, _, handle = heapq.heappop(heap)
+            if handle.cancelled:
+                self.cancelled_count -= 1
+                continue
+
+            # 標記為已處理，之後再取消也不會影響計數
+            handle.cancelled = True
+            handle.callback(*handle.args)
+            self.fired_this_frame += 1
+
+        self.total_fired += self.fired_this_frame
+        return self.fired_this_frame
+
+    def get_state(self):
+        """
+        取得所有等待中的計時器（存檔用，依觸發順序排列）\n
+        \n
+        回傳:\n
+        list: 等待中的 TimerHandle\n
+        """
+        return [handle for _, _, handle in sorted(self._heap) if not handle.cancelled]
+
+    def set_state(self, handles):
+        """
+        用存檔的計時器取代目前所有計時器\n
+        \n
+        參數:\n
+        handles (list): get_state() 取得的 TimerHandle（依觸發順序排列）\n
+        """
+        self._heap = []
+        self._sequence = itertools.count()
+        self.cancelled_count = 0
+        for handle in handles:
+            self._heap.append((handle.due_time, next(self._sequence), handle))
+        heapq.heapify(self._heap)
+
+    def get_stats(self):
+        """
+        取得排程統計資料\n
+        \n
+        回傳:\n
+        dict: 等待中的計時器數量和觸發次數\n
+        """
+        return {
+            "pending": len(self._heap) - self.cancelled_count,
+            "fired_this_frame": self.fired_this_frame,
+            "total_fired": self.total_fired,
+        }
+
+
+# 全域計時排程系統（由 GameEngine 每幀更新）
+timer_scheduler = TimerScheduler()
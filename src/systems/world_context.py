@@ -0,0 +1,104 @@
+######################載入套件######################
+from src.config import *
+
+######################世界快照######################
+
+# 預測性瞄準往前預測的幀數（0.5 秒 × 60fps，與 Enemy.calculate_shot_angle 相同）
+PREDICTION_FRAMES = 0.5 * 60
+
+
+class WorldContext:
+    """
+    每幀世界快照 - 在 GameEngine.update_game 中每幀建立一次，供所有系統唯讀使用\n
+    \n
+    此類別負責：\n
+    1. 預先計算玩家中心點和預測位移（敵人瞄準、玩家技能共用）\n
+    2. 收集存活敵人和它們的中心點（追蹤子彈、雷射共用）\n
+    3. 提供場景流場，敵人以 O(1) 取樣繞過障礙物的方向\n
+    \n
+    BOSS 的參考由 EnemyRegistry.boss 提供，不在這裡重複搜尋\n
+    \n
+    快照建立後不應再修改；玩家和敵人在這一幀之後的移動不會反映在快照中\n
+    """
+
+    __slots__ = (
+        "player",
+        "player_center",
+        "player_lead",
+        "alive_enemies",
+        "enemy_centers",
+        "flow_field",
+        "_center_index",
+    )
+
+    def __init__(self, player, enemies, flow_field=None):
+        """
+        建立這一幀的世界快照\n
+        \n
+        參數:\n
+        player: 玩家物件\n
+        enemies (list): 敵人列表\n
+        flow_field (FlowField): 場景流場，場景沒有障礙物時為 None\n
+        """
+        self.player = player
+        self.flow_field = flow_field
+        center_x = player.x + player.width / 2
+        center_y = player.y + player.height / 2
+        self.player_center = (center_x, center_y)
+
+        # 依玩家目前速度預測 0.5 秒後的位移
+        self.player_lead = (
+            player.velocity_x * PREDICTION_FRAMES,
+            player.velocity_y * PREDICTION_FRAMES,
+        )
+
+        # 存活敵人和中心點（索引相同）
+        self.alive_enemies = tuple(enemy for enemy in enemies if enemy.is_alive)
+        self.enemy_centers = tuple(
+            (enemy.x + enemy.width / 2, enemy.y + enemy.height / 2)
+            for enemy in self.alive_enemies
+        )
+        self._center_index = {
+            id(enemy): index for index, enemy in enumerate(self.alive_enemies)
+        }
+
+    def get_enemy_center(self, enemy):
+        """
+        取得敵人在這一幀開始時的中心點\n
+        \n
+        參數:\n
+        enemy: 敵人物件\n
+        \n
+        回傳:\n
+        tuple: (中心 X, 中心 Y)，敵人不在快照中時即時計算\n
+        """
+        index = self._center_index.get(id(enemy))
+        if index is None:
+            return (enemy.x + enemy.width / 2, enemy.y + enemy.height / 2)
+        return self.enemy_centers[index]
+
+    def nearest_enemy(self, x, y, max_distance):
+        """
+        尋找離指定位置最近且仍存活的敵人\n
+        \n
+        參數:\n
+        x, y (float): 位置座標\n
+        max_distance (float): 最大搜尋距離\n
+        \n
+        回傳:\n
+        Enemy: 最近的敵人，範圍內沒有敵人時回傳 None\n
+        """
+        nearest_enemy = None
+        min_distance_squared = max_distance * max_distance
+
+        for enemy, (center_x, center_y) in zip(self.alive_enemies, self.enemy_centers):
+            if not enemy.is_alive:
+                continue
+            dx = center_x - x
+            dy = center_y - y
+            distance_squared = dx * dx + dy * dy
+            if distance_squared < min_distance_squared:
+                min_distance_squared = distance_squared
+                nearest_enemy = enemy
+
+        return nearest_enemy
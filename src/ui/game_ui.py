@@ -4,6 +4,8 @@ import math
 from src.config import *
 from src.utils.font_manager import font_manager
 from src.utils.image_manager import image_manager
+from src.systems.timer_scheduler import timer_scheduler
+from src.core.game_clock import game_clock
 
 ######################UI系統######################
 
@@ -72,20 +74,17 @@ class GameUI:
             "no_ammo": COLORS["red"],  # 沒有子彈 - 紅色
         }
 
-    def update(self):
+    def _expire_message(self, message):
         """
-        更新UI狀態（每幀呼叫）\n
+        移除過期訊息（由計時器在訊息顯示時間結束時呼叫）\n
         \n
-        處理訊息過期、動畫效果等\n
+        參數:\n
+        message (dict): 要移除的訊息\n
         """
-        current_time = pygame.time.get_ticks()
-
-        # 清理過期訊息
-        self.messages = [
-            msg
-            for msg in self.messages
-            if current_time - msg["time"] < self.message_duration
-        ]
+        for index, active_message in enumerate(self.messages):
+            if active_message is message:
+                del self.messages[index]
+                break
 
     def draw(
         self,
@@ -446,7 +445,7 @@ class GameUI:
                 color = active_skill_info["effect_color"]
 
                 # 添加閃爍效果
-                current_time = pygame.time.get_ticks()
+                current_time = game_clock.get_ticks()
                 if (current_time // 200) % 2 == 0:  # 每200ms閃爍
                     color = COLORS["white"]
 
@@ -477,7 +476,7 @@ class GameUI:
             color = COLORS["green"]
 
             # 就緒時添加輕微閃爍
-            current_time = pygame.time.get_ticks()
+            current_time = game_clock.get_ticks()
             if (current_time // 500) % 2 == 0:  # 每500ms閃爍
                 color = COLORS["white"]
         else:
@@ -629,8 +628,8 @@ class GameUI:
         if not self.crosshair_enabled:
             return
 
-        # 取得滑鼠位置
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        # 取得滑鼠位置（來自這一幀的輸入快照，重播時也會跟著移動）
+        mouse_x, mouse_y = player.mouse_position
 
         # 根據玩家狀態決定準心顏色
         crosshair_color = self._get_crosshair_color(player)
@@ -719,7 +718,7 @@ class GameUI:
         message_x = self.screen_width // 2
         message_start_y = 100
 
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
 
         for i, message in enumerate(self.messages):
             # 計算訊息透明度（基於剩餘時間）
@@ -923,7 +922,7 @@ class GameUI:
                         bullet_color = bullet.effect_color
                         bullet_size = 2
                         # 在小地圖上繪製閃爍效果
-                        current_time = pygame.time.get_ticks()
+                        current_time = game_clock.get_ticks()
                         if (current_time // 150) % 2 == 0:  # 每150ms閃爍
                             pygame.draw.circle(
                                 screen,
@@ -949,10 +948,11 @@ class GameUI:
         message = {
             "text": text,
             "type": message_type,
-            "time": pygame.time.get_ticks(),
+            "time": game_clock.get_ticks(),
             "color": color,
         }
         self.messages.append(message)
+        timer_scheduler.schedule(self.message_duration, self._expire_message, message)
 
         # 限制訊息數量
         if len(self.messages) > 5:
@@ -1033,3 +1033,84 @@ class GameUI:
             center=(self.screen_width // 2, self.screen_height // 2 + 50)
         )
         screen.blit(restart_surface, restart_rect)
+
+    def draw_time_scale(self, screen, label):
+        """
+        繪製目前的遊戲速度（不是正常速度時顯示）\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 遊戲畫面物件\n
+        label (str): 倍率文字，例如 "×4"\n
+        """
+        speed_surface = self.font_medium.render(
+            f"遊戲速度 {label}", True, COLORS["yellow"]
+        )
+        speed_rect = speed_surface.get_rect(center=(self.screen_width // 2, 20))
+        screen.blit(speed_surface, speed_rect)
+
+    def get_replay_bar_rect(self):
+        """
+        取得重播時間軸的位置（繪製和點擊判斷共用）\n
+        \n
+        回傳:\n
+        pygame.Rect: 時間軸範圍\n
+        """
+        margin = REPLAY_CONFIGS["bar_margin"]
+        bar_height = REPLAY_CONFIGS["bar_height"]
+        return pygame.Rect(
+            margin,
+            self.screen_height - margin // 2 - bar_height,
+            self.screen_width - margin * 2,
+            bar_height,
+        )
+
+    def draw_replay_bar(self, screen, replay_player):
+        """
+        繪製重播時間軸（播放進度、關鍵幀位置和播放時間）\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 遊戲畫面物件\n
+        replay_player (ReplayPlayer): 重播播放器\n
+        """
+        bar_rect = self.get_replay_bar_rect()
+        frame_count = max(1, replay_player.frame_count)
+        progress = replay_player.current_frame / frame_count
+
+        # 時間軸背景和已播放的部分
+        pygame.draw.rect(screen, COLORS["dark_gray"], bar_rect)
+        played_rect = bar_rect.copy()
+        played_rect.width = int(bar_rect.width * progress)
+        pygame.draw.rect(screen, COLORS["blue"], played_rect)
+
+        # 關鍵幀位置（跳到這些位置不需要快轉）
+        for first_frame in replay_player.reader.chunk_first_frames:
+            tick_x = bar_rect.left + int(bar_rect.width * first_frame / frame_count)
+            pygame.draw.line(
+                screen,
+                COLORS["gray"],
+                (tick_x, bar_rect.top - 3),
+                (tick_x, bar_rect.top - 1),
+            )
+
+        # 播放位置
+        head_x = bar_rect.left + played_rect.width
+        pygame.draw.rect(
+            screen,
+            COLORS["white"],
+            (head_x - 2, bar_rect.top - 4, 4, bar_rect.height + 8),
+        )
+
+        # 播放時間和操作說明
+        fps = replay_player.reader.fps
+        current_seconds = replay_player.current_frame // fps
+        total_seconds = replay_player.frame_count // fps
+        status_text = "播放中" if replay_player.playing else "已暫停"
+        info_text = (
+            f"{status_text} 重播 {current_seconds // 60:02d}:{current_seconds % 60:02d}"
+            f" / {total_seconds // 60:02d}:{total_seconds % 60:02d}"
+            f"  幀 {replay_player.current_frame}/{replay_player.frame_count}"
+            f"   SPACE 暫停  ←/→ 跳轉  點擊時間軸跳轉  ESC 返回"
+        )
+        info_surface = self.font_small.render(info_text, True, COLORS["white"])
+        info_y = bar_rect.top - 8 - info_surface.get_height()
+        screen.blit(info_surface, (bar_rect.left, info_y))
@@ -527,14 +527,12 @@ class SelectionUI:
         # 難度圖示（使用PNG圖片）
         if "icon_path" in difficulty_config:
             try:
-                # 載入難度圖示
-                icon_image = image_manager.load_image(difficulty_config["icon_path"])
+                # 載入已縮放到適當大小的難度圖示（避免每幀重新縮放）
+                icon_image = image_manager.load_image(
+                    difficulty_config["icon_path"],
+                    ASSET_CACHE_CONFIGS["difficulty_icon_size"],
+                )
                 if icon_image:
-                    # 縮放圖示到適當大小
-                    icon_size = 48
-                    icon_image = pygame.transform.scale(
-                        icon_image, (icon_size, icon_size)
-                    )
                     icon_rect = icon_image.get_rect(
                         center=(x + card_width // 2, y + 40)
                     )
@@ -0,0 +1,395 @@
+######################載入套件######################
+import pygame
+import os
+import json
+import hashlib
+from src.config import *
+
+######################路徑設定######################
+
+# 專案根目錄：src/utils -> src -> 專案根目錄
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+# 烘焙快取格式版本（格式改變時遞增，舊快取會自動失效）
+BAKE_FORMAT_VERSION = 1
+
+# pygame 2.1.3 之後改名為 tobytes/frombytes，舊版只有 tostring
+_image_to_bytes = getattr(pygame.image, "tobytes", pygame.image.tostring)
+
+######################輔助函數######################
+
+
+def _get_cache_paths():
+    """
+    取得快取目錄、圖片目錄和索引檔路徑\n
+    \n
+    回傳:\n
+    tuple: (快取根目錄, 圖片目錄, 索引檔路徑)\n
+    """
+    cache_dir = os.path.join(PROJECT_ROOT, ASSET_CACHE_CONFIGS["cache_dir"])
+    images_dir = os.path.join(cache_dir, ASSET_CACHE_CONFIGS["images_dir"])
+    manifest_path = os.path.join(images_dir, ASSET_CACHE_CONFIGS["manifest_name"])
+    return cache_dir, images_dir, manifest_path
+
+
+def _file_sha1(full_path):
+    """
+    計算檔案內容的 SHA-1 雜湊值\n
+    \n
+    參數:\n
+    full_path (str): 檔案完整路徑\n
+    \n
+    回傳:\n
+    str: 十六進位雜湊字串\n
+    """
+    digest = hashlib.sha1()
+    with open(full_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_entry_key(image_path, size, use_alpha):
+    """
+    建立烘焙項目的索引鍵值\n
+    \n
+    參數:\n
+    image_path (str): 圖片路徑（相對於專案根目錄）\n
+    size (tuple): 目標尺寸，None 表示原尺寸\n
+    use_alpha (bool): 是否保留透明通道\n
+    \n
+    回傳:\n
+    str: 索引鍵值，例如 "assets/weapons/weapon_pistol.png|96x96|RGBA"\n
+    """
+    size_key = f"{size[0]}x{size[1]}" if size else "original"
+    pixel_format = "RGBA" if use_alpha else "RGB"
+    return f"{image_path}|{size_key}|{pixel_format}"
+
+
+def collect_bake_targets():
+    """
+    列出遊戲實際使用的所有（圖片, 尺寸）組合\n
+    \n
+    尺寸需與各介面的載入呼叫保持一致，否則執行時會找不到快取而回到即時解碼\n
+    \n
+    回傳:\n
+    list: (image_path, size, use_alpha) 清單\n
+    """
+    targets = []
+
+    # 角色圖片（主要圖片和備用圖片，選擇界面和遊戲中兩種尺寸）
+    for character_config in CHARACTER_CONFIGS.values():
+        for path_key in ("image_path", "fallback_image_path"):
+            image_path = character_config.get(path_key)
+            if image_path:
+                for size in ASSET_CACHE_CONFIGS["character_sizes"]:
+                    targets.append((image_path, tuple(size), True))
+
+    # 武器圖片
+    for weapon_config in WEAPON_CONFIGS.values():
+        image_path = weapon_config.get("image_path")
+        if image_path:
+            for size in ASSET_CACHE_CONFIGS["weapon_sizes"]:
+                targets.append((image_path, tuple(size), True))
+
+    # 場景背景和預覽圖（不透明，使用 RGB）
+    for scene_config in SCENE_CONFIGS.values():
+        image_path = scene_config.get("background_image")
+        if image_path:
+            targets.append((image_path, (SCREEN_WIDTH, SCREEN_HEIGHT), False))
+            targets.append(
+                (image_path, tuple(ASSET_CACHE_CONFIGS["scene_preview_size"]), False)
+            )
+
+    # 敵人圖片（BOSS 是玩家尺寸的兩倍）
+    for enemy_type, type_config in AI_ENEMY_TYPES.items():
+        image_path = type_config.get("image_path")
+        if image_path:
+            if enemy_type == "boss":
+                size = (PLAYER_SIZE * 2, PLAYER_SIZE * 2)
+            else:
+                size = (ENEMY_SIZE, ENEMY_SIZE)
+            targets.append((image_path, size, True))
+
+    # 難度圖示
+    for difficulty_config in DIFFICULTY_CONFIGS.values():
+        image_path = difficulty_config.get("icon_path")
+        if image_path:
+            targets.append(
+                (image_path, tuple(ASSET_CACHE_CONFIGS["difficulty_icon_size"]), True)
+            )
+
+    # 勝利星星（比普通道具大一倍）
+    star_path = POWERUP_EFFECTS["victory_star"].get("image_path")
+    if star_path:
+        targets.append((star_path, (POWERUP_SIZE * 2, POWERUP_SIZE * 2), True))
+
+    return targets
+
+
+######################烘焙快取讀取類別######################
+
+
+class BakedImageCache:
+    """
+    烘焙圖片快取 - 讀取離線預縮放的原始像素資料\n
+    \n
+    此類別負責：\n
+    1. 延遲載入快取索引檔\n
+    2. 用檔案大小和修改時間快速驗證來源圖片\n
+    3. 修改時間不符時改用內容雜湊驗證\n
+    4. 直接把原始像素資料轉成 Surface，不需解碼和縮放\n
+    """
+
+    def __init__(self):
+        """
+        初始化烘焙快取讀取器\n
+        \n
+        索引檔在第一次查詢時才載入\n
+        """
+        self.manifest = None
+        # 來源圖片驗證結果快取（每次執行只驗證一次）
+        self.source_valid = {}
+
+    def _load_manifest(self):
+        """
+        載入快取索引檔\n
+        \n
+        索引檔不存在或版本不符時視為空快取\n
+        """
+        _, _, manifest_path = _get_cache_paths()
+        self.manifest = {"sources": {}, "entries": {}}
+
+        if not os.path.exists(manifest_path):
+            return
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == BAKE_FORMAT_VERSION:
+                self.manifest = manifest
+            else:
+                print("⚠️ 烘焙快取版本不符，請重新執行烘焙指令")
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 讀取烘焙快取索引失敗: {e}")
+
+    def _is_source_current(self, image_path):
+        """
+        檢查來源圖片是否和烘焙時相同\n
+        \n
+        先比對檔案大小和修改時間，不符時才計算內容雜湊\n
+        \n
+        參數:\n
+        image_path (str): 圖片路徑（相對於專案根目錄）\n
+        \n
+        回傳:\n
+        bool: 快取是否仍然有效\n
+        """
+        if image_path in self.source_valid:
+            return self.source_valid[image_path]
+
+        source_info = self.manifest["sources"].get(image_path)
+        is_valid = False
+
+        if source_info:
+            full_path = os.path.join(PROJECT_ROOT, image_path)
+            try:
+                stat = os.stat(full_path)
+                if (
+                    stat.st_size == source_info["size"]
+                    and stat.st_mtime_ns == source_info["mtime_ns"]
+                ):
+                    is_valid = True
+                elif stat.st_size == source_info["size"]:
+                    # 修改時間變了（例如重新 checkout），用內容雜湊確認
+                    is_valid = _file_sha1(full_path) == source_info["sha1"]
+            except OSError:
+                is_valid = False
+
+        self.source_valid[image_path] = is_valid
+        return is_valid
+
+    def load(self, image_path, size, use_alpha=True):
+        """
+        從烘焙快取載入圖片\n
+        \n
+        參數:\n
+        image_path (str): 圖片路徑（相對於專案根目錄）\n
+        size (tuple): 目標尺寸，None 表示原尺寸\n
+        use_alpha (bool): 是否保留透明通道\n
+        \n
+        回傳:\n
+        pygame.Surface: 快取中的圖片，沒有有效快取時回傳 None\n
+        """
+        if not ASSET_CACHE_CONFIGS["enabled"]:
+            return None
+
+        if self.manifest is None:
+            self._load_manifest()
+
+        entry = self.manifest["entries"].get(make_entry_key(image_path, size, use_alpha))
+        if not entry or not self._is_source_current(image_path):
+            return None
+
+        _, images_dir, _ = _get_cache_paths()
+        width, height = entry["size"]
+        pixel_format = entry["format"]
+        expected_length = width * height * len(pixel_format)
+
+        try:
+            with open(os.path.join(images_dir, entry["file"]), "rb") as f:
+                pixel_data = f.read()
+        except OSError:
+            return None
+
+        if len(pixel_data) != expected_length:
+            # 快取檔損壞或被截斷，改用即時解碼
+            return None
+
+        surface = pygame.image.frombuffer(pixel_data, (width, height), pixel_format)
+
+        # 轉換成顯示格式（同時複製一份，不再依賴原始位元組）
+        try:
+            if use_alpha:
+                return surface.convert_alpha()
+            return surface.convert()
+        except pygame.error:
+            # 顯示未初始化時直接複製
+            return surface.copy()
+
+    def reload(self):
+        """
+        重新載入快取索引（烘焙完成後呼叫）\n
+        """
+        self.manifest = None
+        self.source_valid.clear()
+
+
+######################烘焙流程######################
+
+
+def bake_assets(force=False):
+    """
+    把遊戲使用的所有圖片預先縮放並以原始像素格式寫入快取\n
+    \n
+    來源圖片內容雜湊未變的項目會直接沿用，不會重新烘焙\n
+    \n
+    參數:\n
+    force (bool): 是否忽略現有快取全部重新烘焙\n
+    \n
+    回傳:\n
+    dict: 烘焙統計 {"baked", "reused", "missing", "removed"}\n
+    """
+    _, images_dir, manifest_path = _get_cache_paths()
+    os.makedirs(images_dir, exist_ok=True)
+
+    # 讀取舊索引，用來沿用未變動的項目
+    old_entries = {}
+    if not force and os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                old_manifest = json.load(f)
+            if old_manifest.get("version") == BAKE_FORMAT_VERSION:
+                old_entries = old_manifest.get("entries", {})
+        except (OSError, ValueError):
+            old_entries = {}
+
+    manifest = {"version": BAKE_FORMAT_VERSION, "sources": {}, "entries": {}}
+    stats = {"baked": 0, "reused": 0, "missing": 0, "removed": 0}
+    source_images = {}
+
+    for image_path, size, use_alpha in collect_bake_targets():
+        entry_key = make_entry_key(image_path, size, use_alpha)
+        if entry_key in manifest["entries"]:
+            continue
+
+        full_path = os.path.join(PROJECT_ROOT, image_path)
+        if not os.path.exists(full_path):
+            stats["missing"] += 1
+            continue
+
+        # 記錄來源圖片資訊（每個來源只計算一次雜湊）
+        if image_path not in manifest["sources"]:
+            stat = os.stat(full_path)
+            manifest["sources"][image_path] = {
+                "sha1": _file_sha1(full_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        source_sha1 = manifest["sources"][image_path]["sha1"]
+
+        # 檔名包含來源雜湊，來源改變時自然產生新檔案
+        file_name = (
+            hashlib.sha1(f"{entry_key}|{source_sha1}".encode("utf-8")).hexdigest()[:20]
+            + ".raw"
+        )
+        old_entry = old_entries.get(entry_key)
+        if (
+            old_entry
+            and old_entry.get("file") == file_name
+            and os.path.exists(os.path.join(images_dir, file_name))
+        ):
+            manifest["entries"][entry_key] = old_entry
+            stats["reused"] += 1
+            continue
+
+        try:
+            if image_path not in source_images:
+                source_images[image_path] = pygame.image.load(full_path)
+            raw_image = source_images[image_path]
+
+            # 和執行時相同的縮放方式，確保畫面一致
+            processed_image = pygame.transform.scale(raw_image, size) if size else raw_image
+            pixel_format = "RGBA" if use_alpha else "RGB"
+            pixel_data = _image_to_bytes(processed_image, pixel_format)
+
+            with open(os.path.join(images_dir, file_name), "wb") as f:
+                f.write(pixel_data)
+
+            manifest["entries"][entry_key] = {
+                "file": file_name,
+                "size": list(processed_image.get_size()),
+                "format": pixel_format,
+                "source_sha1": source_sha1,
+            }
+            stats["baked"] += 1
+        except pygame.error as e:
+            print(f"❌ 烘焙圖片失敗 ({entry_key}): {e}")
+
+    # 移除已不再被索引引用的舊快取檔
+    referenced_files = {entry["file"] for entry in manifest["entries"].values()}
+    for file_name in os.listdir(images_dir):
+        if file_name.endswith(".raw") and file_name not in referenced_files:
+            os.remove(os.path.join(images_dir, file_name))
+            stats["removed"] += 1
+
+    # 先寫暫存檔再替換，避免中斷時留下半個索引
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(temp_path, manifest_path)
+
+    baked_image_cache.reload()
+    return stats
+
+
+def main():
+    """
+    烘焙指令進入點：python -m src.utils.asset_baker [--force]\n
+    """
+    import sys
+
+    force = "--force" in sys.argv[1:]
+    print("🔄 開始烘焙圖片資源...")
+    stats = bake_assets(force=force)
+    print(
+        f"✅ 烘焙完成：新烘焙 {stats['baked']} 項、沿用 {stats['reused']} 項、"
+        f"來源缺失 {stats['missing']} 項、清除舊檔 {stats['removed']} 個"
+    )
+
+
+# 創建全域烘焙快取實例
+baked_image_cache = BakedImageCache()
+
+if __name__ == "__main__":
+    main()
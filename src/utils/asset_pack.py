@@ -0,0 +1,375 @@
+######################載入套件######################
+import pygame
+import os
+import io
+import json
+import mmap
+import struct
+from src.config import *
+from src.utils.asset_baker import (
+    PROJECT_ROOT,
+    collect_bake_targets,
+    make_entry_key,
+    _image_to_bytes,
+)
+
+######################封裝檔格式######################
+
+# 檔頭：魔術字 + 版本 + 保留欄位 + 索引長度
+PACK_MAGIC = b"BAPK"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sHHI")
+
+# 資料區塊對齊（讓原始像素資料可以直接當作緩衝區使用）
+PACK_ALIGNMENT = 16
+
+# 烘焙圖片在封裝檔中的名稱前綴
+BAKED_PREFIX = "baked/"
+
+######################封裝檔讀取類別######################
+
+
+class _PackEntryReader(io.RawIOBase):
+    """
+    封裝檔項目讀取器 - 把 mmap 中的一段資料包裝成唯讀檔案物件\n
+    \n
+    讓 pygame.image.load 和 pygame.mixer.Sound 可以直接從封裝檔讀取，\n
+    不需要先把整個檔案複製成 bytes\n
+    """
+
+    def __init__(self, view):
+        """
+        初始化讀取器\n
+        \n
+        參數:\n
+        view (memoryview): 項目資料的記憶體視圖\n
+        """
+        super().__init__()
+        self._view = view
+        self._position = 0
+
+    def readable(self):
+        """
+        檔案物件介面：可讀取\n
+        """
+        return True
+
+    def seekable(self):
+        """
+        檔案物件介面：可移動讀取位置\n
+        """
+        return True
+
+    def readinto(self, buffer):
+        """
+        讀取資料到指定緩衝區\n
+        """
+        remaining = len(self._view) - self._position
+        count = min(len(buffer), max(0, remaining))
+        buffer[:count] = self._view[self._position : self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """
+        移動讀取位置\n
+        """
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            self._position = len(self._view) + offset
+        self._position = max(0, self._position)
+        return self._position
+
+    def tell(self):
+        """
+        取得目前讀取位置\n
+        """
+        return self._position
+
+
+class AssetPack:
+    """
+    資源封裝檔 - 以單一檔案加上索引存放所有遊戲資源\n
+    \n
+    此類別負責：\n
+    1. 開啟封裝檔並以 mmap 映射到記憶體\n
+    2. 解析檔頭索引（名稱 -> 位移、長度、格式）\n
+    3. 提供零複製的資料視圖和檔案物件介面\n
+    \n
+    檔案格式：\n
+    [檔頭 12 bytes][JSON 索引][對齊後的資料區塊...]\n
+    """
+
+    def __init__(self, pack_path):
+        """
+        開啟資源封裝檔\n
+        \n
+        參數:\n
+        pack_path (str): 封裝檔完整路徑\n
+        """
+        self.pack_path = pack_path
+        self._file = open(pack_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, _, index_length = PACK_HEADER.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"不支援的資源封裝檔格式: {pack_path}")
+
+        index_start = PACK_HEADER.size
+        index_bytes = self._mmap[index_start : index_start + index_length]
+        self.index = json.loads(index_bytes.decode("utf-8"))
+
+    def has(self, name):
+        """
+        檢查封裝檔中是否有指定資源\n
+        \n
+        參數:\n
+        name (str): 資源名稱（相對於專案根目錄的路徑）\n
+        \n
+        回傳:\n
+        bool: 是否存在\n
+        """
+        return name in self.index
+
+    def get_entry(self, name):
+        """
+        取得資源的索引資訊\n
+        \n
+        參數:\n
+        name (str): 資源名稱\n
+        \n
+        回傳:\n
+        dict: {"offset", "length", "format", ...}，不存在時回傳 None\n
+        """
+        return self.index.get(name)
+
+    def get_view(self, name):
+        """
+        取得資源資料的記憶體視圖（不複製）\n
+        \n
+        參數:\n
+        name (str): 資源名稱\n
+        \n
+        回傳:\n
+        memoryview: 資料視圖，不存在時回傳 None\n
+        """
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+        offset = entry["offset"]
+        return self._view[offset : offset + entry["length"]]
+
+    def open(self, name):
+        """
+        以檔案物件的形式開啟資源\n
+        \n
+        參數:\n
+        name (str): 資源名稱\n
+        \n
+        回傳:\n
+        io.BufferedReader: 唯讀檔案物件，不存在時回傳 None\n
+        """
+        view = self.get_view(name)
+        if view is None:
+            return None
+        return io.BufferedReader(_PackEntryReader(view))
+
+    def load_image(self, name):
+        """
+        從封裝檔解碼圖片\n
+        \n
+        參數:\n
+        name (str): 圖片名稱\n
+        \n
+        回傳:\n
+        pygame.Surface: 解碼後的圖片，不存在時回傳 None\n
+        """
+        image_file = self.open(name)
+        if image_file is None:
+            return None
+        # 提供副檔名讓 pygame 判斷格式
+        return pygame.image.load(image_file, os.path.basename(name))
+
+    def load_baked_image(self, entry_key):
+        """
+        取得封裝檔中預先縮放好的原始像素圖片（直接引用 mmap 資料）\n
+        \n
+        參數:\n
+        entry_key (str): 烘焙項目鍵值（見 make_entry_key）\n
+        \n
+        回傳:\n
+        pygame.Surface: 引用封裝檔資料的圖片，不存在時回傳 None\n
+        """
+        name = BAKED_PREFIX + entry_key
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+        return pygame.image.frombuffer(
+            self.get_view(name), tuple(entry["size"]), entry["format"]
+        )
+
+    def close(self):
+        """
+        關閉封裝檔\n
+        """
+        try:
+            self._view.release()
+            self._mmap.close()
+        except (BufferError, ValueError):
+            # 仍有 Surface 引用資料時無法立即釋放，交給程式結束時處理
+            pass
+        self._file.close()
+
+
+######################全域存取######################
+
+_asset_pack = None
+_asset_pack_checked = False
+
+
+def get_asset_pack_path():
+    """
+    取得資源封裝檔的完整路徑\n
+    """
+    return os.path.join(PROJECT_ROOT, ASSET_PACK_CONFIGS["pack_path"])
+
+
+def get_asset_pack():
+    """
+    獲取資源封裝檔實例（延遲開啟）\n
+    \n
+    封裝檔不存在或停用時回傳 None，呼叫端改用散落的資源檔案\n
+    \n
+    回傳:\n
+    AssetPack: 封裝檔實例或 None\n
+    """
+    global _asset_pack, _asset_pack_checked
+    if not _asset_pack_checked:
+        _asset_pack_checked = True
+        pack_path = get_asset_pack_path()
+        if ASSET_PACK_CONFIGS["enabled"] and os.path.exists(pack_path):
+            try:
+                _asset_pack = AssetPack(pack_path)
+                print(f"📦 使用資源封裝檔: {ASSET_PACK_CONFIGS['pack_path']}")
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 無法開啟資源封裝檔，改用散落檔案: {e}")
+                _asset_pack = None
+    return _asset_pack
+
+
+######################封裝流程######################
+
+
+def _collect_asset_files():
+    """
+    列出 assets 目錄下所有要封裝的資源檔\n
+    \n
+    回傳:\n
+    list: 相對於專案根目錄、使用 / 分隔的路徑清單\n
+    """
+    asset_files = []
+    assets_root = os.path.join(PROJECT_ROOT, "assets")
+    extensions = tuple(ASSET_PACK_CONFIGS["file_extensions"])
+
+    for directory, _, file_names in os.walk(assets_root):
+        for file_name in sorted(file_names):
+            if file_name.lower().endswith(extensions):
+                full_path = os.path.join(directory, file_name)
+                relative_path = os.path.relpath(full_path, PROJECT_ROOT)
+                asset_files.append(relative_path.replace(os.sep, "/"))
+
+    return sorted(asset_files)
+
+
+def build_asset_pack():
+    """
+    把所有資源檔和預縮放圖片寫入單一封裝檔\n
+    \n
+    回傳:\n
+    dict: 封裝統計 {"files", "baked", "bytes"}\n
+    """
+    blobs = []  # (名稱, 資料, 索引附加資訊)
+
+    # 原始資源檔
+    for relative_path in _collect_asset_files():
+        with open(os.path.join(PROJECT_ROOT, relative_path), "rb") as f:
+            data = f.read()
+        file_format = os.path.splitext(relative_path)[1].lstrip(".").lower()
+        blobs.append((relative_path, data, {"format": file_format}))
+    file_count = len(blobs)
+
+    # 預縮放圖片（原始像素，可直接當作 Surface 緩衝區）
+    source_images = {}
+    for image_path, size, use_alpha in collect_bake_targets():
+        full_path = os.path.join(PROJECT_ROOT, image_path)
+        if not os.path.exists(full_path):
+            continue
+        if image_path not in source_images:
+            source_images[image_path] = pygame.image.load(full_path)
+        raw_image = source_images[image_path]
+        processed_image = pygame.transform.scale(raw_image, size) if size else raw_image
+        pixel_format = "RGBA" if use_alpha else "RGB"
+        blobs.append(
+            (
+                BAKED_PREFIX + make_entry_key(image_path, size, use_alpha),
+                _image_to_bytes(processed_image, pixel_format),
+                {"format": pixel_format, "size": list(processed_image.get_size())},
+            )
+        )
+
+    # 計算索引：索引長度會影響資料起點，所以先用預留位移估算，再反覆修正到穩定
+    def layout(data_start):
+        index = {}
+        offset = data_start
+        for name, data, extra in blobs:
+            offset = (offset + PACK_ALIGNMENT - 1) // PACK_ALIGNMENT * PACK_ALIGNMENT
+            index[name] = dict(extra, offset=offset, length=len(data))
+            offset += len(data)
+        return index
+
+    data_start = PACK_HEADER.size
+    while True:
+        index = layout(data_start)
+        index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+        needed_start = PACK_HEADER.size + len(index_bytes)
+        if needed_start <= data_start:
+            break
+        data_start = needed_start
+
+    pack_path = get_asset_pack_path()
+    temp_path = pack_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(index_bytes)))
+        f.write(index_bytes)
+        for name, data, _ in blobs:
+            f.write(b"\0" * (index[name]["offset"] - f.tell()))
+            f.write(data)
+        total_bytes = f.tell()
+    os.replace(temp_path, pack_path)
+
+    return {
+        "files": file_count,
+        "baked": len(blobs) - file_count,
+        "bytes": total_bytes,
+    }
+
+
+def main():
+    """
+    封裝指令進入點：python -m src.utils.asset_pack\n
+    """
+    print("📦 開始建立資源封裝檔...")
+    stats = build_asset_pack()
+    print(
+        f"✅ 封裝完成：資源檔 {stats['files']} 個、預縮放圖片 {stats['baked']} 項、"
+        f"共 {stats['bytes'] / 1024 / 1024:.1f} MB -> {ASSET_PACK_CONFIGS['pack_path']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+######################載入套件######################
+import pygame
+import os
+import json
+import hashlib
+from src.config import *
+from src.utils.asset_baker import PROJECT_ROOT, _file_sha1
+from src.utils.asset_pack import get_asset_pack, get_asset_pack_path
+
+######################快取格式######################
+
+# 音效快取格式版本（格式改變時遞增，舊快取會自動失效）
+CLIP_FORMAT_VERSION = 1
+
+# mixer 取樣格式 -> numpy 資料型別名稱（用於速度調整）
+_SAMPLE_DTYPES = {8: "uint8", -8: "int8", 16: "uint16", -16: "int16", 32: "float32"}
+
+######################輔助函數######################
+
+
+def _get_sound_cache_paths():
+    """
+    取得音效快取目錄和索引檔路徑\n
+    \n
+    回傳:\n
+    tuple: (音效快取目錄, 索引檔路徑)\n
+    """
+    cache_dir = os.path.join(PROJECT_ROOT, ASSET_CACHE_CONFIGS["cache_dir"])
+    sounds_dir = os.path.join(cache_dir, ASSET_CACHE_CONFIGS["sounds_dir"])
+    manifest_path = os.path.join(sounds_dir, ASSET_CACHE_CONFIGS["manifest_name"])
+    return sounds_dir, manifest_path
+
+
+def make_clip_key(sound_config, mixer_format):
+    """
+    建立音效片段的鍵值（相同來源、片段、速度和 mixer 格式會得到相同鍵值）\n
+    \n
+    參數:\n
+    sound_config (dict): SOUND_CONFIGS 中的音效設定\n
+    mixer_format (tuple): pygame.mixer.get_init() 的回傳值 (頻率, 取樣格式, 聲道數)\n
+    \n
+    回傳:\n
+    str: 片段鍵值，例如 "assets/sounds/電漿槍射擊音效.mp3|0.0-2.0|x2.0|44100,-16,2"\n
+    """
+    if "start_time" in sound_config and "end_time" in sound_config:
+        segment = f"{sound_config['start_time']}-{sound_config['end_time']}"
+    else:
+        segment = "full"
+    speed = sound_config.get("speed_multiplier", 1.0)
+    frequency, sample_size, channels = mixer_format
+    return (
+        f"{sound_config['file_path']}|{segment}|x{speed}|"
+        f"{frequency},{sample_size},{channels}"
+    )
+
+
+######################音效片段快取類別######################
+
+
+class AudioClipCache:
+    """
+    音效片段快取 - 每個來源檔只解碼一次，切好的片段以 PCM 存到磁碟\n
+    \n
+    此類別負責：\n
+    1. 同一個來源檔（例如電漿槍 MP3）只解碼一次\n
+    2. 依 start_time/end_time 從原始 PCM 資料切出片段\n
+    3. 相同片段設定的音效共用同一個 Sound，不重複佔用記憶體\n
+       （共用的 Sound 不能修改音量，各音效的音量由播放的聲道設定）\n
+    4. 把切好的片段存成 PCM 檔，下次啟動直接讀取不需要解碼\n
+    """
+
+    def __init__(self, open_sound_file):
+        """
+        初始化音效片段快取\n
+        \n
+        參數:\n
+        open_sound_file (function): 解碼來源檔的函數，回傳 pygame.mixer.Sound 或 None\n
+        """
+        self.open_sound_file = open_sound_file
+
+        self.clips = {}  # 片段鍵值 -> pygame.mixer.Sound（共用）
+        self.source_sounds = {}  # 來源路徑 -> 解碼後的完整 Sound（預熱完成後釋放）
+        self.manifest = None
+
+        # 統計資料
+        self.decoded_sources = 0
+        self.disk_hits = 0
+
+    def _load_manifest(self):
+        """
+        載入音效快取索引檔\n
+        \n
+        索引檔不存在或版本不符時視為空快取\n
+        """
+        _, manifest_path = _get_sound_cache_paths()
+        self.manifest = {"version": CLIP_FORMAT_VERSION, "clips": {}}
+
+        if not os.path.exists(manifest_path):
+            return
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") == CLIP_FORMAT_VERSION:
+                self.manifest = manifest
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 讀取音效快取索引失敗: {e}")
+
+    def _save_manifest(self):
+        """
+        寫入音效快取索引檔\n
+        """
+        sounds_dir, manifest_path = _get_sound_cache_paths()
+        try:
+            os.makedirs(sounds_dir, exist_ok=True)
+            temp_path = manifest_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, manifest_path)
+        except OSError as e:
+            print(f"⚠️ 寫入音效快取索引失敗: {e}")
+
+    def _get_source_fingerprint(self, file_path):
+        """
+        取得來源檔的指紋（大小和修改時間），用於判斷快取是否過期\n
+        \n
+        參數:\n
+        file_path (str): 來源檔路徑（相對於專案根目錄）\n
+        \n
+        回傳:\n
+        dict: {"size", "mtime_ns"}，來源不存在時回傳 None\n
+        """
+        full_path = os.path.join(PROJECT_ROOT, file_path)
+        if os.path.exists(full_path):
+            stat = os.stat(full_path)
+            return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+        # 只有封裝檔時，以封裝檔本身的修改時間和項目長度判斷
+        asset_pack = get_asset_pack()
+        if asset_pack and asset_pack.has(file_path):
+            stat = os.stat(get_asset_pack_path())
+            return {
+                "size": asset_pack.get_entry(file_path)["length"],
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        return None
+
+    def _is_entry_current(self, entry, file_path):
+        """
+        檢查快取項目的來源檔是否和寫入快取時相同\n
+        \n
+        先比對大小和修改時間，修改時間不符時才計算內容雜湊\n
+        """
+        fingerprint = self._get_source_fingerprint(file_path)
+        if fingerprint is None or fingerprint["size"] != entry["source_size"]:
+            return False
+        if fingerprint["mtime_ns"] == entry["source_mtime_ns"]:
+            return True
+
+        # 修改時間變了（例如重新 checkout），用內容雜湊確認
+        full_path = os.path.join(PROJECT_ROOT, file_path)
+        if entry.get("source_sha1") and os.path.exists(full_path):
+            if _file_sha1(full_path) == entry["source_sha1"]:
+                entry["source_mtime_ns"] = fingerprint["mtime_ns"]
+                return True
+        return False
+
+    def _load_from_disk(self, clip_key, file_path):
+        """
+        從磁碟讀取已切好的 PCM 片段\n
+        \n
+        回傳:\n
+        pygame.mixer.Sound: 片段音效，沒有有效快取時回傳 None\n
+        """
+        if not ASSET_CACHE_CONFIGS["enabled"]:
+            return None
+
+        if self.manifest is None:
+            self._load_manifest()
+
+        entry = self.manifest["clips"].get(clip_key)
+        if not entry or not self._is_entry_current(entry, file_path):
+            return None
+
+        sounds_dir, _ = _get_sound_cache_paths()
+        try:
+            with open(os.path.join(sounds_dir, entry["file"]), "rb") as f:
+                pcm_data = f.read()
+        except OSError:
+            return None
+
+        if len(pcm_data) != entry["length"]:
+            # 快取檔損壞或被截斷，改用即時解碼
+            return None
+
+        self.disk_hits += 1
+        return pygame.mixer.Sound(buffer=pcm_data)
+
+    def _save_to_disk(self, clip_key, file_path, pcm_data):
+        """
+        把切好的 PCM 片段寫入磁碟快取\n
+        """
+        if not ASSET_CACHE_CONFIGS["enabled"]:
+            return
+
+        fingerprint = self._get_source_fingerprint(file_path)
+        if fingerprint is None:
+            return
+
+        sounds_dir, _ = _get_sound_cache_paths()
+        file_name = hashlib.sha1(clip_key.encode("utf-8")).hexdigest() + ".pcm"
+        full_path = os.path.join(PROJECT_ROOT, file_path)
+        source_sha1 = _file_sha1(full_path) if os.path.exists(full_path) else None
+
+        try:
+            os.makedirs(sounds_dir, exist_ok=True)
+            with open(os.path.join(sounds_dir, file_name), "wb") as f:
+                f.write(pcm_data)
+        except OSError as e:
+            print(f"⚠️ 寫入音效快取失敗: {e}")
+            return
+
+        if self.manifest is None:
+            self._load_manifest()
+        self.manifest["clips"][clip_key] = {
+            "file": file_name,
+            "length": len(pcm_data),
+            "source_size": fingerprint["size"],
+            "source_mtime_ns": fingerprint["mtime_ns"],
+            "source_sha1": source_sha1,
+        }
+        self._save_manifest()
+
+    def _get_source_sound(self, file_path):
+        """
+        取得解碼後的完整來源音效（每個來源檔只解碼一次）\n
+        """
+        if file_path not in self.source_sounds:
+            sound = self.open_sound_file(file_path)
+            if sound is None:
+                return None
+            self.source_sounds[file_path] = sound
+            self.decoded_sources += 1
+        return self.source_sounds[file_path]
+
+    def _build_clip_data(self, sound_config, mixer_format):
+        """
+        從解碼後的來源資料切出片段並調整速度\n
+        \n
+        回傳:\n
+        bytes: 片段的 PCM 資料，來源無法解碼時回傳 None\n
+        """
+        source_sound = self._get_source_sound(sound_config["file_path"])
+        if source_sound is None:
+            return None
+
+        frequency, sample_size, channels = mixer_format
+        frame_bytes = abs(sample_size) // 8 * channels
+        pcm_data = source_sound.get_raw()
+
+        # 依 mixer 實際的取樣率計算切割位置
+        if "start_time" in sound_config and "end_time" in sound_config:
+            start_frame = max(0, int(sound_config["start_time"] * frequency))
+            end_frame = int(sound_config["end_time"] * frequency)
+            pcm_data = pcm_data[start_frame * frame_bytes : end_frame * frame_bytes]
+
+        speed_multiplier = sound_config.get("speed_multiplier", 1.0)
+        if speed_multiplier != 1.0:
+            try:
+                import numpy as np
+
+                # 每個聲道分別重新取樣（速度快2倍，長度變一半）
+                dtype = np.dtype(_SAMPLE_DTYPES[sample_size])
+                samples = np.frombuffer(pcm_data, dtype=dtype).reshape(-1, channels)
+                new_length = int(len(samples) / speed_multiplier)
+                indices = np.arange(new_length) * (len(samples) / max(1, new_length))
+                positions = np.arange(len(samples))
+                resampled = np.column_stack(
+                    [
+                        np.interp(indices, positions, samples[:, channel])
+                        for channel in range(channels)
+                    ]
+                )
+                pcm_data = resampled.astype(dtype).tobytes()
+            except ImportError:
+                print("⚠️ numpy 未安裝，無法調整音效速度，使用原始速度")
+            except (KeyError, ValueError) as e:
+                print(f"⚠️ 調整音效速度失敗，使用原始速度: {e}")
+
+        return pcm_data
+
+    def get_clip(self, sound_config):
+        """
+        取得音效設定對應的片段（記憶體 -> 磁碟快取 -> 解碼切割）\n
+        \n
+        參數:\n
+        sound_config (dict): SOUND_CONFIGS 中的音效設定\n
+        \n
+        回傳:\n
+        pygame.mixer.Sound: 片段音效（相同片段共用同一個物件），失敗時回傳 None\n
+        """
+        mixer_format = pygame.mixer.get_init()
+        clip_key = make_clip_key(sound_config, mixer_format)
+        if clip_key in self.clips:
+            return self.clips[clip_key]
+
+        file_path = sound_config["file_path"]
+        sound = self._load_from_disk(clip_key, file_path)
+        if sound is None:
+            pcm_data = self._build_clip_data(sound_config, mixer_format)
+            if pcm_data is None:
+                return None
+            self._save_to_disk(clip_key, file_path, pcm_data)
+            sound = pygame.mixer.Sound(buffer=pcm_data)
+
+        self.clips[clip_key] = sound
+        return sound
+
+    def release_sources(self):
+        """
+        釋放解碼後的完整來源資料（片段都已切好後呼叫）\n
+        """
+        self.source_sounds.clear()
+
+    def get_stats(self):
+        """
+        取得快取統計資料\n
+        \n
+        回傳:\n
+        dict: 片段數量、解碼次數、磁碟命中次數和片段佔用的位元組數\n
+        """
+        clip_bytes = 0
+        mixer_format = pygame.mixer.get_init()
+        if mixer_format:
+            frequency, sample_size, channels = mixer_format
+            frame_bytes = abs(sample_size) // 8 * channels
+            clip_bytes = sum(
+                int(sound.get_length() * frequency) * frame_bytes
+                for sound in self.clips.values()
+            )
+
+        return {
+            "clips": len(self.clips),
+            "decoded_sources": self.decoded_sources,
+            "disk_hits": self.disk_hits,
+            "clip_bytes": clip_bytes,
+        }
@@ -1,7 +1,13 @@
 ######################載入套件######################
 import pygame
 import os
-from src.config import FONT_CONFIGS
+import sys
+import json
+from src.config import FONT_CONFIGS, ASSET_CACHE_CONFIGS
+from src.utils.startup_profiler import startup_profiler
+
+# 字體偵測快取格式版本
+FONT_CACHE_VERSION = 1
 
 ######################字體管理系統######################
 
@@ -26,49 +32,187 @@ class FontManager:
         # 字體快取
         self._font_cache = {}
 
-        # 尋找可用的中文字體
+        # 字體偵測結果（字體檔路徑和系統字體數量）
+        self.chinese_font_path = None
+        self.system_font_count = None
+
+        # 尋找可用的中文字體（優先使用磁碟上的偵測快取）
         self.chinese_font_name = self._find_chinese_font()
 
-        # 載入所有常用字體大小
+        # 只預載入啟動畫面需要的字體大小，其餘按需建立
         self._preload_fonts()
 
+    def _get_discovery_cache_path(self):
+        """
+        取得字體偵測快取檔路徑\n
+        \n
+        回傳:\n
+        str: 快取檔完整路徑\n
+        """
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        return os.path.join(
+            project_root,
+            ASSET_CACHE_CONFIGS["cache_dir"],
+            FONT_CONFIGS["discovery_cache"],
+        )
+
+    def _get_font_config_fingerprint(self):
+        """
+        取得系統字體設定的指紋（用來判斷偵測快取是否失效）\n
+        \n
+        Linux 使用 fontconfig 快取目錄的修改時間，安裝或移除字體後執行\n
+        fc-cache 就會改變；Windows 和 macOS 使用字體目錄的修改時間\n
+        \n
+        回傳:\n
+        list: [目錄, 修改時間] 清單\n
+        """
+        home = os.path.expanduser("~")
+        if sys.platform.startswith("win"):
+            windows_dir = os.environ.get("WINDIR", "C:\\Windows")
+            local_app_data = os.environ.get("LOCALAPPDATA", "")
+            font_dirs = [
+                os.path.join(windows_dir, "Fonts"),
+                os.path.join(local_app_data, "Microsoft", "Windows", "Fonts"),
+            ]
+        elif sys.platform == "darwin":
+            font_dirs = [
+                "/System/Library/Fonts",
+                "/Library/Fonts",
+                os.path.join(home, "Library", "Fonts"),
+            ]
+        else:
+            xdg_cache = os.environ.get("XDG_CACHE_HOME", os.path.join(home, ".cache"))
+            font_dirs = [
+                os.path.join(xdg_cache, "fontconfig"),
+                "/var/cache/fontconfig",
+                "/usr/lib/fontconfig/cache",
+                "/usr/local/var/cache/fontconfig",
+            ]
+
+        fingerprint = []
+        for font_dir in font_dirs:
+            try:
+                fingerprint.append([font_dir, os.stat(font_dir).st_mtime_ns])
+            except OSError:
+                continue
+        return fingerprint
+
+    def _load_discovery_cache(self, fingerprint):
+        """
+        讀取字體偵測快取\n
+        \n
+        參數:\n
+        fingerprint (list): 目前的系統字體設定指紋\n
+        \n
+        回傳:\n
+        dict: 有效的快取內容，失效或不存在時回傳 None\n
+        """
+        cache_path = self._get_discovery_cache_path()
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # 快取版本、候選字體清單或系統字體設定改變時都要重新偵測
+        if (
+            cache.get("version") != FONT_CACHE_VERSION
+            or cache.get("candidates") != FONT_CONFIGS["chinese_fonts"]
+            or cache.get("fingerprint") != fingerprint
+        ):
+            return None
+
+        # 字體檔被移除時也要重新偵測
+        resolved_path = cache.get("resolved_path")
+        if resolved_path and not os.path.exists(resolved_path):
+            return None
+
+        return cache
+
+    def _save_discovery_cache(self, cache):
+        """
+        儲存字體偵測結果到磁碟\n
+        \n
+        參數:\n
+        cache (dict): 要儲存的偵測結果\n
+        """
+        cache_path = self._get_discovery_cache_path()
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = cache_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"⚠️ 無法儲存字體偵測快取: {e}")
+
     def _find_chinese_font(self):
         """
         尋找系統中可用的中文字體\n
         \n
+        偵測系統字體需要走訪 fontconfig，是啟動時最耗時的步驟，\n
+        所以偵測結果會快取到磁碟，系統字體設定沒變時直接使用\n
+        \n
         回傳:\n
         str: 可用的中文字體名稱，如果都找不到則回傳None\n
         """
+        fingerprint = self._get_font_config_fingerprint()
+        cache = self._load_discovery_cache(fingerprint)
+        if cache:
+            self.chinese_font_path = cache["resolved_path"]
+            self.system_font_count = cache["system_font_count"]
+            if cache["resolved_name"]:
+                print(f"✅ 使用快取的中文字體: {cache['resolved_name']}")
+            else:
+                print("⚠️ 未找到指定的中文字體，使用系統預設字體")
+            return cache["resolved_name"]
+
         # 獲取系統字體列表
         system_fonts = pygame.font.get_fonts()
+        self.system_font_count = len(system_fonts)
 
-        # 嘗試尋找指定的中文字體
+        # 依序探測每個候選字體的字體檔
+        probes = {}
+        resolved_name = None
         for font_name in FONT_CONFIGS["chinese_fonts"]:
-            # 將字體名稱轉換為pygame格式（小寫，空格替換為底線）
-            pygame_font_name = font_name.lower().replace(" ", "")
+            try:
+                font_path = pygame.font.match_font(font_name)
+            except Exception:
+                font_path = None
+            probes[font_name] = font_path
 
-            # 檢查是否在系統字體列表中
-            if pygame_font_name in system_fonts:
+            if font_path and resolved_name is None:
+                resolved_name = font_name
+                self.chinese_font_path = font_path
                 print(f"✅ 找到中文字體: {font_name}")
-                return font_name
 
-            # 嘗試直接載入字體（Windows系統）
-            try:
-                test_font = pygame.font.SysFont(font_name, 24)
-                if test_font:
-                    print(f"✅ 成功載入中文字體: {font_name}")
-                    return font_name
-            except:
-                continue
+        if resolved_name is None:
+            print("⚠️ 未找到指定的中文字體，使用系統預設字體")
 
-        print("⚠️ 未找到指定的中文字體，使用系統預設字體")
-        return None
+        self._save_discovery_cache(
+            {
+                "version": FONT_CACHE_VERSION,
+                "candidates": FONT_CONFIGS["chinese_fonts"],
+                "fingerprint": fingerprint,
+                "probes": probes,
+                "resolved_name": resolved_name,
+                "resolved_path": self.chinese_font_path,
+                "system_font_count": self.system_font_count,
+            }
+        )
+        return resolved_name
 
     def _preload_fonts(self):
         """
         預載入常用字體大小到快取中\n
+        \n
+        只建立 FONT_CONFIGS["preload_sizes"] 列出的大小，其他大小在第一次使用時才建立\n
         """
-        for size_name, size_value in FONT_CONFIGS["sizes"].items():
+        for size_name in FONT_CONFIGS["preload_sizes"]:
+            size_value = FONT_CONFIGS["sizes"][size_name]
             font_key = f"{size_name}_{size_value}"
             self._font_cache[font_key] = self._create_font(size_value)
 
@@ -83,7 +227,10 @@ class FontManager:
         pygame.font.Font: 字體物件\n
         """
         try:
-            if self.chinese_font_name:
+            if self.chinese_font_path:
+                # 直接用字體檔建立，不需要再查詢系統字體表
+                return pygame.font.Font(self.chinese_font_path, size)
+            elif self.chinese_font_name:
                 # 使用找到的中文字體
                 return pygame.font.SysFont(self.chinese_font_name, size)
             else:
@@ -170,11 +317,13 @@ class FontManager:
         """
         return {
             "current_chinese_font": self.chinese_font_name,
-            "available_system_fonts_count": len(pygame.font.get_fonts()),
+            "current_chinese_font_path": self.chinese_font_path,
+            "available_system_fonts_count": self.system_font_count,
             "cached_fonts_count": len(self._font_cache),
             "font_configs": FONT_CONFIGS,
         }
 
 
 # 全域字體管理器實例
-font_manager = FontManager()
+with startup_profiler.section("FontManager"):
+    font_manager = FontManager()
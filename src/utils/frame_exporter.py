@@ -0,0 +1,223 @@
+######################載入套件######################
+import pygame
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from src.config import *
+
+######################畫面輸出系統######################
+
+# 原始影格的像素格式（依記憶體中的位元組順序，例如 "bgr0"，可以直接交給 ffmpeg）
+CHANNEL_NAMES = ("r", "g", "b", "a")
+
+
+def get_pixel_format(surface):
+    """
+    取得畫面在記憶體中的像素格式名稱\n
+    \n
+    參數:\n
+    surface (pygame.Surface): 32 位元的畫面\n
+    \n
+    回傳:\n
+    str: 每個位元組對應的色版（沒有使用的位元組以 "0" 表示）\n
+    """
+    channels = []
+    for byte_index in range(surface.get_bytesize()):
+        shift = byte_index * 8
+        name = "0"
+        for channel, mask, channel_shift in zip(
+            CHANNEL_NAMES, surface.get_masks(), surface.get_shifts()
+        ):
+            if mask and channel_shift == shift:
+                name = channel
+        channels.append(name)
+    if sys.byteorder == "big":
+        channels.reverse()
+    return "".join(channels)
+
+
+class FrameExporter:
+    """
+    畫面輸出系統 - 在背景執行緒把畫面寫成 PNG 序列或原始影格檔\n
+    \n
+    此系統負責：\n
+    1. 準備固定數量的離屏畫面，主執行緒輪流取用來繪製每一幀\n
+    2. 繪製好的畫面放進有上限的佇列，背景執行緒直接讀取畫面的像素緩衝區寫檔（不複製）\n
+    3. 寫完的畫面放回可用的畫面池；寫檔跟不上時主執行緒等待，記憶體用量固定\n
+    \n
+    使用方式:\n
+    exporter = FrameExporter("exports/clip", "png", (800, 600))\n
+    exporter.start()\n
+    surface = exporter.acquire_surface()  # 繪製到這個畫面\n
+    exporter.submit(surface)\n
+    exporter.close()\n
+    """
+
+    def __init__(self, output_dir, image_format=None, size=None, queue_size=None):
+        """
+        初始化畫面輸出系統\n
+        \n
+        參數:\n
+        output_dir (str): 輸出資料夾\n
+        image_format (str): "png" 或 "raw"，None 時使用 EXPORT_CONFIGS 的設定\n
+        size (tuple): 畫面大小，None 時使用遊戲視窗大小\n
+        queue_size (int): 畫面緩衝區數量，None 時使用 EXPORT_CONFIGS 的設定\n
+        """
+        self.output_dir = output_dir
+        self.image_format = image_format or EXPORT_CONFIGS["image_format"]
+        if self.image_format not in ("png", "raw"):
+            raise ValueError(f"不支援的輸出格式: {self.image_format}")
+        self.size = size or (SCREEN_WIDTH, SCREEN_HEIGHT)
+        queue_size = queue_size or EXPORT_CONFIGS["queue_size"]
+
+        # 畫面池：可用的畫面和等待寫入的畫面（數量固定，佇列滿時主執行緒等待）
+        self.free_surfaces = queue.Queue()
+        self.pending_frames = queue.Queue(maxsize=queue_size)
+        for _ in range(queue_size):
+            self.free_surfaces.put(pygame.Surface(self.size, 0, 32))
+
+        self.writer_thread = None
+        self.raw_file = None
+        self.writer_error = None
+        self.frame_index = 0
+
+        # 統計資料
+        self.frames_written = 0
+        self.wait_time = 0.0  # 主執行緒等待可用畫面的時間（秒）
+        self.start_time = 0.0
+
+    def start(self):
+        """
+        建立輸出資料夾並啟動背景寫檔執行緒\n
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.image_format == "raw":
+            self.raw_file = open(os.path.join(self.output_dir, "frames.raw"), "wb")
+
+        self.start_time = time.perf_counter()
+        self.writer_thread = threading.Thread(
+            target=self._writer_loop, name="FrameExporter", daemon=True
+        )
+        self.writer_thread.start()
+
+    def acquire_surface(self):
+        """
+        取得一個可以繪製的畫面（寫檔跟不上時等待）\n
+        \n
+        回傳:\n
+        pygame.Surface: 離屏畫面\n
+        """
+        wait_start = time.perf_counter()
+        surface = self.free_surfaces.get()
+        self.wait_time += time.perf_counter() - wait_start
+        return surface
+
+    def submit(self, surface):
+        """
+        把繪製好的畫面交給背景執行緒寫檔\n
+        \n
+        參數:\n
+        surface (pygame.Surface): acquire_surface() 取得的畫面\n
+        \n
+        例外:\n
+        OSError: 背景執行緒寫檔失敗\n
+        """
+        if self.writer_error is not None:
+            raise self.writer_error
+        self.pending_frames.put((self.frame_index, surface))
+        self.frame_index += 1
+
+    def _writer_loop(self):
+        """
+        背景執行緒：依序寫入等待中的畫面，寫完放回畫面池\n
+        """
+        while True:
+            item = self.pending_frames.get()
+            if item is None:
+                break
+            frame_index, surface = item
+            try:
+                if self.writer_error is None:
+                    self._write_frame(frame_index, surface)
+                    self.frames_written += 1
+            except (OSError, pygame.error) as e:
+                self.writer_error = OSError(f"無法寫入影格 {frame_index}: {e}")
+            self.free_surfaces.put(surface)
+
+    def _write_frame(self, frame_index, surface):
+        """
+        寫入一個畫面\n
+        \n
+        參數:\n
+        frame_index (int): 影格編號\n
+        surface (pygame.Surface): 畫面\n
+        """
+        if self.image_format == "raw":
+            # 直接寫入畫面的像素緩衝區（寫完釋放緩衝區，解除畫面鎖定）
+            pixel_buffer = surface.get_buffer()
+            self.raw_file.write(pixel_buffer)
+            del pixel_buffer
+        else:
+            file_path = os.path.join(self.output_dir, f"frame_{frame_index:06d}.png")
+            pygame.image.save(surface, file_path)
+
+    def close(self, fps=FPS):
+        """
+        等待所有畫面寫完，關閉檔案並寫入說明檔\n
+        \n
+        參數:\n
+        fps (int): 影格的播放速度（寫入說明檔）\n
+        \n
+        回傳:\n
+        dict: 輸出統計資料\n
+        """
+        if self.writer_thread is not None:
+            self.pending_frames.put(None)
+            self.writer_thread.join()
+            self.writer_thread = None
+
+        sample_surface = self.free_surfaces.queue[0]
+        metadata = {
+            "format": self.image_format,
+            "width": self.size[0],
+            "height": self.size[1],
+            "fps": fps,
+            "frame_count": self.frames_written,
+        }
+        if self.raw_file is not None:
+            self.raw_file.close()
+            self.raw_file = None
+            metadata["pitch"] = sample_surface.get_pitch()
+            metadata["pixel_format"] = get_pixel_format(sample_surface)
+
+        try:
+            with open(
+                os.path.join(self.output_dir, "frames.json"), "w", encoding="utf-8"
+            ) as file:
+                json.dump(metadata, file, indent=2)
+        except OSError as e:
+            print(f"⚠️ 無法寫入影格說明檔: {e}")
+
+        stats = self.get_stats()
+        if self.writer_error is not None:
+            print(f"⚠️ {self.writer_error}")
+        return stats
+
+    def get_stats(self):
+        """
+        取得輸出統計資料\n
+        \n
+        回傳:\n
+        dict: 寫入的影格數、耗時、主執行緒等待的時間\n
+        """
+        elapsed = time.perf_counter() - self.start_time
+        return {
+            "frames_written": self.frames_written,
+            "elapsed_s": elapsed,
+            "fps": self.frames_written / elapsed if elapsed > 0 else 0,
+            "wait_s": self.wait_time,
+            "error": str(self.writer_error) if self.writer_error else None,
+        }
@@ -0,0 +1,167 @@
+######################載入套件######################
+from collections import OrderedDict
+
+######################圖片快取類別######################
+
+
+class ImageCache:
+    """
+    圖片快取 - 以位元組計量的 LRU 快取\n
+    \n
+    此類別負責：\n
+    1. 依最近使用順序保存處理好的 Surface\n
+    2. 超過記憶體預算時淘汰最久未使用的項目\n
+    3. 固定（pin）對戰中使用的圖片，避免被淘汰\n
+    4. 統計命中、未命中、淘汰次數和常駐位元組數\n
+    """
+
+    def __init__(self, budget_bytes):
+        """
+        初始化圖片快取\n
+        \n
+        參數:\n
+        budget_bytes (int): 快取記憶體預算（位元組）\n
+        """
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # cache_key -> (surface, 位元組數)
+        self._pinned_keys = set()
+
+        # 統計資料
+        self.bytes_resident = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _surface_bytes(surface):
+        """
+        計算 Surface 佔用的像素記憶體\n
+        \n
+        參數:\n
+        surface (pygame.Surface): 圖片\n
+        \n
+        回傳:\n
+        int: 位元組數\n
+        """
+        return surface.get_pitch() * surface.get_height()
+
+    def __contains__(self, cache_key):
+        """
+        檢查快取中是否有指定項目（不影響統計和使用順序）\n
+        """
+        return cache_key in self._entries
+
+    def __len__(self):
+        """
+        取得快取項目數量\n
+        """
+        return len(self._entries)
+
+    def get(self, cache_key):
+        """
+        取得快取的圖片並標記為最近使用\n
+        \n
+        參數:\n
+        cache_key (str): 快取鍵值\n
+        \n
+        回傳:\n
+        pygame.Surface: 快取的圖片，沒有時回傳 None\n
+        """
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(cache_key)
+        return entry[0]
+
+    def put(self, cache_key, surface):
+        """
+        加入圖片到快取，必要時淘汰舊項目\n
+        \n
+        參數:\n
+        cache_key (str): 快取鍵值\n
+        surface (pygame.Surface): 要快取的圖片\n
+        """
+        old_entry = self._entries.pop(cache_key, None)
+        if old_entry is not None:
+            self.bytes_resident -= old_entry[1]
+
+        surface_bytes = self._surface_bytes(surface)
+        self._entries[cache_key] = (surface, surface_bytes)
+        self.bytes_resident += surface_bytes
+        self._evict_to_budget()
+
+    def _evict_to_budget(self):
+        """
+        從最久未使用的項目開始淘汰，直到回到預算內\n
+        \n
+        被固定的項目會被跳過，所以固定的圖片太多時可能暫時超出預算\n
+        """
+        if self.bytes_resident <= self.budget_bytes:
+            return
+
+        for cache_key in list(self._entries.keys()):
+            if self.bytes_resident <= self.budget_bytes:
+                break
+            if cache_key in self._pinned_keys:
+                continue
+            _, surface_bytes = self._entries.pop(cache_key)
+            self.bytes_resident -= surface_bytes
+            self.evictions += 1
+
+    def pin(self, cache_key):
+        """
+        固定快取項目，使其不會被淘汰\n
+        \n
+        參數:\n
+        cache_key (str): 快取鍵值\n
+        """
+        self._pinned_keys.add(cache_key)
+
+    def unpin_all(self):
+        """
+        解除所有固定，並重新套用記憶體預算\n
+        """
+        self._pinned_keys.clear()
+        self._evict_to_budget()
+
+    def set_budget(self, budget_bytes):
+        """
+        調整記憶體預算\n
+        \n
+        參數:\n
+        budget_bytes (int): 新的預算（位元組）\n
+        """
+        self.budget_bytes = budget_bytes
+        self._evict_to_budget()
+
+    def clear(self):
+        """
+        清除所有快取項目（統計資料保留）\n
+        """
+        self._entries.clear()
+        self._pinned_keys.clear()
+        self.bytes_resident = 0
+
+    def get_stats(self):
+        """
+        取得快取統計資料（供遙測使用）\n
+        \n
+        回傳:\n
+        dict: 命中、未命中、淘汰、常駐位元組等統計\n
+        """
+        pinned_bytes = sum(
+            self._entries[key][1] for key in self._pinned_keys if key in self._entries
+        )
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes_resident": self.bytes_resident,
+            "bytes_pinned": pinned_bytes,
+            "budget_bytes": self.budget_bytes,
+            "entries": len(self._entries),
+            "pinned_entries": len(self._pinned_keys),
+        }
@@ -2,6 +2,9 @@
 import pygame
 import os
 from src.config import *
+from src.utils.asset_baker import baked_image_cache, make_entry_key, PROJECT_ROOT
+from src.utils.asset_pack import get_asset_pack
+from src.utils.image_cache import ImageCache
 
 ######################圖片管理類別######################
 
@@ -42,12 +45,116 @@ class ImageManager:
             return
 
         self._initialized = True
-        self.image_cache = {}  # 圖片快取
+        # 圖片快取（以位元組計量的 LRU，超過預算時淘汰最久未使用的圖片）
+        self.image_cache = ImageCache(
+            int(IMAGE_CACHE_CONFIGS["memory_budget_mb"] * 1024 * 1024)
+        )
         self.character_images = {}  # 角色圖片快取
         self.weapon_images = {}  # 武器圖片快取
 
         # 不在初始化時預載入圖片，改為延遲載入
 
+    def _character_cache_key(self, character_type, size, for_selection):
+        """
+        建立角色圖片的快取鍵值\n
+        """
+        usage = "selection" if for_selection else "game"
+        return f"{character_type}_{size[0]}x{size[1]}_{usage}"
+
+    def _weapon_cache_key(self, weapon_type, size):
+        """
+        建立武器圖片的快取鍵值\n
+        """
+        return f"weapon_{weapon_type}_{size[0]}x{size[1]}"
+
+    def _scene_cache_key(self, scene_key, screen_size):
+        """
+        建立場景背景的快取鍵值\n
+        """
+        return f"scene_{scene_key}_{screen_size[0]}x{screen_size[1]}"
+
+    def _generic_cache_key(self, image_path, size):
+        """
+        建立通用圖片的快取鍵值\n
+        """
+        size_key = f"{size[0]}x{size[1]}" if size else "original"
+        return f"generic_{image_path}_{size_key}"
+
+    def _get_full_path(self, image_path):
+        """
+        取得圖片的完整路徑\n
+        \n
+        參數:\n
+        image_path (str): 圖片路徑（相對於專案根目錄）\n
+        \n
+        回傳:\n
+        str: 完整檔案路徑\n
+        """
+        return os.path.join(PROJECT_ROOT, image_path)
+
+    def _load_scaled_image(self, image_path, size, use_alpha=True):
+        """
+        載入並縮放圖片（優先讀取烘焙快取）\n
+        \n
+        有有效的烘焙快取時直接使用預縮放的像素資料，\n
+        否則才解碼原始圖片並即時縮放\n
+        \n
+        參數:\n
+        image_path (str): 圖片路徑（相對於專案根目錄）\n
+        size (tuple): 目標尺寸 (width, height)，None 表示保持原尺寸\n
+        use_alpha (bool): 是否保留透明通道\n
+        \n
+        回傳:\n
+        pygame.Surface: 處理後的圖片，檔案不存在時回傳 None\n
+        """
+        asset_pack = get_asset_pack()
+
+        # 封裝檔中的預縮放圖片（直接引用 mmap 資料，轉換格式時才複製）
+        if asset_pack:
+            baked_image = asset_pack.load_baked_image(
+                make_entry_key(image_path, size, use_alpha)
+            )
+            if baked_image is not None:
+                return self._to_display_format(baked_image, use_alpha, copy=True)
+
+        baked_image = baked_image_cache.load(image_path, size, use_alpha)
+        if baked_image is not None:
+            return baked_image
+
+        if asset_pack and asset_pack.has(image_path):
+            # 從封裝檔解碼，不需要另外開檔
+            raw_image = asset_pack.load_image(image_path)
+        else:
+            full_path = self._get_full_path(image_path)
+            if not os.path.exists(full_path):
+                return None
+            raw_image = pygame.image.load(full_path)
+
+        raw_image = self._to_display_format(raw_image, use_alpha)
+
+        if size:
+            return pygame.transform.scale(raw_image, size)
+        return raw_image
+
+    def _to_display_format(self, surface, use_alpha, copy=False):
+        """
+        把圖片轉換成顯示格式以加快繪製\n
+        \n
+        參數:\n
+        surface (pygame.Surface): 原始圖片\n
+        use_alpha (bool): 是否保留透明通道\n
+        copy (bool): 顯示未初始化時是否複製一份（來源引用外部緩衝區時使用）\n
+        \n
+        回傳:\n
+        pygame.Surface: 轉換後的圖片\n
+        """
+        # 檢查 pygame 顯示是否已初始化
+        try:
+            return surface.convert_alpha() if use_alpha else surface.convert()
+        except pygame.error:
+            # 如果顯示未初始化，保持原格式
+            return surface.copy() if copy else surface
+
     def _preload_character_images(self):
         """
         預載入所有角色圖片\n
@@ -81,11 +188,12 @@ class ImageManager:
         pygame.Surface: 處理後的角色圖片，如果載入失敗則返回幾何形狀\n
         """
         # 建立快取鍵值
-        cache_key = f"{character_type}_{size[0]}x{size[1]}_{'selection' if for_selection else 'game'}"
+        cache_key = self._character_cache_key(character_type, size, for_selection)
 
         # 檢查快取
-        if cache_key in self.image_cache:
-            return self.image_cache[cache_key]
+        cached_image = self.image_cache.get(cache_key)
+        if cached_image is not None:
+            return cached_image
 
         character_config = CHARACTER_CONFIGS.get(character_type)
         if not character_config or "image_path" not in character_config:
@@ -95,33 +203,16 @@ class ImageManager:
         image_path = character_config["image_path"]
 
         try:
-            # 嘗試載入圖片
-            full_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))), image_path
-            )
-
-            if not os.path.exists(full_path):
-                print(f"圖片檔案不存在: {full_path}")
-                return self._create_fallback_image(character_config, size)
+            # 載入並縮放圖片（直接使用縮放後的圖片，不再套用圓形遮罩）
+            processed_image = self._load_scaled_image(image_path, size)
 
-            # 載入並處理圖片
-            raw_image = pygame.image.load(full_path)
-
-            # 檢查 pygame 顯示是否已初始化
-            try:
-                raw_image = raw_image.convert_alpha()
-            except pygame.error:
-                # 如果顯示未初始化，只使用 convert()
-                raw_image = raw_image.convert()
-
-            # 縮放圖片
-            scaled_image = pygame.transform.scale(raw_image, size)
-
-            # 直接使用縮放後的圖片，不再套用圓形遮罩
-            processed_image = scaled_image
+            if processed_image is None:
+                print(f"圖片檔案不存在: {self._get_full_path(image_path)}")
+                # 備用圖片也要快取，避免每幀重新解碼
+                processed_image = self._create_fallback_image(character_config, size)
 
             # 快取處理後的圖片
-            self.image_cache[cache_key] = processed_image
+            self.image_cache.put(cache_key, processed_image)
             return processed_image
 
         except pygame.error as e:
@@ -172,26 +263,14 @@ class ImageManager:
         if fallback_path:
             try:
                 # 嘗試載入配置中指定的備用圖片
-                full_path = os.path.join(
-                    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                    fallback_path,
-                )
+                print(f"🔄 載入配置的備用圖片: {fallback_path}")
+                scaled_image = self._load_scaled_image(fallback_path, size)
 
-                if not os.path.exists(full_path):
-                    print(f"🔄 配置的備用圖片檔案不存在: {full_path}")
+                if scaled_image is None:
+                    print(
+                        f"🔄 配置的備用圖片檔案不存在: {self._get_full_path(fallback_path)}"
+                    )
                 else:
-                    print(f"🔄 載入配置的備用圖片: {fallback_path}")
-                    raw_image = pygame.image.load(full_path)
-
-                    # 檢查 pygame 顯示是否已初始化
-                    try:
-                        raw_image = raw_image.convert_alpha()
-                    except pygame.error:
-                        raw_image = raw_image.convert()
-
-                    # 縮放圖片
-                    scaled_image = pygame.transform.scale(raw_image, size)
-
                     print(f"✅ 成功載入配置的備用圖片: {fallback_path}")
                     return scaled_image
 
@@ -221,27 +300,14 @@ class ImageManager:
 
         try:
             # 嘗試載入預設備用圖片
-            full_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                default_fallback_path,
-            )
+            scaled_image = self._load_scaled_image(default_fallback_path, size)
 
-            if not os.path.exists(full_path):
-                print(f"🔄 預設備用圖片檔案不存在: {full_path}")
+            if scaled_image is None:
+                print(
+                    f"🔄 預設備用圖片檔案不存在: {self._get_full_path(default_fallback_path)}"
+                )
                 return None
 
-            print(f"🔄 載入預設備用圖片: {default_fallback_path}")
-            raw_image = pygame.image.load(full_path)
-
-            # 檢查 pygame 顯示是否已初始化
-            try:
-                raw_image = raw_image.convert_alpha()
-            except pygame.error:
-                raw_image = raw_image.convert()
-
-            # 縮放圖片
-            scaled_image = pygame.transform.scale(raw_image, size)
-
             print(f"✅ 成功載入預設備用圖片: {default_fallback_path}")
             return scaled_image
 
@@ -319,11 +385,12 @@ class ImageManager:
         pygame.Surface: 處理後的武器圖片，如果載入失敗則返回預設圖示\n
         """
         # 建立快取鍵值
-        cache_key = f"weapon_{weapon_type}_{size[0]}x{size[1]}"
+        cache_key = self._weapon_cache_key(weapon_type, size)
 
         # 檢查快取
-        if cache_key in self.image_cache:
-            return self.image_cache[cache_key]
+        cached_image = self.image_cache.get(cache_key)
+        if cached_image is not None:
+            return cached_image
 
         weapon_config = WEAPON_CONFIGS.get(weapon_type)
         if not weapon_config or "image_path" not in weapon_config:
@@ -333,31 +400,15 @@ class ImageManager:
         image_path = weapon_config["image_path"]
 
         try:
-            # 嘗試載入圖片 - 修正路徑計算
-            # __file__ 位於 src/utils/image_manager.py
-            # 需要回到專案根目錄：src/utils -> src -> 專案根目錄
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            full_path = os.path.join(project_root, image_path)
+            # 載入並縮放圖片
+            scaled_image = self._load_scaled_image(image_path, size)
 
-            if not os.path.exists(full_path):
-                print(f"武器圖片檔案不存在: {full_path}")
+            if scaled_image is None:
+                print(f"武器圖片檔案不存在: {self._get_full_path(image_path)}")
                 return self._create_weapon_fallback_image(weapon_type, size)
 
-            # 載入並處理圖片
-            raw_image = pygame.image.load(full_path)
-
-            # 檢查 pygame 顯示是否已初始化
-            try:
-                raw_image = raw_image.convert_alpha()
-            except pygame.error:
-                # 如果顯示未初始化，只使用 convert()
-                raw_image = raw_image.convert()
-
-            # 縮放圖片
-            scaled_image = pygame.transform.scale(raw_image, size)
-
             # 快取處理後的圖片
-            self.image_cache[cache_key] = scaled_image
+            self.image_cache.put(cache_key, scaled_image)
             print(f"✅ 成功載入武器圖片: {weapon_type} - {image_path}")
             return scaled_image
 
@@ -539,11 +590,12 @@ class ImageManager:
         pygame.Surface: 場景背景圖片，如果載入失敗則返回 None\n
         """
         # 建立快取鍵值
-        cache_key = f"scene_{scene_key}_{screen_size[0]}x{screen_size[1]}"
+        cache_key = self._scene_cache_key(scene_key, screen_size)
 
         # 檢查快取
-        if cache_key in self.image_cache:
-            return self.image_cache[cache_key]
+        cached_image = self.image_cache.get(cache_key)
+        if cached_image is not None:
+            return cached_image
 
         scene_config = SCENE_CONFIGS.get(scene_key)
         if not scene_config or "background_image" not in scene_config:
@@ -553,30 +605,17 @@ class ImageManager:
         image_path = scene_config["background_image"]
 
         try:
-            # 嘗試載入圖片
-            full_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))), image_path
+            # 載入並縮放圖片到螢幕尺寸（背景不需要透明通道）
+            scaled_image = self._load_scaled_image(
+                image_path, screen_size, use_alpha=False
             )
 
-            if not os.path.exists(full_path):
-                print(f"場景背景圖片檔案不存在: {full_path}")
+            if scaled_image is None:
+                print(f"場景背景圖片檔案不存在: {self._get_full_path(image_path)}")
                 return None
 
-            # 載入並處理圖片
-            raw_image = pygame.image.load(full_path)
-
-            # 檢查 pygame 顯示是否已初始化
-            try:
-                raw_image = raw_image.convert()
-            except pygame.error:
-                # 如果顯示未初始化，保持原格式
-                pass
-
-            # 縮放圖片到螢幕尺寸
-            scaled_image = pygame.transform.scale(raw_image, screen_size)
-
             # 快取處理後的圖片
-            self.image_cache[cache_key] = scaled_image
+            self.image_cache.put(cache_key, scaled_image)
             print(f"✅ 成功載入場景背景圖片: {scene_key} - {image_path}")
             return scaled_image
 
@@ -602,8 +641,9 @@ class ImageManager:
         cache_key = f"scene_preview_{scene_key}_{preview_size[0]}x{preview_size[1]}"
 
         # 檢查快取
-        if cache_key in self.image_cache:
-            return self.image_cache[cache_key]
+        cached_image = self.image_cache.get(cache_key)
+        if cached_image is not None:
+            return cached_image
 
         scene_config = SCENE_CONFIGS.get(scene_key)
         if not scene_config or "background_image" not in scene_config:
@@ -613,30 +653,17 @@ class ImageManager:
         image_path = scene_config["background_image"]
 
         try:
-            # 嘗試載入圖片
-            full_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))), image_path
+            # 載入並縮放圖片到預覽尺寸
+            scaled_image = self._load_scaled_image(
+                image_path, preview_size, use_alpha=False
             )
 
-            if not os.path.exists(full_path):
-                print(f"場景預覽圖片檔案不存在: {full_path}")
+            if scaled_image is None:
+                print(f"場景預覽圖片檔案不存在: {self._get_full_path(image_path)}")
                 return None
 
-            # 載入並處理圖片
-            raw_image = pygame.image.load(full_path)
-
-            # 檢查 pygame 顯示是否已初始化
-            try:
-                raw_image = raw_image.convert()
-            except pygame.error:
-                # 如果顯示未初始化，保持原格式
-                pass
-
-            # 縮放圖片到預覽尺寸
-            scaled_image = pygame.transform.scale(raw_image, preview_size)
-
             # 快取處理後的圖片
-            self.image_cache[cache_key] = scaled_image
+            self.image_cache.put(cache_key, scaled_image)
             print(f"✅ 成功載入場景預覽圖片: {scene_key} - {image_path}")
             return scaled_image
 
@@ -659,41 +686,23 @@ class ImageManager:
         pygame.Surface: 處理後的圖片，如果載入失敗則返回 None\n
         """
         # 建立快取鍵值
-        size_key = f"{size[0]}x{size[1]}" if size else "original"
-        cache_key = f"generic_{image_path}_{size_key}"
+        cache_key = self._generic_cache_key(image_path, size)
 
         # 檢查快取
-        if cache_key in self.image_cache:
-            return self.image_cache[cache_key]
+        cached_image = self.image_cache.get(cache_key)
+        if cached_image is not None:
+            return cached_image
 
         try:
-            # 嘗試載入圖片
-            full_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))), image_path
-            )
+            # 載入並縮放圖片（如果指定了尺寸）
+            processed_image = self._load_scaled_image(image_path, size)
 
-            if not os.path.exists(full_path):
-                print(f"圖片檔案不存在: {full_path}")
+            if processed_image is None:
+                print(f"圖片檔案不存在: {self._get_full_path(image_path)}")
                 return None
 
-            # 載入並處理圖片
-            raw_image = pygame.image.load(full_path)
-
-            # 檢查 pygame 顯示是否已初始化
-            try:
-                raw_image = raw_image.convert_alpha()
-            except pygame.error:
-                # 如果顯示未初始化，只使用 convert()
-                raw_image = raw_image.convert()
-
-            # 縮放圖片（如果指定了尺寸）
-            if size:
-                processed_image = pygame.transform.scale(raw_image, size)
-            else:
-                processed_image = raw_image
-
             # 快取處理後的圖片
-            self.image_cache[cache_key] = processed_image
+            self.image_cache.put(cache_key, processed_image)
             print(f"✅ 成功載入圖片: {image_path}")
             return processed_image
 
@@ -704,6 +713,87 @@ class ImageManager:
             print(f"處理圖片時發生錯誤 ({image_path}): {e}")
             return None
 
+    def pin_match_assets(self, scene_key, character_type):
+        """
+        載入並固定對戰中會用到的圖片\n
+        \n
+        固定的圖片不會被 LRU 淘汰，避免對戰途中重新解碼造成卡頓。\n
+        新的對戰開始時會先解除上一場的固定。\n
+        \n
+        參數:\n
+        scene_key (str): 場景類型\n
+        character_type (str): 玩家角色類型\n
+        """
+        self.image_cache.unpin_all()
+        pinned_keys = []
+
+        # 場景背景
+        if self.load_scene_background(scene_key) is not None:
+            pinned_keys.append(
+                self._scene_cache_key(scene_key, (SCREEN_WIDTH, SCREEN_HEIGHT))
+            )
+
+        # 玩家角色
+        player_size = (PLAYER_SIZE, PLAYER_SIZE)
+        self.load_character_image(character_type, size=player_size, for_selection=False)
+        pinned_keys.append(
+            self._character_cache_key(character_type, player_size, False)
+        )
+
+        # 武器圖示（介面上顯示的尺寸）
+        for weapon_type in WEAPON_CONFIGS:
+            for size in ASSET_CACHE_CONFIGS["weapon_sizes"]:
+                size = tuple(size)
+                self.load_weapon_image(weapon_type, size)
+                pinned_keys.append(self._weapon_cache_key(weapon_type, size))
+
+        # 敵人圖片
+        for enemy_type, type_config in AI_ENEMY_TYPES.items():
+            image_path = type_config.get("image_path")
+            if not image_path:
+                continue
+            if enemy_type == "boss":
+                size = (PLAYER_SIZE * 2, PLAYER_SIZE * 2)
+            else:
+                size = (ENEMY_SIZE, ENEMY_SIZE)
+            if self.load_image(image_path, size) is not None:
+                pinned_keys.append(self._generic_cache_key(image_path, size))
+
+        for cache_key in pinned_keys:
+            if cache_key in self.image_cache:
+                self.image_cache.pin(cache_key)
+
+    def unpin_match_assets(self):
+        """
+        解除對戰圖片的固定（離開對戰時呼叫）\n
+        """
+        self.image_cache.unpin_all()
+
+    def get_cache_stats(self):
+        """
+        取得圖片快取統計資料（供遙測使用）\n
+        \n
+        回傳:\n
+        dict: 命中、未命中、淘汰次數和常駐位元組數等\n
+        """
+        return self.image_cache.get_stats()
+
+    def get_overlay_lines(self):
+        """
+        取得效能面板顯示的圖片快取資訊\n
+        \n
+        回傳:\n
+        list: 要顯示的文字行\n
+        """
+        stats = self.get_cache_stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups * 100 if lookups else 0
+        return [
+            f"images: {stats['bytes_resident'] / 1048576:.1f}/"
+            f"{stats['budget_bytes'] / 1048576:.0f} MB ({stats['entries']})",
+            f"image hit {hit_rate:.0f}% / evicted {stats['evictions']}",
+        ]
+
     def clear_cache(self):
         """
         清除圖片快取\n
@@ -0,0 +1,224 @@
+######################載入套件######################
+import pygame
+import os
+import json
+import time
+from collections import deque
+from src.config import *
+from src.utils.font_manager import font_manager
+
+######################輸入延遲追蹤類別######################
+
+# 追蹤的輸入類型
+LATENCY_KINDS = ("move", "fire", "aim")
+
+
+class LatencyTracker:
+    """
+    輸入延遲追蹤器 - 量測從輸入事件到畫面顯示結果的時間（input-to-photon）\n
+    \n
+    此類別負責：\n
+    1. EventHandler 取出輸入事件時記錄時間（移動、射擊、瞄準）\n
+    2. 輸入第一次產生效果時（角色移動、子彈生成、準心移動）標記這一幀\n
+    3. 這一幀 display.flip() 之後記錄顯示時間，算出延遲\n
+    4. 保留最近的延遲紀錄，提供百分位數給效能面板和遙測輸出\n
+    \n
+    使用方式:\n
+    latency_tracker.record_event(event)  # 取出事件時\n
+    latency_tracker.mark_effect("fire")  # 子彈生成時\n
+    latency_tracker.mark_present()  # display.flip() 之後\n
+    """
+
+    def __init__(self):
+        """
+        初始化輸入延遲追蹤器\n
+        """
+        # 每種輸入最早一筆還沒產生效果的時間（秒，perf_counter）
+        self.pending_inputs = {}
+        # 這一幀已產生效果、等待畫面顯示的輸入 [(類型, 輸入時間), ...]
+        self.awaiting_present = []
+
+        window = LATENCY_CONFIGS["window"]
+        self.samples = {kind: deque(maxlen=window) for kind in LATENCY_KINDS}
+        self.total_samples = 0
+        self.overlay_visible = False
+
+    def _classify_event(self, event):
+        """
+        判斷事件屬於哪種輸入\n
+        \n
+        回傳:\n
+        str: 輸入類型，不需要追蹤時回傳 None\n
+        """
+        if event.type == pygame.KEYDOWN:
+            if event.key in (
+                KEYS["move_up"],
+                KEYS["move_down"],
+                KEYS["move_left"],
+                KEYS["move_right"],
+            ):
+                return "move"
+            if event.key == KEYS["fire"]:
+                return "fire"
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            return "fire"
+        elif event.type == pygame.MOUSEMOTION:
+            return "aim"
+        return None
+
+    def record_event(self, event):
+        """
+        記錄輸入事件被取出的時間（EventHandler.handle_events 中呼叫）\n
+        \n
+        參數:\n
+        event (pygame.event.Event): 事件物件\n
+        """
+        if not LATENCY_CONFIGS["enabled"]:
+            return
+
+        kind = self._classify_event(event)
+        if kind is not None and kind not in self.pending_inputs:
+            # 同一種輸入只記最早一筆，延遲從使用者最早的操作開始算
+            self.pending_inputs[kind] = time.perf_counter()
+
+    def mark_effect(self, kind):
+        """
+        標記這一幀產生了輸入的效果（這一幀顯示時就算完成）\n
+        \n
+        參數:\n
+        kind (str): 輸入類型（'move', 'fire', 'aim'）\n
+        """
+        input_time = self.pending_inputs.pop(kind, None)
+        if input_time is not None:
+            self.awaiting_present.append((kind, input_time))
+
+    def mark_present(self):
+        """
+        記錄畫面顯示時間並算出這一幀完成的輸入延遲（display.flip() 之後呼叫）\n
+        """
+        if not LATENCY_CONFIGS["enabled"]:
+            return
+
+        present_time = time.perf_counter()
+        for kind, input_time in self.awaiting_present:
+            self.samples[kind].append((present_time - input_time) * 1000)
+            self.total_samples += 1
+        self.awaiting_present.clear()
+
+        # 沒有產生效果的輸入（例如填裝中按射擊）過一段時間就放棄
+        max_pending = LATENCY_CONFIGS["max_pending_ms"] / 1000
+        for kind, input_time in list(self.pending_inputs.items()):
+            if present_time - input_time > max_pending:
+                del self.pending_inputs[kind]
+
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        """
+        取得已排序數列的百分位數（最近排名法）\n
+        """
+        index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+        return sorted_values[index]
+
+    def get_distribution(self, kind):
+        """
+        取得一種輸入最近的延遲分布\n
+        \n
+        參數:\n
+        kind (str): 輸入類型\n
+        \n
+        回傳:\n
+        dict: 樣本數和 p50/p95/p99/最大值（毫秒），沒有樣本時回傳 None\n
+        """
+        values = sorted(self.samples[kind])
+        if not values:
+            return None
+        return {
+            "count": len(values),
+            "p50": self._percentile(values, 50),
+            "p95": self._percentile(values, 95),
+            "p99": self._percentile(values, 99),
+            "max": values[-1],
+        }
+
+    def get_report(self):
+        """
+        取得所有輸入類型的延遲分布\n
+        \n
+        回傳:\n
+        dict: {輸入類型: 延遲分布或 None}\n
+        """
+        return {kind: self.get_distribution(kind) for kind in LATENCY_KINDS}
+
+    def toggle_overlay(self):
+        """
+        切換效能面板顯示\n
+        """
+        self.overlay_visible = not self.overlay_visible
+
+    def draw_overlay(self, screen, fps, extra_lines=None):
+        """
+        繪製效能面板（FPS 和輸入延遲 p50/p95）\n
+        \n
+        參數:\n
+        screen (pygame.Surface): 遊戲畫面物件\n
+        fps (float): 目前的 FPS\n
+        extra_lines (list): 附加在最後的文字行（例如事件統計）\n
+        """
+        if not self.overlay_visible:
+            return
+
+        lines = [f"FPS: {fps:.0f}"]
+        for kind, distribution in self.get_report().items():
+            if distribution:
+                lines.append(
+                    f"{kind}: p50 {distribution['p50']:.1f} ms / "
+                    f"p95 {distribution['p95']:.1f} ms ({distribution['count']})"
+                )
+            else:
+                lines.append(f"{kind}: --")
+        if extra_lines:
+            lines.extend(extra_lines)
+
+        panel = pygame.Surface((260, 18 * len(lines) + 8), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        screen.blit(panel, (8, 8))
+        for index, line in enumerate(lines):
+            text_surface = font_manager.render_text(line, "small", COLORS["white"])
+            screen.blit(text_surface, (14, 12 + index * 18))
+
+    def export_telemetry(self, file_path=None, extra_stats=None):
+        """
+        把延遲分布寫成 JSON 遙測檔\n
+        \n
+        參數:\n
+        file_path (str): 輸出路徑，None 時使用 LATENCY_CONFIGS 的設定\n
+        extra_stats (dict): 附加寫入遙測檔的其他統計（例如圖片快取、聲道使用）\n
+        \n
+        回傳:\n
+        bool: 是否成功寫入\n
+        """
+        if file_path is None:
+            file_path = LATENCY_CONFIGS["telemetry_file"]
+
+        telemetry = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total_samples": self.total_samples,
+            "latency_ms": self.get_report(),
+        }
+        if extra_stats:
+            telemetry.update(extra_stats)
+        try:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(telemetry, file, ensure_ascii=False, indent=2)
+            print(f"📊 輸入延遲遙測已輸出: {file_path}")
+            return True
+        except OSError as e:
+            print(f"⚠️ 無法輸出輸入延遲遙測: {e}")
+            return False
+
+
+# 全域輸入延遲追蹤器
+latency_tracker = LatencyTracker()
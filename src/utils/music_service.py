@@ -0,0 +1,267 @@
+######################載入套件######################
+import pygame
+import threading
+from src.config import SOUND_CONFIGS, LEVEL_CONFIGS, MUSIC_CONFIGS
+
+######################背景音樂服務類別######################
+
+
+class MusicService:
+    """
+    背景音樂服務 - 預先載入關卡音樂並以交叉淡入淡出切換\n
+    \n
+    此類別負責：\n
+    1. 依照 LEVEL_CONFIGS 的關卡進度，在背景執行緒預先解碼接下來的音樂\n
+    2. 切換音樂時只排入佇列，不在遊戲幀中阻塞載入\n
+    3. 音樂準備好後在兩個保留聲道之間交叉淡入淡出\n
+    4. 不再需要的音樂（不是目前、排入或接下來幾關的音樂）立即釋放\n
+    \n
+    記憶體用量：pygame.mixer.music 只有一個串流，無法交叉淡入淡出，所以音樂\n
+    整首解碼成 PCM 放在 Sound 中（22050 Hz 立體聲 16 位元約每分鐘 5 MB），\n
+    交叉淡入淡出和預先載入時最多同時保留目前、排入和接下來幾關的音樂\n
+    \n
+    使用方式:\n
+    music_service.prefetch_for_level("easy", 2)  # 預先載入第2、3關的音樂\n
+    music_service.request_level_music("easy", 3)  # 排入第3關的音樂\n
+    music_service.update()  # 每幀呼叫，音樂準備好就開始切換\n
+    """
+
+    def __init__(self, open_sound_file, channels):
+        """
+        初始化背景音樂服務\n
+        \n
+        參數:\n
+        open_sound_file (function): 解碼音效檔的函數，回傳 pygame.mixer.Sound 或 None\n
+        channels (list): 保留給背景音樂的聲道（至少兩個才能交叉淡入淡出）\n
+        """
+        self.open_sound_file = open_sound_file
+        self.channels = channels
+
+        # 預先載入的音樂（由背景執行緒寫入）
+        self.tracks = {}  # 音樂名稱 -> pygame.mixer.Sound
+        self.loading_tracks = set()
+        self.failed_tracks = set()
+        self._lock = threading.Lock()
+
+        # 播放狀態
+        self.current_track = None
+        self.current_channel_index = None
+        self.pending_track = None  # 等待切換的音樂名稱
+        self.has_pending_request = False
+
+    def prefetch(self, track_name):
+        """
+        在背景執行緒預先解碼音樂（已載入或載入中時不重複執行）\n
+        \n
+        參數:\n
+        track_name (str): 音樂名稱，對應 SOUND_CONFIGS 中的 key\n
+        """
+        if track_name not in SOUND_CONFIGS:
+            return
+
+        with self._lock:
+            if (
+                track_name in self.tracks
+                or track_name in self.loading_tracks
+                or track_name in self.failed_tracks
+            ):
+                return
+            self.loading_tracks.add(track_name)
+
+        thread = threading.Thread(
+            target=self._load_track, args=(track_name,), daemon=True
+        )
+        thread.start()
+
+    def _load_track(self, track_name):
+        """
+        背景執行緒：解碼音樂並設定音量\n
+        \n
+        參數:\n
+        track_name (str): 音樂名稱\n
+        """
+        track_config = SOUND_CONFIGS[track_name]
+        sound = None
+        try:
+            sound = self.open_sound_file(track_config["file_path"])
+            if sound is not None:
+                sound.set_volume(track_config["volume"])
+        except pygame.error as e:
+            print(f"❌ 預先載入音樂 {track_name} 失敗: {e}")
+            sound = None
+        except Exception as e:
+            print(f"❌ 預先載入音樂 {track_name} 時發生錯誤: {e}")
+            sound = None
+
+        with self._lock:
+            self.loading_tracks.discard(track_name)
+            if sound is None:
+                self.failed_tracks.add(track_name)
+            else:
+                self.tracks[track_name] = sound
+                print(f"🎵 已預先載入音樂: {track_name}")
+
+    @staticmethod
+    def get_level_track(difficulty, level):
+        """
+        取得關卡使用的音樂名稱\n
+        \n
+        參數:\n
+        difficulty (str): 難度\n
+        level (int): 關卡編號\n
+        \n
+        回傳:\n
+        str: 音樂名稱，沒有指定音樂時回傳 None\n
+        """
+        level_config = LEVEL_CONFIGS.get(difficulty, {}).get(level)
+        if not level_config:
+            return None
+        return level_config.get("music")
+
+    def prefetch_for_level(self, difficulty, level):
+        """
+        預先載入目前關卡和接下來幾關的音樂\n
+        \n
+        參數:\n
+        difficulty (str): 難度\n
+        level (int): 目前關卡編號\n
+        """
+        last_level = level + MUSIC_CONFIGS["prefetch_levels"]
+        for upcoming_level in range(level, last_level + 1):
+            track_name = self.get_level_track(difficulty, upcoming_level)
+            if track_name:
+                self.prefetch(track_name)
+
+    def request_level_music(self, difficulty, level):
+        """
+        排入關卡音樂並預先載入下一關的音樂（不阻塞）\n
+        \n
+        參數:\n
+        difficulty (str): 難度\n
+        level (int): 關卡編號\n
+        """
+        self.request_track(self.get_level_track(difficulty, level))
+        self.prefetch_for_level(difficulty, level)
+        self._release_unused_tracks(difficulty, level)
+
+    def _release_unused_tracks(self, difficulty, level):
+        """
+        釋放不再需要的已解碼音樂（整首 PCM 佔用的記憶體不小）\n
+        \n
+        保留目前播放、排入切換和接下來幾關的音樂；淡出中的聲道自己持有 Sound，\n
+        從字典移除不會中斷淡出\n
+        \n
+        參數:\n
+        difficulty (str): 難度\n
+        level (int): 目前關卡編號\n
+        """
+        keep_tracks = {self.current_track, self.pending_track}
+        last_level = level + MUSIC_CONFIGS["prefetch_levels"]
+        for upcoming_level in range(level, last_level + 1):
+            keep_tracks.add(self.get_level_track(difficulty, upcoming_level))
+
+        with self._lock:
+            for track_name in list(self.tracks):
+                if track_name not in keep_tracks:
+                    del self.tracks[track_name]
+
+    def request_track(self, track_name):
+        """
+        排入要切換的音樂，實際切換在 update() 中音樂準備好時進行\n
+        \n
+        參數:\n
+        track_name (str): 音樂名稱，None 表示淡出目前的音樂\n
+        """
+        self.pending_track = track_name
+        self.has_pending_request = True
+        if track_name:
+            self.prefetch(track_name)
+
+    def update(self):
+        """
+        處理排入的音樂切換（每幀呼叫）\n
+        \n
+        回傳:\n
+        bool: 這一幀是否切換了音樂\n
+        """
+        if not self.has_pending_request:
+            return False
+
+        track_name = self.pending_track
+        if track_name == self.current_track:
+            self.has_pending_request = False
+            return False
+
+        fade_ms = MUSIC_CONFIGS["crossfade_ms"]
+
+        # 淡出目前的音樂
+        if track_name is None:
+            self._fade_out_current(fade_ms)
+            self.has_pending_request = False
+            return True
+
+        with self._lock:
+            sound = self.tracks.get(track_name)
+            failed = track_name in self.failed_tracks
+
+        if failed:
+            # 音樂無法載入時放棄這次切換，保留目前的音樂
+            self.has_pending_request = False
+            return False
+        if sound is None:
+            # 還在背景載入中，下一幀再檢查
+            return False
+
+        self._crossfade_to(track_name, sound, fade_ms)
+        self.has_pending_request = False
+        return True
+
+    def _fade_out_current(self, fade_ms):
+        """
+        淡出目前播放的音樂\n
+        """
+        if self.current_channel_index is not None:
+            self.channels[self.current_channel_index].fadeout(fade_ms)
+        self.current_track = None
+        self.current_channel_index = None
+
+    def _crossfade_to(self, track_name, sound, fade_ms):
+        """
+        在另一個保留聲道淡入新音樂，同時淡出目前的音樂\n
+        """
+        if not self.channels:
+            return
+
+        if self.current_channel_index is None:
+            next_index = 0
+        else:
+            next_index = (self.current_channel_index + 1) % len(self.channels)
+        self._fade_out_current(fade_ms)
+
+        try:
+            # 循環播放（-1 表示無限循環）
+            self.channels[next_index].play(sound, loops=-1, fade_ms=fade_ms)
+        except pygame.error as e:
+            print(f"❌ 播放音樂 {track_name} 失敗: {e}")
+            return
+
+        self.current_track = track_name
+        self.current_channel_index = next_index
+        print(f"✅ 開始播放音樂: {track_name}（淡入 {fade_ms} ms）")
+
+    def stop(self, fade_ms=0):
+        """
+        停止背景音樂並清除排入的切換\n
+        \n
+        參數:\n
+        fade_ms (int): 淡出時間（毫秒），0 表示立即停止\n
+        """
+        self.pending_track = None
+        self.has_pending_request = False
+        for channel in self.channels:
+            if fade_ms > 0:
+                channel.fadeout(fade_ms)
+            else:
+                channel.stop()
+        self.current_track = None
+        self.current_channel_index = None
@@ -1,7 +1,10 @@
 ######################載入套件######################
 import pygame
 import os
-from src.config import SOUND_CONFIGS
+from src.config import SOUND_CONFIGS, SOUND_VOICE_CONFIGS
+from src.utils.asset_pack import get_asset_pack
+from src.utils.audio_clip_cache import AudioClipCache
+from src.utils.music_service import MusicService
 
 
 ######################物件類別######################
@@ -14,6 +17,7 @@ class SoundManager:
     2. 載入和緩存音效檔案\n
     3. 提供簡單的音效播放介面\n
     4. 處理音效載入失敗的情況\n
+    5. 管理聲道（分類保留聲道、同時播放上限、重播間隔、搶最舊的聲音）\n
     \n
     使用方式:\n
     sound_manager = SoundManager()\n
@@ -29,6 +33,7 @@ class SoundManager:
         1. 啟動 pygame mixer 音效系統\n
         2. 設定音效緩衝區大小和品質\n
         3. 準備空的音效字典（音效將按需載入）\n
+        4. 為每個音效分類保留固定的聲道\n
         """
         # 初始化 pygame 音效系統，設定合適的參數
         pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
@@ -37,46 +42,207 @@ class SoundManager:
         # 儲存載入的音效檔案（初始為空，按需載入）
         self.sounds = {}
 
+        # 音效片段快取（每個來源檔只解碼一次，片段存到磁碟）
+        self.clip_cache = AudioClipCache(self._open_sound_file)
+
+        # 聲道管理
+        self._setup_channel_groups()
+        self.active_voices = {}  # 音效名稱 -> [聲道編號, ...]（由舊到新）
+        self.channel_owners = {}  # 聲道編號 -> (音效名稱, 開始時間)
+        self.last_play_times = {}  # 音效名稱 -> 上次播放時間
+
+        # 靜音（重播快轉時不播放一連串的音效）
+        self.muted = False
+
+        # 主音量（播放時和音效設定的音量相乘，套用在聲道上）
+        self.master_volume = 1.0
+
+        # 背景音樂服務（使用保留的 music 聲道交叉淡入淡出）
+        music_channels = [
+            channel for _, channel in self.channel_groups.get("music", [])
+        ]
+        self.music_service = MusicService(self._open_sound_file, music_channels)
+
+        # 播放統計
+        self.voice_stats = {"played": 0, "dropped": 0, "stolen": 0}
+        self.dropped_by_sound = {}
+
         print("🎵 音效系統已就緒（音效將按需載入）")
 
-    def _load_sounds(self):
+    def _setup_channel_groups(self):
+        """
+        依照 SOUND_VOICE_CONFIGS 分配並保留每個分類的聲道\n
+        \n
+        保留的聲道不會被 Sound.play() 自動挑選，所以射擊音效再密集\n
+        也搶不到技能或提示音的聲道\n
         """
-        載入所有音效檔案到記憶體中\n
+        channel_groups = SOUND_VOICE_CONFIGS["channel_groups"]
+        reserved_count = sum(channel_groups.values())
+        num_channels = max(SOUND_VOICE_CONFIGS["num_channels"], reserved_count)
+
+        pygame.mixer.set_num_channels(num_channels)
+        pygame.mixer.set_reserved(reserved_count)
+
+        # 分類名稱 -> [(聲道編號, 聲道物件), ...]
+        self.channel_groups = {}
+        next_channel = 0
+        for category, count in channel_groups.items():
+            self.channel_groups[category] = [
+                (channel_id, pygame.mixer.Channel(channel_id))
+                for channel_id in range(next_channel, next_channel + count)
+            ]
+            next_channel += count
+
+    def _get_voice_settings(self, sound_name):
+        """
+        取得音效的聲道分類、同時播放上限和最短重播間隔\n
         \n
-        從 SOUND_CONFIGS 載入音效設定，包含：\n
-        - 檔案路徑\n
-        - 音量設定\n
-        - 錯誤處理\n
+        參數:\n
+        sound_name (str): 音效名稱\n
         \n
-        如果音效檔案載入失敗，會印出錯誤訊息但不會中斷遊戲\n
+        回傳:\n
+        tuple: (分類名稱, 同時播放上限, 最短重播間隔毫秒)\n
         """
-        for sound_name, sound_config in SOUND_CONFIGS.items():
-            try:
-                # 取得音效檔案的完整路徑
-                sound_path = sound_config["file_path"]
+        sound_config = SOUND_CONFIGS.get(sound_name, {})
+        category = sound_config.get(
+            "category", SOUND_VOICE_CONFIGS["default_category"]
+        )
+        if category not in self.channel_groups:
+            category = SOUND_VOICE_CONFIGS["default_category"]
+        max_voices = sound_config.get(
+            "max_voices", SOUND_VOICE_CONFIGS["default_max_voices"]
+        )
+        min_interval = sound_config.get(
+            "min_interval_ms", SOUND_VOICE_CONFIGS["default_min_interval_ms"]
+        )
+        return category, max_voices, min_interval
+
+    def _is_voice_playing(self, channel_id, channel, sound_name):
+        """
+        檢查聲道是否仍在播放指定音效\n
+        """
+        owner = self.channel_owners.get(channel_id)
+        return owner is not None and owner[0] == sound_name and channel.get_busy()
 
-                # 檢查檔案是否存在
-                if not os.path.exists(sound_path):
-                    print(f"音效檔案不存在: {sound_path}")
-                    continue
+    def _acquire_channel(self, sound_name, category, max_voices):
+        """
+        為音效挑選要播放的聲道\n
+        \n
+        挑選順序：\n
+        1. 音效已達同時播放上限 -> 搶這個音效最舊的聲音\n
+        2. 分類裡有空閒聲道 -> 使用空閒聲道\n
+        3. 分類聲道全滿 -> 搶分類裡最舊的聲音\n
+        \n
+        參數:\n
+        sound_name (str): 音效名稱\n
+        category (str): 聲道分類\n
+        max_voices (int): 同時播放上限\n
+        \n
+        回傳:\n
+        tuple: (聲道編號, 聲道物件)，沒有可用聲道時回傳 None\n
+        """
+        group = self.channel_groups[category]
+        if not group or max_voices <= 0:
+            return None
+
+        # 清除已經播放完畢或被其他音效搶走的聲音
+        voices = [
+            voice
+            for voice in self.active_voices.get(sound_name, [])
+            if self._is_voice_playing(voice[0], voice[1], sound_name)
+        ]
+        self.active_voices[sound_name] = voices
+
+        if len(voices) >= max_voices:
+            self.voice_stats["stolen"] += 1
+            return voices.pop(0)
+
+        for channel_id, channel in group:
+            if not channel.get_busy():
+                return channel_id, channel
+
+        # 分類聲道全滿，搶最舊的聲音
+        self.voice_stats["stolen"] += 1
+        return min(
+            group, key=lambda voice: self.channel_owners.get(voice[0], ("", 0))[1]
+        )
+
+    def _drop_sound(self, sound_name):
+        """
+        記錄一次被略過的播放\n
+        """
+        self.voice_stats["dropped"] += 1
+        dropped_count = self.dropped_by_sound.get(sound_name, 0)
+        self.dropped_by_sound[sound_name] = dropped_count + 1
 
-                # 載入音效檔案
-                sound = pygame.mixer.Sound(sound_path)
+    def get_voice_stats(self):
+        """
+        取得聲道使用統計（供遙測和除錯使用）\n
+        \n
+        回傳:\n
+        dict: 播放、略過、搶聲道次數，以及各音效被略過的次數\n
+        """
+        stats = dict(self.voice_stats)
+        stats["dropped_by_sound"] = dict(self.dropped_by_sound)
+        return stats
 
-                # 設定音量（0.0 到 1.0 之間）
-                sound.set_volume(sound_config["volume"])
+    def get_overlay_lines(self):
+        """
+        取得效能面板顯示的聲道使用統計\n
+        \n
+        回傳:\n
+        list: 要顯示的文字行\n
+        """
+        stats = self.voice_stats
+        return [
+            f"voices: {stats['played']} played / {stats['dropped']} dropped "
+            f"/ {stats['stolen']} stolen"
+        ]
 
-                # 儲存到字典中供後續使用
-                self.sounds[sound_name] = sound
+    def prewarm_sounds(self):
+        """
+        預先載入所有音效片段（在第一個畫面之後的延後初始化中呼叫）\n
+        \n
+        每個來源檔只解碼一次，片段切好後釋放完整的解碼資料，\n
+        讓第一次開槍時不需要解碼\n
+        \n
+        背景音樂由 MusicService 在背景執行緒載入，不在這裡載入\n
+        """
+        for sound_name, sound_config in SOUND_CONFIGS.items():
+            if sound_config.get("category") == "music":
+                continue
+            if sound_name not in self.sounds:
+                self._load_single_sound(sound_name)
+
+        self.clip_cache.release_sources()
+        stats = self.clip_cache.get_stats()
+        print(
+            f"🎵 音效預先載入完成：片段 {stats['clips']} 個、"
+            f"解碼 {stats['decoded_sources']} 個來源檔、"
+            f"磁碟快取命中 {stats['disk_hits']} 次、"
+            f"{stats['clip_bytes'] / 1024 / 1024:.1f} MB"
+        )
+
+    def _open_sound_file(self, sound_path):
+        """
+        開啟音效檔案（優先從資源封裝檔讀取）\n
+        \n
+        參數:\n
+        sound_path (str): 音效檔案路徑\n
+        \n
+        回傳:\n
+        pygame.mixer.Sound: 載入的音效，檔案不存在時回傳 None\n
+        """
+        asset_pack = get_asset_pack()
+        if asset_pack and asset_pack.has(sound_path):
+            return pygame.mixer.Sound(file=asset_pack.open(sound_path))
 
-                print(f"成功載入音效: {sound_name}")
+        # 檢查檔案是否存在
+        if not os.path.exists(sound_path):
+            print(f"音效檔案不存在: {sound_path}")
+            return None
 
-            except pygame.error as e:
-                # pygame 載入音效失敗
-                print(f"載入音效 {sound_name} 失敗: {e}")
-            except Exception as e:
-                # 其他未預期的錯誤
-                print(f"載入音效 {sound_name} 時發生錯誤: {e}")
+        return pygame.mixer.Sound(sound_path)
 
     def play_sound(self, sound_name):
         """
@@ -89,10 +255,18 @@ class SoundManager:
         sound_manager.play_sound('race_start')  # 播放開始音效\n
         sound_manager.play_sound('plasma_gun')  # 播放電漿槍音效\n
         \n
+        聲道管理:\n
+        - 距離上次播放未滿最短重播間隔時略過這次播放\n
+        - 同時播放數量達上限時，停止這個音效最舊的聲音再播放\n
+        - 靜音時直接略過\n
+        \n
         錯誤處理:\n
         - 如果音效不存在，印出警告訊息但不會中斷遊戲\n
         - 如果播放失敗，捕獲例外並印出錯誤訊息\n
         """
+        if self.muted:
+            return
+
         # 如果音效尚未載入，先載入它
         if sound_name not in self.sounds:
             self._load_single_sound(sound_name)
@@ -101,136 +275,62 @@ class SoundManager:
             print(f"找不到或無法載入音效: {sound_name}")
             return
 
+        category, max_voices, min_interval = self._get_voice_settings(sound_name)
+
+        # 檢查最短重播間隔（機關槍等高射速武器不需要每一發都播放）
+        current_time = pygame.time.get_ticks()
+        last_play_time = self.last_play_times.get(sound_name)
+        if (
+            last_play_time is not None
+            and current_time - last_play_time < min_interval
+        ):
+            self._drop_sound(sound_name)
+            return
+
+        voice = self._acquire_channel(sound_name, category, max_voices)
+        if voice is None:
+            self._drop_sound(sound_name)
+            return
+
+        channel_id, channel = voice
         try:
-            # 播放音效（不等待播放完成）
-            self.sounds[sound_name].play()
+            # 在挑選的聲道上播放音效（不等待播放完成，會取代聲道上原本的聲音）
+            channel.play(self.sounds[sound_name])
+            # 音量設在聲道上：共用片段的 Sound 不能設定個別音效的音量
+            channel.set_volume(SOUND_CONFIGS[sound_name]["volume"] * self.master_volume)
         except pygame.error as e:
+            self._drop_sound(sound_name)
             print(f"播放音效 {sound_name} 失敗: {e}")
+            return
+
+        self.channel_owners[channel_id] = (sound_name, current_time)
+        self.active_voices[sound_name].append(voice)
+        self.last_play_times[sound_name] = current_time
+        self.voice_stats["played"] += 1
 
     def _load_single_sound(self, sound_name):
         """
-        載入單一音效檔案（按需載入）
-
-        參數:
-        sound_name (str): 要載入的音效名稱
+        載入單一音效（按需載入）\n
+        \n
+        透過音效片段快取取得音效：設定相同片段的音效（例如手槍、步槍、衝鋒槍\n
+        都使用電漿槍音效的 0-2 秒）共用同一個 Sound，\n
+        共用的 Sound 不設定音量，各音效的音量在播放時設定在聲道上\n
+        \n
+        參數:\n
+        sound_name (str): 要載入的音效名稱\n
         """
         if sound_name not in SOUND_CONFIGS:
             return
 
         sound_config = SOUND_CONFIGS[sound_name]
         try:
-            # 取得音效檔案的完整路徑
-            sound_path = sound_config["file_path"]
-
-            # 檢查檔案是否存在
-            if not os.path.exists(sound_path):
-                print(f"音效檔案不存在: {sound_path}")
+            sound = self.clip_cache.get_clip(sound_config)
+            if sound is None:
                 return
 
-            # 載入音效檔案
-            sound = pygame.mixer.Sound(sound_path)
-
-            # 檢查是否需要截取特定時間段
-            if "start_time" in sound_config and "end_time" in sound_config:
-                start_time = sound_config["start_time"]
-                end_time = sound_config["end_time"]
-
-                try:
-                    # 使用 pygame.sndarray 處理音效截取
-                    import numpy as np
-                    from pygame import sndarray
-
-                    # 轉換音效為 numpy 陣列
-                    sound_array = sndarray.array(sound)
-
-                    # 獲取音效的採樣率（假設為 22050Hz，pygame 的預設值）
-                    sample_rate = 22050
-
-                    # 計算開始和結束的樣本索引
-                    start_sample = int(start_time * sample_rate)
-                    end_sample = int(end_time * sample_rate)
-
-                    # 確保索引在有效範圍內
-                    start_sample = max(0, start_sample)
-                    end_sample = min(len(sound_array), end_sample)
-
-                    # 截取指定時間段的音效
-                    if len(sound_array.shape) > 1:
-                        # 立體聲
-                        trimmed_array = sound_array[start_sample:end_sample]
-                    else:
-                        # 單聲道，轉換為立體聲
-                        mono_trimmed = sound_array[start_sample:end_sample]
-                        trimmed_array = np.column_stack((mono_trimmed, mono_trimmed))
-
-                    # 轉換回 pygame.mixer.Sound
-                    sound = sndarray.make_sound(trimmed_array.astype(np.int16))
-
-                    print(f"按需載入音效片段: {sound_name} ({start_time}-{end_time}秒)")
-
-                except ImportError:
-                    print(
-                        f"⚠️ numpy 未安裝，無法截取音效片段，使用完整音效: {sound_name}"
-                    )
-                except Exception as e:
-                    print(f"⚠️ 截取音效片段失敗，使用完整音效: {sound_name}, 錯誤: {e}")
-
-            # 設定音量（0.0 到 1.0 之間）
-            sound.set_volume(sound_config["volume"])
-
-            # 檢查是否有速度倍率設定（用於機關槍加速音效）
-            if "speed_multiplier" in sound_config:
-                speed_multiplier = sound_config["speed_multiplier"]
-                # 使用 pygame.sndarray 處理音效速度調整
-                try:
-                    import numpy as np
-                    from pygame import sndarray
-
-                    # 轉換音效為 numpy 陣列
-                    sound_array = sndarray.array(sound)
-
-                    # 如果是立體聲，取平均值轉為單聲道
-                    if len(sound_array.shape) > 1:
-                        sound_array = np.mean(sound_array, axis=1)
-
-                    # 計算新的長度（速度快2倍，長度變一半）
-                    new_length = int(len(sound_array) / speed_multiplier)
-
-                    # 重新取樣音效
-                    step = len(sound_array) / new_length
-                    indices = np.arange(new_length) * step
-                    resampled = np.interp(
-                        indices, np.arange(len(sound_array)), sound_array
-                    )
-
-                    # 轉換回 pygame.mixer.Sound
-                    resampled = resampled.astype(np.int16)
-                    if len(sound_array.shape) == 1:
-                        # 單聲道轉立體聲
-                        stereo_array = np.column_stack((resampled, resampled))
-                    else:
-                        stereo_array = resampled
-
-                    sound = sndarray.make_sound(stereo_array)
-                    sound.set_volume(sound_config["volume"])
-
-                    print(f"按需載入加速音效: {sound_name} (速度: {speed_multiplier}x)")
-
-                except ImportError:
-                    print(
-                        f"⚠️ numpy 未安裝，無法調整音效速度，使用原始音效: {sound_name}"
-                    )
-                except Exception as e:
-                    print(f"⚠️ 調整音效速度失敗，使用原始音效: {sound_name}, 錯誤: {e}")
-
             # 儲存到字典中供後續使用
             self.sounds[sound_name] = sound
-
-            if (
-                "speed_multiplier" not in sound_config
-                and "start_time" not in sound_config
-            ):
-                print(f"按需載入音效: {sound_name}")
+            print(f"按需載入音效: {sound_name}")
 
         except pygame.error as e:
             # pygame 載入音效失敗
@@ -260,17 +360,9 @@ class SoundManager:
         sound_manager.play_weapon_sound('submachinegun') # 播放衝鋒槍音效\n
         sound_manager.play_weapon_sound('machinegun')    # 播放機關槍音效（2倍速）\n
         """
-        # 根據武器類型決定要播放的音效
-        if weapon_type == "shotgun":
-            self.play_sound("shotgun")
-        elif weapon_type == "pistol":
-            self.play_sound("pistol")
-        elif weapon_type == "rifle":
-            self.play_sound("rifle")
-        elif weapon_type == "submachinegun":
-            self.play_sound("submachinegun")
-        elif weapon_type == "machinegun":
-            self.play_sound("machinegun")
+        # 武器類型和音效名稱相同，直接查表播放
+        if SOUND_CONFIGS.get(weapon_type, {}).get("category") == "weapons":
+            self.play_sound(weapon_type)
         else:
             print(f"未知的武器類型: {weapon_type}")
 
@@ -322,31 +414,13 @@ class SoundManager:
         """
         播放第3關BOSS戰專用背景音樂\n
         \n
-        使用 pygame.mixer.music 播放長時間的背景音樂\n
-        這比 pygame.mixer.Sound 更適合播放大型音樂檔案\n
+        交給背景音樂服務排入佇列：音樂在背景執行緒解碼完成後才交叉淡入，\n
+        不會在遊戲幀中阻塞載入\n
         \n
         使用範例:\n
         sound_manager.play_level3_boss_music()  # 在第3關BOSS戰開始時播放\n
         """
-        try:
-            # 停止當前播放的背景音樂
-            pygame.mixer.music.stop()
-
-            # 載入第3關BOSS音樂
-            music_path = SOUND_CONFIGS["level3_boss_music"]["file_path"]
-            pygame.mixer.music.load(music_path)
-
-            # 設定音量
-            volume = SOUND_CONFIGS["level3_boss_music"]["volume"]
-            pygame.mixer.music.set_volume(volume)
-
-            # 播放音樂（循環播放）
-            pygame.mixer.music.play(-1)  # -1 表示無限循環
-
-            print(f"✅ 開始播放第3關BOSS音樂 (音量: {volume})")
-
-        except Exception as e:
-            print(f"❌ 播放第3關BOSS音樂失敗: {e}")
+        self.music_service.request_track("level3_boss_music")
 
     def stop_background_music(self):
         """
@@ -355,7 +429,7 @@ class SoundManager:
         停止當前播放的背景音樂\n
         """
         try:
-            pygame.mixer.music.stop()
+            self.music_service.stop()
             print("⏹️ 背景音樂已停止")
         except Exception as e:
             print(f"❌ 停止背景音樂失敗: {e}")
@@ -367,14 +441,17 @@ class SoundManager:
         參數:\n
         volume (float): 音量大小，範圍 0.0 到 1.0\n
         \n
-        注意: 這會影響所有已載入的音效\n
+        注意: 這會影響所有音效（包含正在播放的音效）\n
         """
-        volume = max(0.0, min(1.0, volume))  # 確保音量在有效範圍內
-
-        for sound in self.sounds.values():
-            # 重新計算每個音效的音量（原始音量 * 主音量）
-            original_volume = sound.get_volume()
-            sound.set_volume(original_volume * volume)
+        self.master_volume = max(0.0, min(1.0, volume))  # 確保音量在有效範圍內
+
+        # 正在播放的聲音立即套用新的音量（音效設定的音量 * 主音量）
+        for channel_id, (sound_name, _) in self.channel_owners.items():
+            channel = pygame.mixer.Channel(channel_id)
+            if channel.get_busy():
+                channel.set_volume(
+                    SOUND_CONFIGS[sound_name]["volume"] * self.master_volume
+                )
 
 
 # 全域音效管理器實例（延遲初始化）
@@ -0,0 +1,181 @@
+######################載入套件######################
+# 注意：這個模組只能使用標準函式庫，才能在匯入 pygame 之前開始計時
+import sys
+import time
+import builtins
+from contextlib import contextmanager
+
+######################啟動追蹤類別######################
+
+
+class StartupProfiler:
+    """
+    啟動追蹤器 - 記錄從 main.py 到第一個選單畫面的各階段耗時\n
+    \n
+    此類別負責：\n
+    1. 以巢狀區段記錄各初始化步驟的耗時\n
+    2. 追蹤模組匯入（包含重複的 from src.config import *）\n
+    3. 記錄第一個可互動選單畫面出現的時間\n
+    4. 記錄延後到第一個畫面之後才執行的初始化\n
+    5. 輸出啟動追蹤報告並檢查時間預算\n
+    """
+
+    def __init__(self):
+        """
+        初始化啟動追蹤器（以模組載入時間作為起點）\n
+        """
+        self.start_time = time.perf_counter()
+        # 每筆紀錄: [名稱, 巢狀深度, 開始時間(ms), 耗時(ms), 是否為延後初始化]
+        self.records = []
+        self._depth = 0
+
+        # 已載入模組被重複匯入的次數和耗時 {模組名稱: [次數, 耗時ms]}
+        self.repeat_imports = {}
+
+        self.first_frame_ms = None
+
+    def _elapsed_ms(self):
+        """
+        取得從啟動到現在經過的毫秒數\n
+        """
+        return (time.perf_counter() - self.start_time) * 1000
+
+    @contextmanager
+    def section(self, name, deferred=False):
+        """
+        記錄一個初始化區段的耗時（可巢狀使用）\n
+        \n
+        參數:\n
+        name (str): 區段名稱\n
+        deferred (bool): 是否為第一個畫面之後才執行的延後初始化\n
+        \n
+        使用範例:\n
+        with startup_profiler.section("pygame.init"):\n
+            pygame.init()\n
+        """
+        record = [name, self._depth, self._elapsed_ms(), 0.0, deferred]
+        self.records.append(record)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record[3] = self._elapsed_ms() - record[2]
+
+    @contextmanager
+    def trace_imports(self, packages=("src",), libraries=("pygame", "numpy")):
+        """
+        追蹤區段內的模組匯入\n
+        \n
+        第一次載入的模組會變成巢狀區段；已經載入過的模組（例如每個模組都會\n
+        執行的 from src.config import *）只累計次數和耗時\n
+        \n
+        參數:\n
+        packages (tuple): 要追蹤所有子模組的套件名稱\n
+        libraries (tuple): 只追蹤最上層匯入的外部函式庫（不展開內部模組）\n
+        """
+        original_import = builtins.__import__
+        package_prefixes = tuple(package + "." for package in packages)
+
+        def is_traced(name):
+            return (
+                name in packages
+                or name in libraries
+                or name.startswith(package_prefixes)
+            )
+
+        def traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level != 0 or not is_traced(name):
+                return original_import(name, globals, locals, fromlist, level)
+
+            if name in sys.modules:
+                begin = time.perf_counter()
+                module = original_import(name, globals, locals, fromlist, level)
+                if name in libraries:
+                    return module
+                repeat = self.repeat_imports.setdefault(name, [0, 0.0])
+                repeat[0] += 1
+                repeat[1] += (time.perf_counter() - begin) * 1000
+                return module
+
+            with self.section(f"import {name}"):
+                return original_import(name, globals, locals, fromlist, level)
+
+        builtins.__import__ = traced_import
+        try:
+            yield
+        finally:
+            builtins.__import__ = original_import
+
+    def mark_first_frame(self):
+        """
+        記錄第一個可互動選單畫面顯示的時間（只記錄第一次）\n
+        """
+        if self.first_frame_ms is None:
+            self.first_frame_ms = self._elapsed_ms()
+
+    def is_within_budget(self, budget_ms):
+        """
+        檢查第一個選單畫面是否在時間預算內出現\n
+        \n
+        參數:\n
+        budget_ms (float): 時間預算（毫秒）\n
+        \n
+        回傳:\n
+        bool: 是否在預算內（尚未出現畫面時為 False）\n
+        """
+        return self.first_frame_ms is not None and self.first_frame_ms <= budget_ms
+
+    def build_report(self, budget_ms=None):
+        """
+        產生啟動追蹤報告\n
+        \n
+        參數:\n
+        budget_ms (float): 第一個畫面的時間預算，None 表示不檢查\n
+        \n
+        回傳:\n
+        str: 多行文字報告\n
+        """
+        lines = ["📊 啟動追蹤報告"]
+
+        startup_records = [r for r in self.records if not r[4]]
+        deferred_records = [r for r in self.records if r[4]]
+
+        for name, depth, _, duration, _ in startup_records:
+            indent = "  " * (depth + 1)
+            lines.append(f"{indent}{name:<40} {duration:8.1f} ms")
+
+        if self.repeat_imports:
+            lines.append("  重複匯入（模組已載入，只有名稱複製的成本）:")
+            for name, (count, duration) in sorted(self.repeat_imports.items()):
+                lines.append(f"    {name:<38} {count:3d} 次 {duration:6.2f} ms")
+
+        if self.first_frame_ms is not None:
+            status = ""
+            if budget_ms is not None:
+                within = self.is_within_budget(budget_ms)
+                status = f"（預算 {budget_ms:.0f} ms {'✅' if within else '❌ 超出'}）"
+            lines.append(f"  第一個選單畫面: {self.first_frame_ms:.1f} ms{status}")
+
+        if deferred_records:
+            lines.append("  延後初始化（第一個畫面之後執行）:")
+            for name, depth, start, duration, _ in deferred_records:
+                indent = "  " * (depth + 2)
+                lines.append(
+                    f"{indent}{name:<38} {duration:8.1f} ms（於 {start:.0f} ms）"
+                )
+
+        return "\n".join(lines)
+
+    def print_report(self, budget_ms=None):
+        """
+        印出啟動追蹤報告\n
+        \n
+        參數:\n
+        budget_ms (float): 第一個畫面的時間預算\n
+        """
+        print(self.build_report(budget_ms))
+
+
+# 全域啟動追蹤器實例（越早匯入，計時越準確）
+startup_profiler = StartupProfiler()